@@ -0,0 +1,90 @@
+"""
+Alineación de varias corridas sobre un eje X común.
+
+Cada archivo se interpola linealmente sobre una misma grilla de X (tiempo o
+número de muestra), de modo que las corridas pueden superponerse canal por
+canal o exportarse en una única tabla.
+"""
+import numpy as np
+import pandas as pd
+
+
+SAMPLE_AXIS = "Nº de muestra"
+RANGE_MODES = ["Intersección", "Unión"]
+
+
+def common_grid(x_arrays, n_points: int, mode: str = "Intersección") -> np.ndarray:
+    """
+    Construye una grilla uniforme de `n_points` puntos que cubre los ejes X dados.
+
+    Args:
+        x_arrays (list): Eje X de cada corrida.
+        n_points (int): Cantidad de puntos de la grilla.
+        mode (str): "Intersección" (rango común a todas) o "Unión" (rango total).
+    """
+    lows = [np.nanmin(x) for x in x_arrays if len(x)]
+    highs = [np.nanmax(x) for x in x_arrays if len(x)]
+    if not lows:
+        raise ValueError("No hay datos para alinear.")
+    if mode == "Unión":
+        lo, hi = min(lows), max(highs)
+    else:
+        lo, hi = max(lows), min(highs)
+    if not hi > lo:
+        raise ValueError("Los archivos no tienen un rango X en común.")
+    return np.linspace(lo, hi, int(n_points))
+
+
+def interpolate_onto(x: np.ndarray, y_matrix: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """
+    Interpola cada columna de `y_matrix` sobre `grid`.
+
+    Se ignoran los NaN de cada columna; fuera del rango de X válido de la
+    corrida el resultado es NaN. Si X no es creciente se ordena primero.
+    """
+    x = np.asarray(x, dtype=float)
+    y_matrix = np.asarray(y_matrix, dtype=float)
+    if len(x) > 1 and not (np.diff(x) >= 0).all():
+        order = np.argsort(x, kind="stable")
+        x, y_matrix = x[order], y_matrix[order]
+    out = np.full((len(grid), y_matrix.shape[1]), np.nan)
+    x_finite = np.isfinite(x)
+    for j in range(y_matrix.shape[1]):
+        valid = x_finite & np.isfinite(y_matrix[:, j])
+        if valid.sum() < 2:
+            continue
+        out[:, j] = np.interp(grid, x[valid], y_matrix[valid, j], left=np.nan, right=np.nan)
+    return out
+
+
+def align_datasets(frames: dict, channels, x_col: str = SAMPLE_AXIS, n_points: int = 4000,
+                   mode: str = "Intersección") -> pd.DataFrame:
+    """
+    Alinea varias corridas sobre un eje X común.
+
+    Args:
+        frames (dict): Nombre de la corrida -> DataFrame.
+        channels (list): Canales a alinear (presentes en todas las corridas).
+        x_col (str): Columna X, o SAMPLE_AXIS para usar el número de muestra.
+        n_points (int): Cantidad de puntos de la grilla común.
+        mode (str): Rango de la grilla (ver RANGE_MODES).
+
+    Returns:
+        pd.DataFrame: Columna X seguida de una columna "<canal> [<corrida>]" por canal y corrida.
+    """
+    channels = list(channels)
+    x_arrays = {
+        name: np.arange(len(df), dtype=float) if x_col == SAMPLE_AXIS else df[x_col].to_numpy(dtype=float)
+        for name, df in frames.items()
+    }
+    grid = common_grid(list(x_arrays.values()), n_points, mode)
+    aligned = {
+        name: interpolate_onto(x_arrays[name], df[channels].to_numpy(dtype=float), grid)
+        for name, df in frames.items()
+    }
+    # Columnas agrupadas por canal para superponer las corridas
+    columns = {x_col: grid}
+    for j, channel in enumerate(channels):
+        for name in frames:
+            columns[f"{channel} [{name}]"] = aligned[name][:, j]
+    return pd.DataFrame(columns)
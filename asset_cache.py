@@ -0,0 +1,143 @@
+"""
+Recursos estáticos compartidos por todas las sesiones.
+
+Las tablas e imágenes de `resources/` y el logo se leen una sola vez por
+proceso y se sirven ya decodificados a todas las sesiones, como
+`st.cache_resource`. Cada entrada recuerda el mtime y el tamaño del archivo:
+si el archivo cambia en disco se vuelve a cargar en el siguiente pedido, sin
+reiniciar el servidor.
+
+Los valores son compartidos: quien los use no debe modificarlos.
+"""
+import os
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RK_CR_PATH = os.path.join(BASE_DIR, "resources", "RK_CR.csv")
+PROBETA_PATH = os.path.join(BASE_DIR, "resources", "probeta.png")
+LOGO_PATH = os.path.join(BASE_DIR, "fadea_logo.png")
+
+
+class AssetCache:
+    """Recursos cargados por (ruta, función de carga), invalidados por mtime y tamaño."""
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, path: str, loader):
+        """
+        Devuelve `loader(path)`, cargándolo solo si el archivo cambió desde la última vez.
+
+        Args:
+            path (str): Ruta del archivo.
+            loader (callable): Función de nivel de módulo que recibe la ruta y devuelve el recurso.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        key = (path, loader)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != stamp:
+                entry = (stamp, loader(path))
+                self._entries[key] = entry
+                self.loads += 1
+        return entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+ASSETS = AssetCache()
+
+
+def read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def asset_bytes(path: str) -> bytes:
+    """Contenido de un archivo (por ejemplo una imagen para st.image)."""
+    return ASSETS.get(path, read_bytes)
+
+
+def parse_fpdf_image(path: str) -> dict:
+    """Imagen PNG o JPEG decodificada por fpdf, como la guarda `FPDF.image` en `FPDF.images`."""
+    import fpdf
+
+    pdf = fpdf.FPDF()
+    return pdf._parsejpg(path) if path.lower().endswith((".jpg", ".jpeg")) else pdf._parsepng(path)
+
+
+def fpdf_image(pdf, path: str) -> str:
+    """
+    Registra en `pdf` la imagen de `path` decodificada una sola vez por proceso.
+
+    `FPDF.image` solo recibe rutas y decodifica cada imagen de nuevo en cada
+    documento; con la imagen ya registrada usa la de la caché. Devuelve la
+    ruta, para pasarla a `pdf.image`.
+    """
+    if path not in pdf.images:
+        # Copia propia del documento: fpdf le agrega su número de imagen y objeto
+        info = dict(ASSETS.get(path, parse_fpdf_image))
+        info["i"] = len(pdf.images) + 1
+        pdf.images[path] = info
+    return path
+
+
+@dataclass(frozen=True)
+class HardnessTable:
+    """
+    Tabla dureza Rockwell (RK) -> resistencia a la tracción (CR).
+
+    `table` es la tabla tal como está en el archivo; `rk`, `cr` y `labels`
+    son las mismas filas ordenadas por RK creciente para buscar por bisección.
+    """
+    table: pd.DataFrame
+    rk: np.ndarray
+    cr: np.ndarray
+    labels: np.ndarray
+
+    def strength(self, rk: float) -> float:
+        """Resistencia interpolada linealmente entre las filas vecinas de la tabla."""
+        return float(np.interp(rk, self.rk, self.cr))
+
+    def bracket(self, rk: float) -> set:
+        """Etiquetas de las filas con el mayor RK <= rk y el menor RK >= rk."""
+        rows = set()
+        below = np.searchsorted(self.rk, rk, side="right") - 1
+        above = np.searchsorted(self.rk, rk, side="left")
+        if below >= 0:
+            rows.add(self.labels[below])
+        if above < len(self.rk):
+            rows.add(self.labels[above])
+        return rows
+
+
+def load_hardness_table(path: str) -> HardnessTable:
+    table = pd.read_csv(path, dtype={"RK": float, "CR": float})
+    order = np.argsort(table["RK"].to_numpy(), kind="stable")
+    rk = table["RK"].to_numpy()[order]
+    cr = table["CR"].to_numpy()[order]
+    labels = table.index.to_numpy()[order]
+    for array in (rk, cr, labels):
+        array.flags.writeable = False
+    return HardnessTable(table=table, rk=rk, cr=cr, labels=labels)
+
+
+def hardness_table(path: str = RK_CR_PATH) -> HardnessTable:
+    """Tabla RK-CR compartida (se relee solo si el archivo cambia)."""
+    return ASSETS.get(path, load_hardness_table)
@@ -0,0 +1,10 @@
+"""
+Suite de benchmarks de las rutas de datos de LabStore.
+
+- `generators`: datos sintéticos (logs del banco kc-390, planillas de
+  calibración, formas de onda .arb).
+- `suite`: definición de los benchmarks.
+- `run`: ejecuta la suite, guarda la línea base y compara contra ella.
+
+Uso: `python -m benchmarks.run --help`
+"""
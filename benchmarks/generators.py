@@ -0,0 +1,103 @@
+"""
+Generadores de datos sintéticos con la forma de los archivos reales.
+
+- Logs del banco kc-390: columnas ts, n, F1, TGT1, F2, TGT2, REF separadas
+  por tabulación (ver `data/kc-390-2.csv`), con escalones de carga en TGT1 y
+  F1 siguiéndolos con ruido.
+- Planillas de calibración con columnas `PAT<celda>_<ángulo>` /
+  `DUT<celda>_<ángulo>` (ver `data/mediciones_x3.xlsx`).
+- Formas de onda largas para el generador de ondas arbitrarias.
+
+Los archivos se guardan en `LABSTORE_BENCH_DIR` y se reutilizan entre
+ejecuciones: generar 10M filas lleva más que medirlas.
+"""
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+
+BENCH_DIR = os.environ.get("LABSTORE_BENCH_DIR", os.path.join(tempfile.gettempdir(), "labstore_bench"))
+KC390_COLUMNS = ["ts", "n", "F1", "TGT1", "F2", "TGT2", "REF"]
+SAMPLE_PERIOD_MS = 1660.0
+STEP_ROWS = 200
+CALIBRATION_ANGLES = ("0", "R")
+
+
+def kc390_log(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Log sintético del banco kc-390.
+
+    TGT1 sube y baja en escalones de `STEP_ROWS` muestras; F1 sigue al
+    objetivo con ruido; F2, TGT2 y REF son constantes como en los ensayos reales.
+    """
+    rng = np.random.default_rng(seed)
+    n = np.arange(1, n_rows + 1)
+    ts = 758.0 + np.cumsum(rng.normal(SAMPLE_PERIOD_MS, 2.0, n_rows))
+    step = (n - 1) // STEP_ROWS
+    # Ciclos de 10 escalones de subida y 10 de bajada
+    level = np.abs((step % 20) - 10)
+    tgt1 = 3462.0 + 40.0 * level
+    f1 = tgt1 + rng.normal(0.0, 1.5, n_rows) + 330.0
+    return pd.DataFrame({
+        "ts": ts,
+        "n": n,
+        "F1": np.round(f1, 4),
+        "TGT1": tgt1,
+        "F2": np.zeros(n_rows),
+        "TGT2": np.full(n_rows, 4231.0),
+        "REF": np.full(n_rows, 3847.0),
+    })
+
+
+def kc390_csv_path(n_rows: int, seed: int = 0) -> str:
+    """Ruta de un log sintético en CSV; se genera la primera vez que se pide."""
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    path = os.path.join(BENCH_DIR, f"kc390_{n_rows}_s{seed}.csv")
+    if not os.path.exists(path):
+        tmp_path = path + ".tmp"
+        kc390_log(n_rows, seed).to_csv(tmp_path, sep="\t", index=False)
+        os.replace(tmp_path, path)
+    return path
+
+
+def kc390_csv_bytes(n_rows: int, seed: int = 0) -> bytes:
+    with open(kc390_csv_path(n_rows, seed), "rb") as f:
+        return f.read()
+
+
+def calibration_sheet(n_cells: int, n_points: int = 11, angles=CALIBRATION_ANGLES, seed: int = 0) -> pd.DataFrame:
+    """
+    Planilla de calibración sintética.
+
+    Cada celda tiene un error de ganancia y un offset propios; la primera fila
+    es el punto de carga cero.
+    """
+    rng = np.random.default_rng(seed)
+    nominal = np.linspace(0.0, 1000.0, n_points)
+    columns = {}
+    for cell in range(1, n_cells + 1):
+        gain = 1.0 + rng.normal(0.0, 2e-3)
+        offset = rng.normal(0.0, 0.5)
+        for angle in angles:
+            pat = nominal + np.concatenate([[0.0], rng.normal(0.0, 3.0, n_points - 1)])
+            dut = np.round((pat * gain + offset) * 2) / 2
+            dut[0] = 0.0
+            columns[f"PAT{cell}_{angle}"] = np.round(pat, 1)
+            columns[f"DUT{cell}_{angle}"] = dut
+    return pd.DataFrame(columns)
+
+
+def waveform(n_samples: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Forma de onda larga en el formato de entrada del generador de scripts:
+    la primera fila con las unidades y luego tiempo (ms) y tensión (V).
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_samples) * 0.1
+    volts = np.sin(2 * np.pi * t / 250.0) + 0.25 * np.sign(np.sin(2 * np.pi * t / 40.0))
+    volts += rng.normal(0.0, 0.01, n_samples)
+    data = pd.DataFrame({0: t, 1: volts}, dtype=object)
+    units = pd.DataFrame([["ms", "V"]])
+    return pd.concat([units, data], ignore_index=True)
@@ -0,0 +1,111 @@
+"""
+Costo de importación de cada página en un arranque en frío.
+
+Para cada página se extraen sus `import` de nivel de módulo y se ejecutan en
+un intérprete nuevo con `-X importtime`, después de `import streamlit` (que el
+servidor ya tiene cargado). El costo de la página es la suma del tiempo propio
+de los módulos que no importa streamlit. Se toma el mínimo de `--repeat`
+ejecuciones para descontar el ruido.
+
+    python -m benchmarks.import_time                 # todas las páginas
+    python -m benchmarks.import_time --budget 0.4    # termina con código 1 si alguna se pasa
+"""
+import argparse
+import ast
+import glob
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRELOADED = "import streamlit"
+DEFAULT_BUDGET_SECONDS = 0.5
+DEFAULT_REPEAT = 3
+TOP_PACKAGES = 4
+
+
+def page_paths() -> list:
+    pages = sorted(glob.glob(os.path.join(REPO_DIR, "pages", "*.py")))
+    return [os.path.join(REPO_DIR, "lab.py")] + [p for p in pages if not p.endswith("__init__.py")]
+
+
+def module_imports(path: str) -> str:
+    """Código con los import de nivel de módulo del archivo (incluidos los try/except de imports)."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    nodes = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            nodes.append(node)
+        elif isinstance(node, ast.Try) and all(isinstance(n, (ast.Import, ast.ImportFrom)) for n in node.body):
+            nodes.append(node)
+    return "\n".join(ast.unparse(node) for node in nodes)
+
+
+def parse_importtime(stderr: str) -> dict:
+    """Convierte la salida de `-X importtime` en {módulo: tiempo propio en segundos}."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        times[parts[2].strip()] = int(parts[0]) / 1e6
+    return times
+
+
+def import_profile(code: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_DIR, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return parse_importtime(result.stderr)
+
+
+def page_import_cost(path: str, repeat: int = DEFAULT_REPEAT) -> tuple:
+    """
+    Costo de importación de una página por encima de streamlit.
+
+    Returns:
+        tuple: (segundos, {paquete: segundos}) de la ejecución más rápida.
+    """
+    baseline = set(import_profile(PRELOADED))
+    code = PRELOADED + "\n" + module_imports(path)
+    best = None
+    for _ in range(repeat):
+        extra = {name: seconds for name, seconds in import_profile(code).items() if name not in baseline}
+        total = sum(extra.values())
+        if best is None or total < best[0]:
+            packages = defaultdict(float)
+            for name, seconds in extra.items():
+                packages[name.split(".")[0]] += seconds
+            best = (total, dict(packages))
+    return best
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Costo de importación en frío de cada página.")
+    parser.add_argument("pages", nargs="*", help="Páginas a medir (por defecto lab.py y pages/*.py).")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS,
+                        help="Segundos máximos de importación por página.")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    args = parser.parse_args(argv)
+
+    over_budget = []
+    for path in args.pages or page_paths():
+        seconds, packages = page_import_cost(path, args.repeat)
+        heaviest = sorted(packages.items(), key=lambda item: -item[1])[:TOP_PACKAGES]
+        detail = ", ".join(f"{name} {value * 1000:.0f} ms" for name, value in heaviest)
+        flag = "  << supera el límite" if seconds > args.budget else ""
+        print(f"{os.path.relpath(path, REPO_DIR):<45} {seconds * 1000:7.0f} ms  ({detail}){flag}")
+        if seconds > args.budget:
+            over_budget.append(path)
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+Ejecuta la suite de benchmarks y la compara contra una línea base.
+
+    python -m benchmarks.run                     # perfil "default", compara con la línea base
+    python -m benchmarks.run --profile full      # incluye 10M filas
+    python -m benchmarks.run -k filter --save    # solo filtros, guarda como nueva línea base
+
+Cada caso se mide `--repeat` veces; en cada medición la función se repite
+hasta superar `MIN_SAMPLE_SECONDS` y se toma el tiempo por llamada. Se
+informa la mediana y, si hay línea base, la variación porcentual. Con
+`--fail-on-regression` el proceso termina con código 1 si algún caso empeora
+más que `--threshold` por ciento.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.suite import BENCHMARKS
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+MIN_SAMPLE_SECONDS = 0.05
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 10.0
+
+
+def case_key(name: str, param) -> str:
+    return f"{name}[{param}]"
+
+
+def time_case(func, args, repeat: int = DEFAULT_REPEAT) -> dict:
+    """Mide una función con sus argumentos y devuelve mediana y mínimo por llamada (s)."""
+    start = time.perf_counter()
+    func(*args)  # calentamiento: imports, cachés de numpy, etc.
+    first = time.perf_counter() - start
+    number = max(1, int(MIN_SAMPLE_SECONDS / max(first, 1e-9)))
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func(*args)
+        samples.append((time.perf_counter() - start) / number)
+    return {"median": statistics.median(samples), "min": min(samples), "number": number, "repeat": repeat}
+
+
+def run_suite(profile: str = "default", pattern: str = None, repeat: int = DEFAULT_REPEAT, log=print) -> dict:
+    """Ejecuta los benchmarks del perfil (filtrados por `pattern`) y devuelve {caso: resultado}."""
+    results = {}
+    for bench in BENCHMARKS:
+        if pattern and pattern not in bench.name:
+            continue
+        for param in bench.cases(profile):
+            args = bench.setup(param) if bench.setup else (param,)
+            results[case_key(bench.name, param)] = time_case(bench.func, args, repeat)
+            log(f"  {case_key(bench.name, param):<40} {format_seconds(results[case_key(bench.name, param)]['median'])}")
+    return results
+
+
+def load_baseline(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("results", {})
+
+
+def save_baseline(results: dict, path: str, profile: str, merge: bool = True):
+    """Guarda los resultados como línea base (conservando los casos no ejecutados)."""
+    previous = load_baseline(path) if merge else {}
+    payload = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "machine": platform.node(),
+        "python": platform.python_version(),
+        "profile": profile,
+        "results": {**previous, **results},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+
+
+def compare(results: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Compara cada caso contra la línea base.
+
+    Returns:
+        list: Tuplas (caso, mediana, mediana base o None, variación % o None, ¿regresión?).
+    """
+    rows = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            rows.append((key, result["median"], None, None, False))
+            continue
+        change = (result["median"] - base["median"]) / base["median"] * 100
+        rows.append((key, result["median"], base["median"], change, change > threshold))
+    return rows
+
+
+def format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.2f} ns"
+
+
+def format_report(rows: list) -> str:
+    lines = [f"{'caso':<40} {'actual':>11} {'base':>11} {'cambio':>9}"]
+    for key, median, base, change, regression in rows:
+        base_text = format_seconds(base) if base is not None else f"{'-':>11}"
+        change_text = f"{change:+8.1f}%" if change is not None else f"{'nuevo':>9}"
+        lines.append(f"{key:<40} {format_seconds(median)} {base_text} {change_text}{'  << REGRESIÓN' if regression else ''}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de las rutas de datos de LabStore.")
+    parser.add_argument("--profile", choices=["quick", "default", "full"], default="default",
+                        help="Tamaños a medir (full incluye logs de 10M filas).")
+    parser.add_argument("-k", dest="pattern", help="Solo los benchmarks cuyo nombre contiene este texto.")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Archivo JSON de línea base.")
+    parser.add_argument("--save", action="store_true", help="Guardar los resultados como línea base.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Porcentaje de empeoramiento que se informa como regresión.")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--output", help="Archivo donde escribir también el reporte (p. ej. bench_output.txt).")
+    args = parser.parse_args(argv)
+
+    print(f"Perfil {args.profile}:")
+    results = run_suite(args.profile, args.pattern, args.repeat)
+    rows = compare(results, load_baseline(args.baseline), args.threshold)
+    report = format_report(rows)
+    print()
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    if args.save:
+        save_baseline(results, args.baseline, args.profile)
+        print(f"\nLínea base guardada en {args.baseline}")
+    regressions = [row for row in rows if row[4]]
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
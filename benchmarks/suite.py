@@ -0,0 +1,230 @@
+"""
+Benchmarks de las rutas de datos.
+
+Cada benchmark se registra con `@benchmark(nombre, params, setup)`: `setup`
+recibe un valor de `params` y devuelve los argumentos de la función medida
+(la preparación no se mide). Los parámetros dependen del perfil elegido en
+`run` (`quick`, `default` o `full`), de modo que 10M filas solo se prueban
+cuando se pide.
+"""
+import io
+import os
+import sys
+from dataclasses import dataclass
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from benchmarks import generators
+
+
+ROWS = {
+    "quick": [10_000, 100_000],
+    "default": [10_000, 100_000, 1_000_000],
+    "full": [10_000, 100_000, 1_000_000, 10_000_000],
+}
+CELLS = {
+    "quick": [3],
+    "default": [3, 12],
+    "full": [3, 12, 40],
+}
+SAMPLES = {
+    "quick": [10_000],
+    "default": [10_000, 1_000_000],
+    "full": [10_000, 1_000_000, 10_000_000],
+}
+TABLE_ROWS = {
+    "quick": [200],
+    "default": [200, 2_000],
+    "full": [200, 2_000, 10_000],
+}
+FILTER_WINDOW = 51
+PLOT_POINTS = 4000
+PLOTS_PER_CELL = 3
+
+
+@dataclass
+class Benchmark:
+    name: str
+    func: object
+    params: dict
+    setup: object = None
+
+    def cases(self, profile: str) -> list:
+        return self.params.get(profile, [])
+
+
+BENCHMARKS = []
+
+
+def benchmark(name: str, params: dict, setup=None):
+    """Registra una función como benchmark."""
+    def register(func):
+        BENCHMARKS.append(Benchmark(name, func, params, setup))
+        return func
+    return register
+
+
+_frames = {}
+
+
+def _log(n_rows: int):
+    """Log sintético en memoria (compartido por los benchmarks del mismo tamaño)."""
+    if n_rows not in _frames:
+        _frames.clear()
+        _frames[n_rows] = generators.kc390_log(n_rows)
+    return _frames[n_rows]
+
+
+# --- Carga y estadísticas del Explorador de Datos ---
+
+@benchmark("csv_load", ROWS, setup=lambda n: (generators.kc390_csv_bytes(n),))
+def csv_load(raw):
+    from data_loader import parse_file
+    parse_file(raw, ".csv")
+
+
+@benchmark("stats", ROWS, setup=lambda n: (_log(n),))
+def stats(df):
+    from streaming_stats import compute_stats, iter_frame_chunks
+    compute_stats(iter_frame_chunks(df)).describe()
+
+
+def _register_filters():
+    from filters import FILTER_KERNELS, apply_filter
+
+    for kernel in FILTER_KERNELS:
+        def run(values, kernel=kernel):
+            apply_filter(values, kernel, FILTER_WINDOW)
+        name = "filter_" + kernel.lower().replace(" ", "_").replace("-", "_").replace("ó", "o")
+        benchmark(name, ROWS, setup=lambda n: (_log(n)[["F1", "TGT1"]].to_numpy(),))(run)
+
+
+_register_filters()
+
+
+def _xy(n_rows: int):
+    df = _log(n_rows)
+    return df["ts"].to_numpy(), df["F1"].to_numpy()
+
+
+@benchmark("downsample_minmax", ROWS, setup=_xy)
+def downsample_minmax(x, y):
+    from downsampling import decimate
+    decimate(x, y, PLOT_POINTS, "Min/Max")
+
+
+@benchmark("downsample_lttb", ROWS, setup=_xy)
+def downsample_lttb(x, y):
+    from downsampling import decimate
+    decimate(x, y, PLOT_POINTS, "LTTB")
+
+
+@benchmark("pyramid_build", ROWS, setup=lambda n: (_log(n)["F1"].to_numpy(),))
+def pyramid_build(values):
+    from downsampling import MinMaxPyramid
+    MinMaxPyramid(values)
+
+
+# --- Generador de ondas arbitrarias ---
+
+def _voltages(n_samples: int):
+    return (generators.waveform(n_samples).iloc[1:, 1].astype(float),)
+
+
+@benchmark("encode_voltages", SAMPLES, setup=_voltages)
+def encode_voltages(voltages):
+    from pages.Arbitrary_Waveform_Script_Generator import encode_voltages as encode
+    encode(voltages)
+
+
+# --- Calibraciones ---
+
+@benchmark("calibration", CELLS, setup=lambda n: (generators.calibration_sheet(n, angles=("0", "R", "120", "240")),))
+def calibration(sheet):
+    from calibration_engine import compute_calibration, parse_sheet
+    compute_calibration(parse_sheet(sheet)).summary()
+
+
+class _RaiseOnError:
+    """Reemplaza al objeto Streamlit: un error de armado del PDF no debe medirse como éxito."""
+    @staticmethod
+    def error(message):
+        raise RuntimeError(message)
+
+
+_plot_png = None
+
+
+def _plot_bytes() -> bytes:
+    """PNG representativo de un gráfico de calibración (se dibuja una sola vez)."""
+    global _plot_png
+    if _plot_png is None:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        fig, ax = plt.subplots(figsize=(10, 5))
+        x = np.linspace(0, 1000, 11)
+        ax.plot(x, x * 1e-3, "o-")
+        ax.grid(True)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=200)
+        plt.close(fig)
+        _plot_png = buffer.getvalue()
+    return _plot_png
+
+
+def _report_inputs(n_cells: int):
+    sheet = generators.calibration_sheet(n_cells)
+    denominaciones = {idx: f"Celda {idx}" for idx in range(1, n_cells + 1)}
+    plots = [
+        (f"grafico{k}_celda{idx}_{denominaciones[idx]}.png", io.BytesIO(_plot_bytes()))
+        for idx in denominaciones
+        for k in range(PLOTS_PER_CELL)
+    ]
+    return sheet, denominaciones, plots
+
+
+def _figure_specs(n_cells: int):
+    from calibration_engine import compute_calibration, parse_sheet
+    from plot_renderer import cell_figure_specs
+
+    results = compute_calibration(parse_sheet(generators.calibration_sheet(n_cells, angles=("0", "R", "120", "240"))))
+    specs = [spec for cell in results.sheet.cells
+             for spec in cell_figure_specs(results, cell, f"Celda {cell}", "kgf", 0.5)]
+    return (specs,)
+
+
+@benchmark("plot_render_serial", CELLS, setup=_figure_specs)
+def plot_render_serial(specs):
+    from plot_renderer import render_figures
+    render_figures(specs, cache=None, jobs=None)
+
+
+@benchmark("plot_render_pool", CELLS, setup=_figure_specs)
+def plot_render_pool(specs):
+    from plot_renderer import render_figures
+    render_figures(specs, cache=None, pool_min=1)
+
+
+@benchmark("pdf_report", CELLS, setup=_report_inputs)
+def pdf_report(sheet, denominaciones, plots):
+    from report_generator import ReportGenerator
+    ReportGenerator.generar_informe_pdf(
+        _RaiseOnError, "01/01/2025", "Patrón", "kgf", 0.5,
+        list(denominaciones), denominaciones, sheet, plots, cache=None,
+    )
+
+
+@benchmark("report_tables", TABLE_ROWS, setup=lambda n: (generators.calibration_sheet(1, n_points=n, angles=("0", "R", "120", "240")),))
+def report_tables(sheet):
+    from report_generator import build_story, cell_story
+    build_story(cell_story(1, "Celda 1", "kgf", sheet, []))
+
+
+@benchmark("excel_export", CELLS, setup=lambda n: (generators.calibration_sheet(n, n_points=1000),))
+def excel_export(sheet):
+    from pages.Rotations import to_excel
+    to_excel(sheet)
@@ -0,0 +1,303 @@
+"""
+Campañas de calibración sin interfaz: procesa un directorio de planillas.
+
+Cada planilla Excel pasa por los mismos cálculos que la página Calibraciones
+(`calibration_engine`), se grafica con `plot_renderer` y se informa con
+`ReportGenerator.generar_informe_pdf`. Las planillas se procesan en paralelo
+en un pool de procesos y los resultados quedan en el directorio de salida:
+
+    <salida>/<planilla>/informe_calibracion_<planilla>.pdf
+    <salida>/<planilla>/<gráfico>_celda<n>_<denominación>.png
+    <salida>/resumen.csv     una fila por planilla, celda y ángulo
+    <salida>/indice.json     estado de cada planilla (hash, salidas, errores)
+
+Una planilla cuyo contenido y parámetros no cambiaron desde la corrida
+anterior (según `indice.json`) se saltea; `--force` la vuelve a procesar. La
+fecha de calibración no cuenta para saltear: sin `--fecha` las planillas sin
+cambios conservan su informe (y su fecha) y las nuevas o modificadas se
+informan con la fecha de hoy; con `--fecha` se reprocesan las que tengan otra.
+
+    python calibration_cli.py campañas/2025-05 -o informes
+    python calibration_cli.py "campañas/**/*.xlsx" --tolerancia 0.5 --workers 4
+"""
+import argparse
+import glob
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from datetime import date
+
+import pandas as pd
+
+from calibration_engine import REQUIRED_ANGLES, compute_calibration, drop_zero_rows, missing_columns, parse_sheet
+from data_loader import file_digest
+from jobs import JOB_WORKERS
+from plot_renderer import PLOT_KINDS, cell_figure_specs, export_specs, plot_file_name, render_figures
+
+
+INDEX_FILE = "indice.json"
+SUMMARY_FILE = "resumen.csv"
+WORKBOOK_PATTERNS = ("*.xlsx", "*.xls")
+STATUS_OK = "ok"
+STATUS_SKIPPED = "sin cambios"
+STATUS_ERROR = "error"
+
+
+@dataclass(frozen=True)
+class CampaignSettings:
+    """Parámetros comunes a todas las planillas de la campaña (los de la página)."""
+    patron: str = "PAT"
+    fecha: str = ""
+    unidad: str = "daN"
+    tolerancia: float = 1.0
+    requerimiento: str = ""
+    documentacion: str = "N/C"
+
+    def digest(self) -> str:
+        """Hash de los parámetros salvo la fecha, que se compara aparte (ver `_is_current`)."""
+        params = {name: value for name, value in asdict(self).items() if name != "fecha"}
+        return hashlib.sha1(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class _ReportErrors:
+    """Reemplaza al objeto Streamlit de ReportGenerator: guarda los errores del armado del PDF."""
+    def __init__(self):
+        self.messages = []
+
+    def error(self, message):
+        self.messages.append(str(message))
+
+
+def find_workbooks(inputs: list) -> list:
+    """Planillas de los directorios, patrones glob o archivos indicados, sin repetir y ordenadas."""
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            for pattern in WORKBOOK_PATTERNS:
+                paths.update(glob.glob(os.path.join(item, pattern)))
+        else:
+            paths.update(glob.glob(item, recursive=True) or ([item] if os.path.isfile(item) else []))
+    # Los archivos temporales de Excel (~$...) no son planillas
+    return sorted(os.path.abspath(p) for p in paths if not os.path.basename(p).startswith("~$"))
+
+
+def output_names(paths: list) -> dict:
+    """Carpeta de salida de cada planilla: su nombre, o nombre-hash si dos planillas se llaman igual."""
+    stems = {}
+    for path in paths:
+        stems.setdefault(os.path.splitext(os.path.basename(path))[0], []).append(path)
+    names = {}
+    for stem, group in stems.items():
+        for path in group:
+            suffix = "" if len(group) == 1 else "-" + hashlib.sha1(path.encode("utf-8")).hexdigest()[:8]
+            names[path] = stem + suffix
+    return names
+
+
+def _summary_records(summary: pd.DataFrame) -> list:
+    return summary.astype(object).where(summary.notna(), None).to_dict("records")
+
+
+def process_workbook(path: str, out_dir: str, settings: CampaignSettings, digest: str = None) -> dict:
+    """
+    Calcula, grafica e informa una planilla.
+
+    Returns:
+        dict: Registro para el índice (estado, hash, salidas, resumen por celda y ángulo).
+    """
+    record = {"archivo": path, "salida": out_dir, "estado": STATUS_ERROR, "settings": settings.digest(),
+              "fecha": settings.fecha}
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        record["hash"] = digest or file_digest(raw)
+        df = pd.read_excel(io.BytesIO(raw))
+        missing = missing_columns(df)
+        if missing:
+            raise ValueError(f"faltan las columnas {', '.join(missing)}")
+        df = drop_zero_rows(df)
+        sheet = parse_sheet(df)
+        results = compute_calibration(sheet)
+        cells = [int(c) for c in sheet.complete_cells()]
+        denominaciones = {cell: f"Celda {cell}" for cell in cells}
+
+        specs = [spec for cell in cells
+                 for spec in cell_figure_specs(results, cell, denominaciones[cell], settings.unidad, settings.tolerancia)]
+        # Ya estamos en un proceso del pool: se dibuja acá mismo. Los PNG sueltos llevan
+        # patrón y fecha; los del informe no (van en el encabezado de cada hoja)
+        pngs = render_figures(specs, cache=None, jobs=None)
+        exported = render_figures(export_specs(specs, settings.patron, settings.fecha), cache=None, jobs=None)
+        names = [plot_file_name(kind, cell, denominaciones[cell]) for cell in cells for kind in PLOT_KINDS]
+        os.makedirs(out_dir, exist_ok=True)
+        for name, png in zip(names, exported):
+            with open(os.path.join(out_dir, name), "wb") as f:
+                f.write(png)
+
+        from report_generator import ReportGenerator
+
+        errors = _ReportErrors()
+        pdf = ReportGenerator.generar_informe_pdf(
+            errors, settings.fecha, settings.patron, settings.unidad, settings.tolerancia,
+            cells, denominaciones, df, [(name, io.BytesIO(png)) for name, png in zip(names, pngs)],
+            settings.requerimiento, settings.documentacion,
+            cache=None, jobs=None,
+        )
+        if errors.messages or pdf is None:
+            raise RuntimeError("; ".join(errors.messages) or "no se pudo generar el PDF")
+        stem = os.path.basename(out_dir)
+        pdf_path = os.path.join(out_dir, f"informe_calibracion_{stem}.pdf")
+        with open(pdf_path, "wb") as f:
+            f.write(pdf.getvalue())
+
+        summary = results.summary(settings.tolerancia)
+        summary = summary[summary["celda"].isin(cells)]
+        record.update({
+            "estado": STATUS_OK,
+            "pdf": pdf_path,
+            "graficos": [os.path.join(out_dir, name) for name in names],
+            "celdas": cells,
+            "resumen": _summary_records(summary),
+        })
+        incomplete = [int(c) for c in sheet.cells if int(c) not in cells]
+        if incomplete:
+            record["mensaje"] = (f"celdas sin {' y '.join(REQUIRED_ANGLES)} omitidas: "
+                                 f"{', '.join(map(str, incomplete))}")
+    except Exception as e:
+        record["mensaje"] = f"{type(e).__name__}: {e}"
+    return record
+
+
+def load_index(out_dir: str) -> dict:
+    """Registros de la corrida anterior, por ruta de planilla."""
+    path = os.path.join(out_dir, INDEX_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return {record["archivo"]: record for record in json.load(f)}
+
+
+def _is_current(record: dict, digest: str, settings: CampaignSettings, check_fecha: bool) -> bool:
+    return (record is not None and record.get("estado") in (STATUS_OK, STATUS_SKIPPED)
+            and record.get("hash") == digest and record.get("settings") == settings.digest()
+            and (not check_fecha or record.get("fecha") == settings.fecha)
+            and os.path.exists(record.get("pdf", "")))
+
+
+def write_index(out_dir: str, records: list):
+    """Escribe `indice.json` y `resumen.csv` (una fila por planilla, celda y ángulo)."""
+    with open(os.path.join(out_dir, INDEX_FILE), "w", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False, indent=2)
+    rows = [{"archivo": record["archivo"], **row} for record in records for row in record.get("resumen", [])]
+    pd.DataFrame(rows).to_csv(os.path.join(out_dir, SUMMARY_FILE), index=False)
+
+
+def run_campaign(paths: list, out_dir: str, settings: CampaignSettings, workers: int = JOB_WORKERS,
+                 force: bool = False, check_fecha: bool = True, log=print) -> list:
+    """
+    Procesa las planillas pendientes (en paralelo si hay más de una y `workers` > 1).
+
+    Con `check_fecha` en False una planilla sin cambios se saltea aunque su
+    informe tenga otra fecha de calibración que `settings.fecha`.
+
+    Returns:
+        list: Registros de todas las planillas, en el orden de `paths`.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    previous = load_index(out_dir)
+    names = output_names(paths)
+    records = {}
+    pending = []
+    for path in paths:
+        with open(path, "rb") as f:
+            digest = file_digest(f.read())
+        record = previous.get(path)
+        if not force and _is_current(record, digest, settings, check_fecha):
+            records[path] = {**record, "estado": STATUS_SKIPPED}
+            log(f"{os.path.basename(path)}: {STATUS_SKIPPED}")
+        else:
+            pending.append((path, os.path.join(out_dir, names[path]), settings, digest))
+
+    def done(record):
+        records[record["archivo"]] = record
+        detail = f" ({record['mensaje']})" if record.get("mensaje") else ""
+        log(f"{os.path.basename(record['archivo'])}: {record['estado']}{detail}")
+
+    try:
+        if workers > 1 and len(pending) > 1:
+            _run_in_pool(pending, workers, done)
+        # Las que el pool no llegó a procesar (o todas, sin pool) se procesan en el mismo hilo
+        for args in pending:
+            if args[0] not in records:
+                done(process_workbook(*args))
+    finally:
+        # Aun si la campaña se interrumpe, el índice conserva las planillas ya procesadas
+        # (y, de las que faltan, el registro de la corrida anterior)
+        ordered = [records.get(path) or previous[path] for path in paths if path in records or path in previous]
+        write_index(out_dir, ordered)
+    return ordered
+
+
+def _run_in_pool(pending: list, workers: int, done):
+    """
+    Procesa las planillas en un pool de procesos; si el pool falla (un proceso
+    caído por falta de memoria, un error al importar en el proceso nuevo), deja
+    las planillas sin resultado para que `run_campaign` las procese en el mismo hilo.
+    """
+    try:
+        # "spawn" como en jobs.py: cada proceso importa matplotlib y reportlab una sola vez
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending)),
+                                 mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = [executor.submit(process_workbook, *args) for args in pending]
+            for future in as_completed(futures):
+                try:
+                    record = future.result()
+                except Exception:
+                    continue
+                done(record)
+    except Exception:
+        pass
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Procesa una campaña de planillas de calibración sin interfaz.")
+    parser.add_argument("inputs", nargs="+", help="Directorios, patrones glob o planillas .xlsx.")
+    parser.add_argument("-o", "--output", default="informes_calibracion", help="Directorio de salida.")
+    parser.add_argument("--patron", default=CampaignSettings.patron, help="Denominación del patrón.")
+    parser.add_argument("--fecha", default=None, help="Fecha de calibración (dd/mm/aaaa; por defecto, la de hoy para las planillas "
+                             "nuevas o modificadas, sin reprocesar las que no cambiaron).")
+    parser.add_argument("--unidad", default=CampaignSettings.unidad, choices=["kgf", "lbf", "N", "daN"])
+    parser.add_argument("--tolerancia", type=float, default=CampaignSettings.tolerancia,
+                        help="Límite de tolerancia relativo (%%).")
+    parser.add_argument("--requerimiento", default=CampaignSettings.requerimiento)
+    parser.add_argument("--documentacion", default=CampaignSettings.documentacion)
+    parser.add_argument("--workers", type=int, default=JOB_WORKERS, help="Procesos en paralelo (1 = sin pool).")
+    parser.add_argument("--force", action="store_true", help="Reprocesa también las planillas sin cambios.")
+    args = parser.parse_args(argv)
+
+    paths = find_workbooks(args.inputs)
+    if not paths:
+        print("No se encontraron planillas.", file=sys.stderr)
+        return 1
+    settings = CampaignSettings(
+        patron=args.patron,
+        fecha=args.fecha or date.today().strftime("%d/%m/%Y"),
+        unidad=args.unidad,
+        tolerancia=args.tolerancia,
+        requerimiento=args.requerimiento,
+        documentacion=args.documentacion,
+    )
+    records = run_campaign(paths, args.output, settings, workers=args.workers, force=args.force,
+                           check_fecha=args.fecha is not None)
+    counts = {status: sum(r["estado"] == status for r in records) for status in (STATUS_OK, STATUS_SKIPPED, STATUS_ERROR)}
+    print(f"{len(records)} planillas: {counts[STATUS_OK]} procesadas, {counts[STATUS_SKIPPED]} sin cambios, "
+          f"{counts[STATUS_ERROR]} con error. Resumen en {os.path.join(args.output, SUMMARY_FILE)}")
+    return 1 if counts[STATUS_ERROR] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
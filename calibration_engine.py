@@ -0,0 +1,302 @@
+"""
+Cálculos de calibración de celdas de carga sin Streamlit.
+
+La planilla tiene un par de columnas `PAT<celda>_<ángulo>` / `DUT<celda>_<ángulo>`
+por celda y condición de ensayo: `0` (carga a 0°), `R` (descarga a 0°) y, para
+excentricidad, cualquier otro ángulo de carga (`120`, `240`, ...). Las filas
+son los escalones de carga.
+
+`parse_sheet` arma arreglos (celda, ángulo, punto) con NaN donde falta una
+columna o un valor, y `compute_calibration` calcula de una vez para todas las
+celdas y ángulos:
+
+- error absoluto (DUT - PAT) y relativo (% del patrón);
+- coeficiente de correlación de Pearson entre PAT y DUT;
+- ajuste cúbico del error relativo en función del patrón;
+- por punto: reversibilidad (error de descarga menos error de carga a 0°) y
+  excentricidad (rango del error relativo entre las series de carga a
+  distintos ángulos).
+
+La planilla tiene una sola serie por ángulo, así que no alcanza para estimar
+la repetibilidad (series repetidas en la misma posición).
+
+Una campaña de 40 celdas y 6 ángulos se procesa en milisegundos.
+"""
+import math
+import re
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+COLUMN_PATTERN = re.compile(r"^PAT(\d+)_(\w+)$")
+LOAD_ANGLE = "0"
+UNLOAD_ANGLE = "R"
+REQUIRED_ANGLES = (LOAD_ANGLE, UNLOAD_ANGLE)
+# Columnas mínimas de una planilla: carga y descarga de la celda 1
+REQUIRED_COLUMNS = ["PAT1_0", "DUT1_0", "PAT1_R", "DUT1_R"]
+FIT_DEGREE = 3
+
+ANGLE_LABELS = {"0": "Carga 0°", "R": "Descarga 0°"}
+ANGLE_CODES = {"0": "L0°", "R": "U0°"}
+
+
+def angle_label(angle: str) -> str:
+    """Nombre de la condición de ensayo para leyendas ("Carga 120°")."""
+    if angle in ANGLE_LABELS:
+        return ANGLE_LABELS[angle]
+    return f"Carga {angle}°" if angle.isdigit() else angle
+
+
+def angle_code(angle: str) -> str:
+    """Abreviatura para encabezados de tabla ("L120°")."""
+    if angle in ANGLE_CODES:
+        return ANGLE_CODES[angle]
+    return f"L{angle}°" if angle.isdigit() else angle
+
+
+def _angle_order(angle: str):
+    # 0 y R primero, luego los ángulos numéricos en orden y al final el resto
+    if angle in REQUIRED_ANGLES:
+        return (0, REQUIRED_ANGLES.index(angle), "")
+    if angle.isdigit():
+        return (1, int(angle), "")
+    return (2, 0, angle)
+
+
+@dataclass
+class CalibrationSheet:
+    """Planilla de calibración como arreglos (celda, ángulo, punto)."""
+    cells: np.ndarray
+    angles: list
+    pat: np.ndarray
+    dut: np.ndarray
+    present: np.ndarray
+
+    @property
+    def n_points(self) -> int:
+        return self.pat.shape[2]
+
+    def cell_position(self, cell: int) -> int:
+        return int(np.flatnonzero(self.cells == cell)[0])
+
+    def angles_of(self, cell: int) -> list:
+        """Ángulos con par PAT/DUT presente para la celda."""
+        row = self.present[self.cell_position(cell)]
+        return [angle for angle, ok in zip(self.angles, row) if ok]
+
+    def complete_cells(self) -> list:
+        """Celdas que tienen las series de carga y descarga a 0°."""
+        required = [self.angles.index(a) for a in REQUIRED_ANGLES if a in self.angles]
+        if len(required) < len(REQUIRED_ANGLES):
+            return []
+        return [int(c) for c, row in zip(self.cells, self.present) if row[required].all()]
+
+
+def missing_columns(df: pd.DataFrame) -> list:
+    """Columnas obligatorias que faltan en la planilla."""
+    return [col for col in REQUIRED_COLUMNS if col not in df.columns]
+
+
+def drop_zero_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """Quita las filas con cero en todas las columnas obligatorias (el punto de carga nula)."""
+    return df.loc[~(df[REQUIRED_COLUMNS] == 0).all(axis=1)]
+
+
+def parse_sheet(df: pd.DataFrame) -> CalibrationSheet:
+    """
+    Convierte una planilla de calibración a arreglos (celda, ángulo, punto).
+
+    Se consideran los pares PAT/DUT presentes; las columnas no numéricas se
+    convierten con `pd.to_numeric` (los textos quedan como NaN).
+    """
+    pairs = {}
+    for col in df.columns:
+        match = COLUMN_PATTERN.match(str(col))
+        if match and f"DUT{match.group(1)}_{match.group(2)}" in df.columns:
+            pairs[(int(match.group(1)), match.group(2))] = col
+    cells = np.array(sorted({cell for cell, _ in pairs}), dtype=int)
+    angles = sorted({angle for _, angle in pairs}, key=_angle_order)
+    shape = (len(cells), len(angles), len(df))
+    pat = np.full(shape, np.nan)
+    dut = np.full(shape, np.nan)
+    present = np.zeros(shape[:2], dtype=bool)
+    if pairs:
+        cell_pos = {cell: i for i, cell in enumerate(cells)}
+        angle_pos = {angle: j for j, angle in enumerate(angles)}
+        keys = list(pairs)
+        pat_cols = [f"PAT{cell}_{angle}" for cell, angle in keys]
+        dut_cols = [f"DUT{cell}_{angle}" for cell, angle in keys]
+        block = df[pat_cols + dut_cols]
+        non_numeric = [col for col, dtype in block.dtypes.items() if not pd.api.types.is_numeric_dtype(dtype)]
+        if non_numeric:
+            block = block.assign(**{col: pd.to_numeric(block[col], errors="coerce") for col in non_numeric})
+        values = block.to_numpy(dtype=float).T
+        ci = np.array([cell_pos[cell] for cell, _ in keys])
+        ai = np.array([angle_pos[angle] for _, angle in keys])
+        pat[ci, ai] = values[:len(keys)]
+        dut[ci, ai] = values[len(keys):]
+        present[ci, ai] = True
+    return CalibrationSheet(cells=cells, angles=angles, pat=pat, dut=dut, present=present)
+
+
+def pearson(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Correlación de Pearson a lo largo del último eje, con los pares completos (como pandas)."""
+    valid = np.isfinite(x) & np.isfinite(y)
+    n = valid.sum(axis=-1)
+    x0 = np.where(valid, x, 0.0)
+    y0 = np.where(valid, y, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mx = x0.sum(axis=-1) / n
+        my = y0.sum(axis=-1) / n
+        dx = np.where(valid, x - mx[..., None], 0.0)
+        dy = np.where(valid, y - my[..., None], 0.0)
+        r = (dx * dy).sum(axis=-1) / np.sqrt((dx * dx).sum(axis=-1) * (dy * dy).sum(axis=-1))
+    return np.where(n >= 2, r, np.nan)
+
+
+def polyfit_batched(x: np.ndarray, y: np.ndarray, degree: int = FIT_DEGREE) -> np.ndarray:
+    """
+    Ajuste polinómico por mínimos cuadrados de cada serie del último eje.
+
+    Equivale a `np.polyfit(x[valid], y[valid], degree)` serie por serie; las
+    series con menos de `degree + 1` puntos válidos quedan en NaN. X se
+    escala a [-1, 1] en cada serie para que el sistema esté bien condicionado.
+
+    Returns:
+        np.ndarray: Coeficientes (..., degree + 1), de mayor a menor grado.
+    """
+    if x.shape[-1] <= degree:
+        return np.full(x.shape[:-1] + (degree + 1,), np.nan)
+    valid = np.isfinite(x) & np.isfinite(y)
+    n = valid.sum(axis=-1)
+    lo = np.where(valid, x, np.inf).min(axis=-1)
+    hi = np.where(valid, x, -np.inf).max(axis=-1)
+    ok = (n > degree) & (hi > lo)
+    center = np.where(ok, (hi + lo) / 2, 0.0)
+    scale = np.where(ok, (hi - lo) / 2, 1.0)
+    t = np.where(valid, (x - center[..., None]) / scale[..., None], 0.0)
+    powers = np.arange(degree + 1)
+    # Filas inválidas en cero: no aportan a los mínimos cuadrados
+    vander = np.where(valid[..., None], t[..., None] ** powers, 0.0)
+    rhs = np.where(valid, y, 0.0)
+    q, r = np.linalg.qr(vander)
+    eye = np.eye(degree + 1)
+    r = np.where(ok[..., None, None], r, eye)
+    rhs_q = np.einsum("...pk,...p->...k", q, rhs)
+    scaled = np.linalg.solve(r, rhs_q[..., None])[..., 0]
+    # De la base escalada (t = (x - c) / s) a potencias de x
+    k, j = np.meshgrid(powers, powers, indexing="ij")
+    binom = np.array([[math.comb(kk, jj) for jj in powers] for kk in powers], dtype=float)
+    exponent = np.clip(k - j, 0, None)
+    shift = binom * (-center[..., None, None]) ** exponent / scale[..., None, None] ** k
+    coefs = np.einsum("...k,...kj->...j", scaled, shift)
+    coefs = np.where(ok[..., None], coefs, np.nan)
+    return coefs[..., ::-1]
+
+
+def _load_angle_mask(angles) -> np.ndarray:
+    return np.array([angle != UNLOAD_ANGLE for angle in angles])
+
+
+@dataclass
+class CalibrationResults:
+    """Resultados de una planilla; los arreglos siguen el orden (celda, ángulo, punto) de `sheet`."""
+    sheet: CalibrationSheet
+    abs_error: np.ndarray
+    rel_error: np.ndarray
+    pearson: np.ndarray
+    fit: np.ndarray
+    reversibility: np.ndarray
+    eccentricity: np.ndarray
+
+    def series(self, cell: int, angle: str) -> dict:
+        """Datos de una celda y ángulo: pat, dut, abs_error, rel_error (%), pearson y fit."""
+        c = self.sheet.cell_position(cell)
+        a = self.sheet.angles.index(angle)
+        return {
+            "pat": self.sheet.pat[c, a],
+            "dut": self.sheet.dut[c, a],
+            "abs_error": self.abs_error[c, a],
+            "rel_error": self.rel_error[c, a],
+            "pearson": float(self.pearson[c, a]),
+            "fit": self.fit[c, a],
+        }
+
+    def fit_curve(self, cell: int, angle: str, n_points: int = 200):
+        """Curva del ajuste cúbico sobre el rango del patrón, o None si no hay ajuste."""
+        data = self.series(cell, angle)
+        pat = data["pat"][np.isfinite(data["pat"])]
+        if not np.isfinite(data["fit"]).all() or len(pat) == 0:
+            return None
+        x = np.linspace(pat.min(), pat.max(), n_points)
+        return x, np.polyval(data["fit"], x)
+
+    def cell_metrics(self, cell: int) -> dict:
+        """Máximos (en valor absoluto, en puntos %) de reversibilidad y excentricidad."""
+        c = self.sheet.cell_position(cell)
+        return {
+            "reversibilidad_max": _nanmax_abs(self.reversibility[c]),
+            "excentricidad_max": _nanmax_abs(self.eccentricity[c]),
+        }
+
+    def summary(self, tolerance: float = None) -> pd.DataFrame:
+        """
+        Resumen por celda y ángulo: Pearson, error relativo máximo y, por
+        celda, los máximos de reversibilidad y excentricidad.
+        """
+        rows = []
+        max_rel = np.where(np.isfinite(self.rel_error), np.abs(self.rel_error), -np.inf).max(axis=-1)
+        for c, cell in enumerate(self.sheet.cells):
+            cell_metrics = self.cell_metrics(cell)
+            for a, angle in enumerate(self.sheet.angles):
+                if not self.sheet.present[c, a]:
+                    continue
+                row = {
+                    "celda": int(cell),
+                    "angulo": angle,
+                    "pearson": self.pearson[c, a],
+                    "error_rel_max": max_rel[c, a] if max_rel[c, a] >= 0 else np.nan,
+                    **cell_metrics,
+                }
+                if tolerance is not None:
+                    row["dentro_tolerancia"] = bool(row["error_rel_max"] <= tolerance)
+                rows.append(row)
+        return pd.DataFrame(rows)
+
+
+def _nanmax_abs(values: np.ndarray) -> float:
+    values = np.abs(values[np.isfinite(values)])
+    return float(values.max()) if len(values) else np.nan
+
+
+def compute_calibration(sheet: CalibrationSheet) -> CalibrationResults:
+    """Calcula errores, correlaciones, ajustes y métricas de todas las celdas y ángulos."""
+    abs_error = sheet.dut - sheet.pat
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rel_error = np.where(sheet.pat != 0, abs_error / sheet.pat * 100, np.nan)
+
+    shape = sheet.pat.shape
+    reversibility = np.full((shape[0], shape[2]), np.nan)
+    if LOAD_ANGLE in sheet.angles and UNLOAD_ANGLE in sheet.angles:
+        reversibility = (rel_error[:, sheet.angles.index(UNLOAD_ANGLE)]
+                         - rel_error[:, sheet.angles.index(LOAD_ANGLE)])
+
+    load = rel_error[:, _load_angle_mask(sheet.angles)]
+    n_load = np.isfinite(load).sum(axis=1)
+    with warnings.catch_warnings():
+        # Puntos sin al menos dos series de carga: quedan en NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        eccentricity = np.where(n_load >= 2, np.nanmax(load, axis=1) - np.nanmin(load, axis=1), np.nan)
+
+    return CalibrationResults(
+        sheet=sheet,
+        abs_error=abs_error,
+        rel_error=rel_error,
+        pearson=pearson(sheet.pat, sheet.dut),
+        fit=polyfit_batched(sheet.pat, rel_error),
+        reversibility=reversibility,
+        eccentricity=eccentricity,
+    )
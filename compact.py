@@ -0,0 +1,168 @@
+"""
+Representación compacta de datasets numéricos.
+
+Cada columna se guarda de la forma más chica que la representa:
+
+- columnas constantes (por ejemplo un canal F2 en cero) como un escalar;
+- contadores (por ejemplo `n`) como (inicio, paso);
+- enteros con el menor tipo entero que contiene su rango;
+- flotantes como float32 si el error de redondeo no supera una tolerancia
+  relativa al rango de la columna. En columnas crecientes (ejes de tiempo)
+  además el error debe ser menor al 1% del paso típico, de modo que un `ts`
+  en milisegundos de un ensayo largo se conserva en float64.
+
+Al reconstruir el DataFrame las columnas constantes son vistas de un único
+valor (stride 0), sin memoria por fila.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_TOLERANCE = 1e-4
+INTEGER_TYPES = (np.int8, np.int16, np.int32, np.int64)
+MONOTONIC_STEP_FRACTION = 0.01
+
+
+@dataclass(frozen=True)
+class ConstantColumn:
+    """Columna con un único valor."""
+    value: object
+    dtype: np.dtype
+
+
+@dataclass(frozen=True)
+class RangeColumn:
+    """Columna en progresión aritmética: start + step * i."""
+    start: object
+    step: object
+    dtype: np.dtype
+
+
+@dataclass
+class CompactFrame:
+    """DataFrame numérico en representación compacta."""
+    parts: dict
+    n_rows: int
+    original_nbytes: int
+
+    @property
+    def columns(self) -> list:
+        return list(self.parts)
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por la representación compacta."""
+        return sum(part.nbytes if isinstance(part, np.ndarray) else 16 for part in self.parts.values())
+
+    @property
+    def frame_nbytes(self) -> int:
+        """
+        Memoria de la representación compacta más la del DataFrame reconstruido:
+        los arrays se comparten y las constantes no ocupan memoria por fila, solo
+        los contadores se materializan.
+        """
+        return self.nbytes + sum(
+            self.n_rows * part.dtype.itemsize for part in self.parts.values() if isinstance(part, RangeColumn))
+
+    @property
+    def ratio(self) -> float:
+        """Factor de reducción respecto del DataFrame original."""
+        return self.original_nbytes / max(self.nbytes, 1)
+
+    def column(self, name) -> np.ndarray:
+        """Reconstruye una columna (las constantes como vista de solo lectura)."""
+        part = self.parts[name]
+        if isinstance(part, ConstantColumn):
+            return np.broadcast_to(np.asarray(part.value, dtype=part.dtype), (self.n_rows,))
+        if isinstance(part, RangeColumn):
+            return (part.start + part.step * np.arange(self.n_rows)).astype(part.dtype)
+        return part
+
+    def to_frame(self) -> pd.DataFrame:
+        """Reconstruye el DataFrame sin copiar las columnas guardadas como arrays."""
+        return pd.DataFrame({name: self.column(name) for name in self.parts}, copy=False)
+
+    def describe_parts(self) -> dict:
+        """Representación elegida para cada columna (para informar en la interfaz)."""
+        kinds = {}
+        for name, part in self.parts.items():
+            if isinstance(part, ConstantColumn):
+                kinds[name] = f"constante ({part.value})"
+            elif isinstance(part, RangeColumn):
+                kinds[name] = f"contador ({part.start}, paso {part.step})"
+            else:
+                kinds[name] = part.dtype.name
+        return kinds
+
+
+def _smallest_integer_type(values: np.ndarray):
+    """Menor tipo entero que contiene el rango de `values`."""
+    lo, hi = values.min(), values.max()
+    for dtype in INTEGER_TYPES:
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return dtype
+    return values.dtype.type
+
+
+def compact_column(values: np.ndarray, tolerance: float = DEFAULT_TOLERANCE):
+    """
+    Elige la representación más chica de una columna numérica.
+
+    Args:
+        values (np.ndarray): Valores de la columna.
+        tolerance (float): Error máximo admitido al pasar a float32, relativo al rango de la columna.
+
+    Returns:
+        np.ndarray | ConstantColumn | RangeColumn: Representación compacta.
+    """
+    values = np.asarray(values)
+    n = len(values)
+    if n == 0:
+        return values
+    is_float = np.issubdtype(values.dtype, np.floating)
+    has_nan = is_float and np.isnan(values).any()
+    if has_nan:
+        finite = values[np.isfinite(values)]
+        if len(finite) == 0:
+            return ConstantColumn(np.nan, values.dtype)
+    else:
+        first = values[0]
+        if (values == first).all():
+            return ConstantColumn(first.item(), values.dtype)
+        if n > 2:
+            step = values[1] - values[0]
+            if np.array_equal(values[0] + step * np.arange(n), values):
+                dtype = values.dtype if is_float else _smallest_integer_type(values[[0, -1]])
+                return RangeColumn(values[0].item(), step.item(), np.dtype(dtype))
+
+    if not is_float:
+        return values.astype(_smallest_integer_type(values), copy=False)
+
+    finite = values[np.isfinite(values)] if has_nan else values
+    as_float32 = values.astype(np.float32)
+    value_range = float(finite.max() - finite.min())
+    with np.errstate(invalid="ignore"):
+        error = np.nanmax(np.abs(as_float32.astype(np.float64) - values))
+    if not (np.isfinite(error) and error <= tolerance * value_range):
+        return values
+    if not has_nan:
+        steps = np.diff(values)
+        if (steps >= 0).all() and (steps > 0).any() and error > MONOTONIC_STEP_FRACTION * np.median(steps[steps > 0]):
+            return values
+    return as_float32
+
+
+def compact_frame(df: pd.DataFrame, tolerance: float = DEFAULT_TOLERANCE) -> CompactFrame:
+    """
+    Convierte un DataFrame numérico a su representación compacta.
+
+    Args:
+        df (pd.DataFrame): Datos numéricos.
+        tolerance (float): Error máximo admitido al pasar a float32, relativo al rango de cada columna.
+    """
+    parts = {str(col): compact_column(df[col].to_numpy(), tolerance) for col in df.columns}
+    original = int(df.memory_usage(index=False, deep=True).sum())
+    return CompactFrame(parts=parts, n_rows=len(df), original_nbytes=original)
@@ -2,8 +2,12 @@ from typing import Literal
 
 import streamlit as st
 
+from profiling import begin_rerun
+
 
 def page_config(title, icon, layout: Literal["centered", "wide"] = "centered"):
+    # Cada ejecución de la página abre una traza de tiempos (ver profiling.py)
+    begin_rerun(title)
     st.set_page_config(
         layout=layout,
         page_title=title,
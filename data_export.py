@@ -0,0 +1,130 @@
+"""
+Exportación por bloques de datasets del almacenamiento columnar.
+
+Las transformaciones de descarga (inicio en cero, escalado y redondeo) se
+aplican bloque por bloque mientras se escribe el archivo en un
+SpooledTemporaryFile (en memoria hasta `SPOOL_MAX_BYTES`, luego en disco), así
+que armar el archivo nunca copia el dataset completo ni su versión
+transformada. La exportación se arma recién cuando el usuario hace clic en
+descargar, pasando una función a `st.download_button(data=...)`; al servirla,
+Streamlit lee el archivo terminado una vez en memoria para enviarlo.
+"""
+import gzip
+import io
+import tempfile
+from dataclasses import dataclass
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+EXPORT_CHUNK_ROWS = 100_000
+SPOOL_MAX_BYTES = 32 * 1024 * 1024
+
+# Formato -> (extensión, tipo MIME)
+EXPORT_FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "CSV (gzip)": (".csv.gz", "application/gzip"),
+}
+if pq is not None:
+    EXPORT_FORMATS["Parquet"] = (".parquet", "application/vnd.apache.parquet")
+
+
+@dataclass
+class ExportTransform:
+    """Transformaciones aplicadas a cada bloque antes de escribirlo."""
+    start_zero: bool = False
+    scale_time: float = 1.0
+    scale_rest: float = 1.0
+    decimals: int = None
+
+    def apply(self, chunk, x_origin: float = 0.0):
+        """
+        Aplica las transformaciones a un bloque; la primera columna es el eje X.
+
+        Args:
+            chunk (pd.DataFrame): Bloque a transformar (no se modifica).
+            x_origin (float): Mínimo global de X, restado si `start_zero`.
+        """
+        if len(chunk.columns) == 0:
+            return chunk
+        x_col = chunk.columns[0]
+        x = chunk[x_col]
+        if self.start_zero:
+            x = x - x_origin
+        columns = {x_col: x * self.scale_time}
+        for col in chunk.columns[1:]:
+            columns[col] = chunk[col] * self.scale_rest
+        result = pd.DataFrame(columns, index=chunk.index)
+        return result.round(self.decimals) if self.decimals is not None else result
+
+
+def export_file_name(base_name: str, fmt: str) -> str:
+    """Reemplaza la extensión de `base_name` por la del formato elegido."""
+    stem = base_name.rsplit(".", 1)[0] if "." in base_name else base_name
+    return stem + EXPORT_FORMATS[fmt][0]
+
+
+def write_export(handle, fmt: str = "CSV", transform: ExportTransform = None,
+                 chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """
+    Escribe el dataset de `handle` en el formato pedido, bloque por bloque.
+
+    Args:
+        handle (DatasetHandle): Dataset del almacenamiento columnar.
+        fmt (str): Formato de salida (ver EXPORT_FORMATS).
+        transform (ExportTransform, optional): Transformaciones por bloque.
+        chunk_rows (int): Filas por bloque.
+
+    Returns:
+        tempfile.SpooledTemporaryFile: Archivo posicionado al comienzo.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportación desconocido: {fmt}")
+    transform = transform or ExportTransform()
+    x_origin = 0.0
+    if transform.start_zero and handle.columns:
+        x_origin = handle.column(handle.columns[0]).min()
+
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    # Sin filas se escribe igual un bloque vacío: el CSV lleva el encabezado y el Parquet el esquema
+    blocks = handle.iter_chunks(chunk_rows) if handle.n_rows else [handle.load_rows(0, 0)]
+    chunks = (transform.apply(chunk, x_origin) for chunk in blocks)
+    if fmt == "Parquet":
+        writer = None
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(spool, table.schema)
+            writer.write_table(table)
+        if writer is not None:
+            writer.close()
+    else:
+        raw = gzip.GzipFile(fileobj=spool, mode="wb") if fmt == "CSV (gzip)" else spool
+        text = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(text, header=i == 0, index=False)
+        text.flush()
+        text.detach()
+        if raw is not spool:
+            raw.close()
+    spool.seek(0)
+    return spool
+
+
+def lazy_export(handle, fmt: str = "CSV", transform: ExportTransform = None,
+                chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """
+    Devuelve una función que genera el archivo exportado al ser llamada (para st.download_button).
+
+    La función devuelve el archivo temporal posicionado al comienzo, no sus
+    bytes: quien lo recibe lo lee y el archivo se libera al descartarlo.
+    """
+    def generate():
+        return write_export(handle, fmt, transform, chunk_rows)
+    return generate
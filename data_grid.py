@@ -0,0 +1,120 @@
+"""
+Vista paginada de DataFrames grandes.
+
+En lugar de enviar el DataFrame completo al navegador, se envía solo la
+ventana de filas visible (offset, limit). El orden y el filtro se resuelven en
+el servidor como un arreglo de posiciones, que se memoriza por dataset para que
+pasar de página no vuelva a ordenar.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data_loader import DERIVED_CACHE
+
+
+PAGE_SIZES = [25, 50, 100, 500]
+NO_SORT = "(sin orden)"
+NO_FILTER = "(sin filtro)"
+
+
+def window_positions(df: pd.DataFrame, sort_by=None, ascending: bool = True, filter_col=None,
+                     lower=None, upper=None) -> np.ndarray:
+    """
+    Devuelve las posiciones de las filas que cumplen el filtro, en el orden pedido.
+
+    Args:
+        df (pd.DataFrame): Datos de origen.
+        sort_by (str, optional): Columna por la que ordenar.
+        ascending (bool): Orden ascendente o descendente (los NaN quedan al final).
+        filter_col (str, optional): Columna numérica a filtrar por rango.
+        lower, upper (float, optional): Límites inclusivos del filtro.
+    """
+    if sort_by is not None:
+        column = df[sort_by].reset_index(drop=True)
+        positions = column.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+    else:
+        positions = np.arange(len(df))
+
+    if filter_col is not None:
+        values = df[filter_col].to_numpy()
+        mask = np.ones(len(df), dtype=bool)
+        if lower is not None:
+            mask &= values >= lower
+        if upper is not None:
+            mask &= values <= upper
+        positions = positions[mask[positions]]
+    return positions
+
+
+def fetch_window(df: pd.DataFrame, offset: int, limit: int, sort_by=None, ascending: bool = True,
+                 filter_col=None, lower=None, upper=None, data_key=None):
+    """
+    Devuelve una ventana de filas y la cantidad total de filas que cumplen el filtro.
+
+    Si se indica `data_key`, las posiciones ordenadas/filtradas se memorizan en
+    la caché de resultados derivados.
+
+    Returns:
+        tuple: (DataFrame con a lo sumo `limit` filas, total de filas).
+    """
+    args = (sort_by, ascending, filter_col, lower, upper)
+    if sort_by is None and filter_col is None:
+        positions = None
+    elif data_key is not None:
+        positions = DERIVED_CACHE.get_or_compute(
+            (data_key, "grid", args),
+            lambda: window_positions(df, *args),
+            nbytes=lambda result: result.nbytes,
+        )
+    else:
+        positions = window_positions(df, *args)
+
+    if positions is None:
+        return df.iloc[offset:offset + limit], len(df)
+    return df.iloc[positions[offset:offset + limit]], len(positions)
+
+
+def show_data_grid(df: pd.DataFrame, key: str, data_key=None, page_size: int = 50):
+    """
+    Muestra una vista paginada de `df` con orden y filtro por rango del lado del servidor.
+
+    Args:
+        df (pd.DataFrame): Datos a mostrar.
+        key (str): Prefijo único para las claves de los widgets.
+        data_key (str, optional): Clave del dataset para memorizar el orden y el filtro.
+        page_size (int): Filas por página iniciales.
+    """
+    columns = [str(col) for col in df.columns]
+    numeric_columns = [str(col) for col in df.select_dtypes(include=[np.number]).columns]
+    col_sort, col_dir, col_filter, col_lower, col_upper = st.columns([2, 1, 2, 1, 1])
+    sort_by = col_sort.selectbox("Ordenar por", [NO_SORT] + columns, key=f"{key}_grid_sort")
+    ascending = col_dir.radio("Orden", ["Asc", "Desc"], horizontal=True, key=f"{key}_grid_dir") == "Asc"
+    filter_col = col_filter.selectbox("Filtrar columna", [NO_FILTER] + numeric_columns, key=f"{key}_grid_filter")
+    lower = upper = None
+    if filter_col != NO_FILTER:
+        lower = col_lower.number_input("Mínimo", value=None, key=f"{key}_grid_lower")
+        upper = col_upper.number_input("Máximo", value=None, key=f"{key}_grid_upper")
+
+    col_page, col_size, col_info = st.columns([1, 1, 4], vertical_alignment="bottom")
+    limit = col_size.selectbox(
+        "Filas por página", PAGE_SIZES,
+        index=PAGE_SIZES.index(page_size) if page_size in PAGE_SIZES else 0,
+        key=f"{key}_grid_size",
+    )
+    page = col_page.number_input("Página", min_value=1, value=1, step=1, key=f"{key}_grid_page")
+
+    sort_col = df.columns[columns.index(sort_by)] if sort_by != NO_SORT else None
+    filter_name = df.columns[columns.index(filter_col)] if filter_col != NO_FILTER else None
+    query = dict(sort_by=sort_col, ascending=ascending, filter_col=filter_name, lower=lower, upper=upper,
+                 data_key=data_key)
+    page = int(page)
+    window, total = fetch_window(df, (page - 1) * limit, limit, **query)
+    n_pages = max(-(-total // limit), 1)
+    if page > n_pages:
+        # El filtro dejó menos páginas: se muestra la última
+        page = n_pages
+        window, total = fetch_window(df, (page - 1) * limit, limit, **query)
+    first = (page - 1) * limit
+    col_info.caption(f"Filas {min(first + 1, total):,}–{min(first + limit, total):,} de {total:,} (página {page} de {n_pages})")
+    st.dataframe(window)
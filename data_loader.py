@@ -0,0 +1,414 @@
+"""
+Carga de archivos de datos (CSV/Excel) con caché compartida entre sesiones.
+
+Streamlit re-ejecuta la página completa con cada interacción; este módulo se
+importa una sola vez por proceso, así que la caché sobrevive a los reruns y se
+comparte entre todos los usuarios del servidor.
+"""
+import csv
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from compact import DEFAULT_TOLERANCE, CompactFrame, compact_frame
+from session_store import DatasetHandle, open_handle, store_frame
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+DEFAULT_CACHE_BYTES = 512 * 1024 * 1024
+EXCEL_EXTENSIONS = (".xlsx", ".xls")
+SNIFF_BYTES = 64 * 1024
+CANDIDATE_DELIMITERS = "\t;|, "
+
+
+def file_digest(raw: bytes) -> str:
+    """Devuelve el hash SHA-1 del contenido de un archivo."""
+    return hashlib.sha1(raw).hexdigest()
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """Devuelve la memoria ocupada por un DataFrame, índice incluido."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def monotonic_columns(df: pd.DataFrame) -> tuple:
+    """
+    Devuelve las columnas numéricas no decrecientes y sin NaN (por ejemplo, `ts`).
+
+    Sobre estas columnas una selección por rango se resuelve con búsqueda binaria.
+    """
+    columns = []
+    for col in df.columns:
+        values = df[col].to_numpy()
+        if len(values) and np.issubdtype(values.dtype, np.number) and not np.isnan(values[[0, -1]]).any() \
+                and (values[1:] >= values[:-1]).all():
+            columns.append(col)
+    return tuple(columns)
+
+
+class IngestionCache:
+    """
+    Caché LRU de DataFrames ya parseados, con límite de memoria.
+
+    Las entradas se indexan por hash del contenido del archivo y opciones de
+    parseo. Los DataFrames devueltos se comparten entre sesiones y no deben
+    modificarse in-place.
+    """
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """Devuelve el valor asociado a `key` (o None) y lo marca como reciente."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, nbytes: int = None):
+        """
+        Guarda un valor y desaloja los menos usados si se supera el límite.
+
+        Si `nbytes` no se indica, `value` debe ser un DataFrame y se mide su memoria.
+        """
+        size = frame_nbytes(value) if nbytes is None else nbytes
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                # Un único archivo mayor al límite no se cachea
+                return
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, old_size) = self._entries.popitem(last=False)
+                self.total_bytes -= old_size
+
+    def get_or_compute(self, key, compute, nbytes=None):
+        """
+        Devuelve el valor cacheado para `key` o lo calcula con `compute()` y lo guarda.
+
+        Args:
+            key: Clave del resultado.
+            compute (callable): Función sin argumentos que produce el valor.
+            nbytes (int | callable, optional): Tamaño del valor, o función que lo calcula a partir del valor.
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            size = nbytes(value) if callable(nbytes) else nbytes
+            self.put(key, value, nbytes=size)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+
+INGESTION_CACHE = IngestionCache()
+# Resultados derivados de un dataset (estadísticas, filtros, figuras...), indexados por su clave
+DERIVED_CACHE = IngestionCache(max_bytes=128 * 1024 * 1024)
+
+
+@dataclass
+class CsvFormat:
+    """Formato de un archivo de texto detectado a partir de una muestra."""
+    delimiter: str
+    decimal: str
+    header: bool
+    encoding: str
+
+
+@dataclass
+class ParsedFile:
+    """DataFrame numérico y estadísticas del parseo que lo produjo."""
+    data: pd.DataFrame
+    engine: str
+    parse_seconds: float
+    csv_format: CsvFormat = None
+    handle: DatasetHandle = None
+    sorted_columns: tuple = ()
+    compact: CompactFrame = None
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.data)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.n_rows / self.parse_seconds if self.parse_seconds > 0 else float("inf")
+
+
+@dataclass
+class LoadedDataset:
+    """Resultado de cargar un archivo: DataFrame numérico y metadatos de la carga."""
+    key: str
+    name: str
+    data: pd.DataFrame
+    from_cache: bool
+    engine: str
+    parse_seconds: float
+    rows_per_second: float
+    handle: DatasetHandle = None
+    sorted_columns: tuple = ()
+    compact: CompactFrame = None
+
+
+def _is_number(text: str, decimal: str = ".") -> bool:
+    text = text.strip()
+    if decimal != ".":
+        text = text.replace(decimal, ".")
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def _detect_delimiter(lines: list) -> str:
+    """
+    Elige el separador que aparece un número constante de veces en todas las líneas.
+
+    Los candidatos se evalúan en orden de preferencia, de modo que un archivo con
+    punto y coma y coma decimal se detecta como separado por punto y coma.
+    """
+    for candidate in CANDIDATE_DELIMITERS:
+        if candidate == " ":
+            counts = [len(line.split()) - 1 for line in lines]
+        else:
+            counts = [len(next(csv.reader([line], delimiter=candidate))) - 1 for line in lines]
+        if not counts or min(counts) == 0:
+            continue
+        mode = max(set(counts), key=counts.count)
+        # Se toleran algunas líneas con columnas faltantes al final
+        if counts.count(mode) >= 0.9 * len(counts) or max(counts) - min(counts) <= 1:
+            return candidate
+    # Archivo de una sola columna
+    return ","
+
+
+def sniff_csv_format(sample: bytes) -> CsvFormat:
+    """
+    Detecta separador, marca decimal y encabezado a partir de los primeros KB de un archivo.
+
+    Args:
+        sample (bytes): Comienzo del archivo (se ignora la última línea, posiblemente truncada).
+
+    Returns:
+        CsvFormat: Formato detectado.
+    """
+    try:
+        text = sample.decode("utf-8")
+        encoding = "utf-8"
+    except UnicodeDecodeError:
+        text = sample.decode("latin-1")
+        encoding = "latin-1"
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(lines) > 2 and len(sample) >= SNIFF_BYTES:
+        lines = lines[:-1]
+    lines = lines[:200]
+    if not lines:
+        return CsvFormat(delimiter=",", decimal=".", header=True, encoding=encoding)
+
+    delimiter = _detect_delimiter(lines)
+    if delimiter == " ":
+        delimiter = r"\s+"
+        rows = [line.split() for line in lines]
+    else:
+        rows = list(csv.reader(lines, delimiter=delimiter))
+
+    # Coma decimal: solo es posible si el separador no es la coma
+    decimal = "."
+    data_fields = [field for row in rows[1:] for field in row if field.strip()]
+    if delimiter != "," and data_fields:
+        comma_numbers = sum(1 for f in data_fields if "," in f and _is_number(f, ","))
+        dot_numbers = sum(1 for f in data_fields if "." in f and _is_number(f))
+        if comma_numbers > dot_numbers:
+            decimal = ","
+
+    # Hay encabezado si algún campo de la primera fila no es numérico
+    # mientras que el mismo campo de la segunda fila sí lo es
+    header = True
+    if len(rows) > 1:
+        first, second = rows[0], rows[1]
+        header = any(
+            not _is_number(a, decimal) and _is_number(b, decimal)
+            for a, b in zip(first, second)
+        ) or all(not _is_number(a, decimal) for a in first if a.strip())
+    return CsvFormat(delimiter=delimiter, decimal=decimal, header=header, encoding=encoding)
+
+
+def _sample_dtypes(raw: bytes, read_kwargs: dict) -> dict:
+    """Infiere los dtypes de las columnas numéricas a partir de la muestra inicial."""
+    sample = raw[:SNIFF_BYTES]
+    if len(raw) > SNIFF_BYTES:
+        sample = sample[:sample.rfind(b"\n") + 1]
+    sample_df = pd.read_csv(io.BytesIO(sample), engine="c", **read_kwargs)
+    numeric = sample_df.select_dtypes(include=[np.number])
+    return {col: numeric[col].dtype.name for col in numeric.columns}
+
+
+def read_csv_fast(raw: bytes, csv_format: CsvFormat = None):
+    """
+    Parsea un CSV con el motor C (o pyarrow si está disponible) usando el formato detectado.
+
+    Returns:
+        tuple: (DataFrame, nombre del motor utilizado).
+    """
+    if csv_format is None:
+        csv_format = sniff_csv_format(raw[:SNIFF_BYTES])
+    read_kwargs = dict(
+        sep=csv_format.delimiter,
+        decimal=csv_format.decimal,
+        header=0 if csv_format.header else None,
+        encoding=csv_format.encoding,
+    )
+    try:
+        dtypes = _sample_dtypes(raw, read_kwargs)
+    except (ValueError, pd.errors.ParserError):
+        dtypes = {}
+
+    engines = ["c"]
+    if HAS_PYARROW and csv_format.delimiter != r"\s+":
+        engines.insert(0, "pyarrow")
+    for engine in engines:
+        # Primero con los dtypes explícitos; si el resto del archivo no respeta
+        # la muestra, se deja que pandas infiera los tipos
+        for dtype in (dtypes, None):
+            try:
+                df = pd.read_csv(io.BytesIO(raw), engine=engine, dtype=dtype or None, **read_kwargs)
+                return df, engine
+            except (ValueError, TypeError, pd.errors.ParserError):
+                continue
+    return pd.read_csv(io.BytesIO(raw), sep=None, engine="python"), "python"
+
+
+def parse_file(raw: bytes, extension: str) -> ParsedFile:
+    """Parsea el contenido de un archivo CSV/TXT o Excel y conserva solo columnas numéricas."""
+    start = time.perf_counter()
+    csv_format = None
+    if extension in EXCEL_EXTENSIONS:
+        raw_data = pd.read_excel(io.BytesIO(raw))
+        engine = "openpyxl"
+    else:
+        csv_format = sniff_csv_format(raw[:SNIFF_BYTES])
+        raw_data, engine = read_csv_fast(raw, csv_format)
+    if not csv_format or csv_format.header:
+        raw_data.columns = [str(col) for col in raw_data.columns]
+    else:
+        raw_data.columns = [f"col{i}" for i in range(raw_data.shape[1])]
+    data = raw_data.select_dtypes(include=[np.number])
+    return ParsedFile(data=data, engine=engine, parse_seconds=time.perf_counter() - start, csv_format=csv_format)
+
+
+def _parse_or_reload(raw: bytes, extension: str, key: str) -> ParsedFile:
+    """Parsea el archivo, o lo relee del almacenamiento columnar si ya fue guardado."""
+    handle = open_handle(key)
+    if handle is not None:
+        start = time.perf_counter()
+        data = handle.load()
+        parsed = ParsedFile(data=data, engine="feather", parse_seconds=time.perf_counter() - start)
+    else:
+        parsed = parse_file(raw, extension)
+        handle = store_frame(parsed.data, key=key)
+    parsed.handle = handle
+    # Índice de columnas ordenadas: se detecta una vez por archivo
+    parsed.sorted_columns = monotonic_columns(parsed.data)
+    return parsed
+
+
+def load_uploaded_file(uploaded_file, cache: IngestionCache = INGESTION_CACHE, compact: bool = False,
+                       tolerance: float = DEFAULT_TOLERANCE) -> LoadedDataset:
+    """
+    Carga un archivo subido con st.file_uploader usando la caché de ingesta.
+
+    Args:
+        uploaded_file: Objeto UploadedFile (o cualquier objeto con `name` y `getvalue()`).
+        cache (IngestionCache): Caché a utilizar.
+        compact (bool): Guardar en la caché la representación compacta (ver compact.py).
+        tolerance (float): Tolerancia de la conversión a float32 en modo compacto.
+
+    Returns:
+        LoadedDataset: DataFrame numérico, clave de caché y estadísticas del parseo.
+    """
+    raw = uploaded_file.getvalue()
+    extension = os.path.splitext(uploaded_file.name)[1].lower()
+    file_key = f"{file_digest(raw)}-{extension.lstrip('.')}"
+    key = f"{file_key}-compact-{tolerance:g}" if compact else file_key
+
+    parsed = cache.get(key)
+    from_cache = parsed is not None
+    if parsed is None:
+        # Si la caché en memoria desalojó el archivo, se relee del almacenamiento columnar
+        parsed = _parse_or_reload(raw, extension, file_key)
+        if compact:
+            # El DataFrame se reconstruye una sola vez y se cachea junto a la representación compacta
+            parsed.compact = compact_frame(parsed.data, tolerance)
+            parsed.data = parsed.compact.to_frame()
+            cache.put(key, parsed, nbytes=parsed.compact.frame_nbytes)
+        else:
+            cache.put(key, parsed, nbytes=frame_nbytes(parsed.data))
+    return LoadedDataset(
+        key=key,
+        name=uploaded_file.name,
+        data=parsed.data,
+        from_cache=from_cache,
+        engine=parsed.engine,
+        parse_seconds=parsed.parse_seconds,
+        rows_per_second=parsed.rows_per_second,
+        handle=parsed.handle,
+        sorted_columns=parsed.sorted_columns,
+        compact=parsed.compact,
+    )
+
+
+def load_uploaded_files(uploaded_files, cache: IngestionCache = INGESTION_CACHE, max_workers: int = None) -> list:
+    """
+    Carga varios archivos en paralelo con `load_uploaded_file`.
+
+    Se usan hilos: los motores C y pyarrow liberan el GIL durante el parseo, y
+    los resultados quedan en la caché compartida del proceso. El tiempo total
+    queda acotado por el archivo más lento.
+
+    Args:
+        uploaded_files (list): Objetos UploadedFile.
+        cache (IngestionCache): Caché a utilizar.
+        max_workers (int, optional): Cantidad de hilos (por defecto, uno por archivo hasta la cantidad de CPUs).
+
+    Returns:
+        list: LoadedDataset de cada archivo, en el mismo orden.
+    """
+    uploaded_files = list(uploaded_files)
+    if not uploaded_files:
+        return []
+    max_workers = max_workers or min(len(uploaded_files), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(lambda uploaded_file: load_uploaded_file(uploaded_file, cache), uploaded_files))
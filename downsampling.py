@@ -0,0 +1,174 @@
+"""
+Decimación de series temporales para graficar.
+
+Reduce cada serie a unos pocos miles de puntos (del orden del ancho en píxeles
+de la figura) conservando picos y escalones de carga.
+"""
+import numpy as np
+
+
+DECIMATORS = ["Min/Max", "LTTB", "Ninguno"]
+
+
+def target_points(fig_width_in: float, dpi: float, points_per_pixel: int = 2) -> int:
+    """Cantidad de puntos por serie recomendada para una figura del ancho indicado."""
+    return int(fig_width_in * dpi * points_per_pixel)
+
+
+def minmax_decimate(x, y, n_out: int):
+    """
+    Decima una serie conservando el mínimo y el máximo de cada bucket.
+
+    Los datos se dividen en `n_out // 2` buckets consecutivos y de cada uno se
+    conservan los dos extremos en su orden original, de modo que ningún pico
+    desaparece del gráfico.
+
+    Args:
+        x (array-like): Valores del eje X.
+        y (array-like): Valores del eje Y (puede contener NaN).
+        n_out (int): Cantidad aproximada de puntos de salida.
+
+    Returns:
+        tuple: (x, y) decimados como arrays de NumPy.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    n_buckets = max(n_out // 2, 1)
+    if n <= n_out or n_buckets >= n:
+        return x, y
+
+    bucket = -(-n // n_buckets)  # ceil
+    n_buckets = -(-n // bucket)
+    pad = n_buckets * bucket - n
+    finite = np.isfinite(y)
+    y_lo = np.concatenate([np.where(finite, y, np.inf), np.full(pad, np.inf)]).reshape(n_buckets, bucket)
+    y_hi = np.concatenate([np.where(finite, y, -np.inf), np.full(pad, -np.inf)]).reshape(n_buckets, bucket)
+
+    offsets = np.arange(n_buckets) * bucket
+    idx = np.column_stack([y_lo.argmin(axis=1) + offsets, y_hi.argmax(axis=1) + offsets])
+    idx = np.unique(np.minimum(idx, n - 1))
+    return x[idx], y[idx]
+
+
+def lttb(x, y, n_out: int):
+    """
+    Decima una serie con Largest-Triangle-Three-Buckets.
+
+    Conserva la forma visual de la curva eligiendo, en cada bucket, el punto que
+    forma el triángulo de mayor área con el punto elegido anterior y el promedio
+    del bucket siguiente. Los NaN se descartan.
+
+    Args:
+        x (array-like): Valores del eje X.
+        y (array-like): Valores del eje Y.
+        n_out (int): Cantidad de puntos de salida (mínimo 3).
+
+    Returns:
+        tuple: (x, y) decimados como arrays de NumPy.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    valid = np.isfinite(y)
+    if not valid.all():
+        x, y = x[valid], y[valid]
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    xf = x.astype(float)
+    # Buckets internos: el primer y el último punto se conservan siempre
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    avg_x = np.add.reduceat(xf[1:n - 1], edges[:-1] - 1) / np.diff(edges)
+    avg_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / np.diff(edges)
+
+    selected = np.empty(n_out, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 1 < n_out - 2:
+            next_x, next_y = avg_x[i + 1], avg_y[i + 1]
+        else:
+            next_x, next_y = xf[-1], y[-1]
+        area = np.abs(
+            (xf[prev] - next_x) * (y[start:end] - y[prev])
+            - (xf[prev] - xf[start:end]) * (next_y - y[prev])
+        )
+        prev = start + int(area.argmax())
+        selected[i + 1] = prev
+    return x[selected], y[selected]
+
+
+class MinMaxPyramid:
+    """
+    Pirámide de niveles de detalle de una serie: mínimo y máximo por bucket.
+
+    El nivel L agrupa 2**L muestras consecutivas y se construye a partir del
+    nivel anterior, por lo que la pirámide completa cuesta O(n) y ocupa ~2n
+    valores. Una consulta sobre un rango de filas elige el nivel más fino que
+    entrega a lo sumo `max_points` puntos y solo lee ese nivel. Los NaN se
+    ignoran en los agregados.
+    """
+    def __init__(self, values):
+        self.values = np.asarray(values, dtype=float)
+        self.levels = []
+        lo = hi = self.values
+        while len(lo) > 1:
+            if len(lo) % 2:
+                lo = np.append(lo, np.nan)
+                hi = np.append(hi, np.nan)
+            lo = np.fmin(lo[0::2], lo[1::2])
+            hi = np.fmax(hi[0::2], hi[1::2])
+            self.levels.append((lo, hi))
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + sum(lo.nbytes + hi.nbytes for lo, hi in self.levels)
+
+    def level_for(self, n_rows: int, max_points: int) -> int:
+        """Nivel más fino con el que `n_rows` filas se representan con a lo sumo `max_points` puntos."""
+        if n_rows <= max_points:
+            return 0
+        level = 1
+        # Cada bucket aporta dos puntos (mínimo y máximo), más los buckets parciales de los bordes
+        while 2 * (-(-n_rows // 2 ** level) + 1) > max_points and level < len(self.levels):
+            level += 1
+        return level
+
+    def query(self, start: int, stop: int, max_points: int):
+        """
+        Devuelve la serie en las filas [start, stop) con a lo sumo ~max_points puntos.
+
+        Returns:
+            tuple: (posiciones de fila, valores). En los niveles agregados cada
+            bucket aporta su mínimo y su máximo en la posición central del bucket;
+            los buckets de los bordes pueden incluir algunas filas vecinas.
+        """
+        start, stop = max(int(start), 0), min(int(stop), len(self.values))
+        if stop <= start:
+            return np.empty(0), np.empty(0)
+        level = self.level_for(stop - start, max_points)
+        if level == 0:
+            return np.arange(start, stop, dtype=float), self.values[start:stop]
+        size = 2 ** level
+        first, last = start // size, -(-stop // size)
+        lo, hi = self.levels[level - 1]
+        centers = np.clip((np.arange(first, last) + 0.5) * size - 0.5, start, stop - 1)
+        values = np.empty(2 * (last - first))
+        values[0::2] = lo[first:last]
+        values[1::2] = hi[first:last]
+        return np.repeat(centers, 2), values
+
+
+def decimate(x, y, n_out: int, method: str = "Min/Max"):
+    """Aplica el decimador indicado por nombre (ver DECIMATORS)."""
+    if method == "LTTB":
+        return lttb(x, y, n_out)
+    if method == "Min/Max":
+        return minmax_decimate(x, y, n_out)
+    return np.asarray(x), np.asarray(y)
@@ -0,0 +1,179 @@
+"""
+Filtros de suavizado para series de ensayo.
+
+Todos los filtros operan sobre una matriz contigua (filas x columnas) y
+procesan todas las columnas a la vez. Las ventanas son centradas como en
+`rolling(window, center=True)` de pandas: los extremos sin ventana completa, y
+las ventanas que contienen NaN, resultan en NaN.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from lazy_import import is_available, lazy_module
+
+# scipy.signal tarda en importarse: solo se carga si se usa Butterworth
+signal = lazy_module("scipy.signal") if is_available("scipy") else None
+
+
+MOVING_AVERAGE = "Media móvil"
+SAVITZKY_GOLAY = "Savitzky-Golay"
+MEDIAN = "Mediana"
+BUTTERWORTH = "Butterworth"
+
+FILTER_KERNELS = [MOVING_AVERAGE, SAVITZKY_GOLAY, MEDIAN]
+if signal is not None:
+    FILTER_KERNELS.append(BUTTERWORTH)
+
+SAVGOL_POLYORDER = 2
+BUTTERWORTH_ORDER = 4
+MEDIAN_BLOCK_ROWS = 65_536
+
+
+def _centered(window_values: np.ndarray, n: int, window: int) -> np.ndarray:
+    """Ubica los resultados de cada ventana completa en la fila central, con NaN en los extremos."""
+    out = np.full((n,) + window_values.shape[1:], np.nan)
+    start = window // 2
+    out[start:start + len(window_values)] = window_values
+    return out
+
+
+def moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Media móvil centrada en O(n) mediante sumas acumuladas.
+
+    Equivale a `rolling(window, center=True).mean()`. Cada columna se desplaza
+    por su media antes de acumular para no perder precisión con valores grandes.
+    """
+    n = len(values)
+    if window > n:
+        return np.full(values.shape, np.nan)
+    finite = np.isfinite(values)
+    with np.errstate(invalid="ignore"):
+        shift = np.nanmean(np.where(finite, values, np.nan), axis=0) if finite.any() else 0.0
+    shift = np.nan_to_num(shift)
+    zero = np.zeros((1,) + values.shape[1:])
+    sums = np.concatenate([zero, np.cumsum(np.where(finite, values - shift, 0.0), axis=0)])
+    invalid = np.concatenate([zero, np.cumsum(~finite, axis=0)])
+    window_sums = sums[window:] - sums[:-window]
+    window_invalid = invalid[window:] - invalid[:-window]
+    means = np.where(window_invalid > 0, np.nan, window_sums / window + shift)
+    return _centered(means, n, window)
+
+
+def savgol_coefficients(window: int, polyorder: int = SAVGOL_POLYORDER) -> np.ndarray:
+    """Coeficientes de Savitzky-Golay para el valor suavizado en el centro de la ventana."""
+    polyorder = min(polyorder, window - 1)
+    offsets = np.arange(window) - window // 2
+    vandermonde = np.vander(offsets, polyorder + 1, increasing=True)
+    return np.linalg.pinv(vandermonde)[0]
+
+
+def savitzky_golay(values: np.ndarray, window: int, polyorder: int = SAVGOL_POLYORDER) -> np.ndarray:
+    """Filtro de Savitzky-Golay (ajuste polinómico local) con ventana centrada."""
+    n = len(values)
+    if window > n:
+        return np.full(values.shape, np.nan)
+    kernel = savgol_coefficients(window, polyorder)[::-1]
+    smoothed = np.column_stack([np.convolve(values[:, j], kernel, mode="valid") for j in range(values.shape[1])])
+    return _centered(smoothed, n, window)
+
+
+def moving_median(values: np.ndarray, window: int) -> np.ndarray:
+    """Mediana móvil centrada; se procesa por bloques de filas para acotar la memoria."""
+    n = len(values)
+    if window > n:
+        return np.full(values.shape, np.nan)
+    windows = sliding_window_view(values, window, axis=0)
+    medians = np.empty(windows.shape[:2])
+    for start in range(0, len(windows), MEDIAN_BLOCK_ROWS):
+        medians[start:start + MEDIAN_BLOCK_ROWS] = np.median(windows[start:start + MEDIAN_BLOCK_ROWS], axis=-1)
+    return _centered(medians, n, window)
+
+
+def butterworth_lowpass(values: np.ndarray, window: int, order: int = BUTTERWORTH_ORDER) -> np.ndarray:
+    """
+    Filtro pasabajos de Butterworth de fase cero (requiere scipy).
+
+    La frecuencia de corte se elige como 1 / window de la frecuencia de
+    muestreo, comparable al suavizado de una media móvil de esa ventana. Los
+    NaN se interpolan para filtrar y se restituyen en el resultado.
+    """
+    if signal is None:
+        raise ImportError("El filtro Butterworth requiere scipy.")
+    n = len(values)
+    finite = np.isfinite(values)
+    filled = values.copy()
+    positions = np.arange(n)
+    for j in range(values.shape[1]):
+        if not finite[:, j].any():
+            continue
+        if not finite[:, j].all():
+            filled[:, j] = np.interp(positions, positions[finite[:, j]], values[finite[:, j], j])
+    sos = signal.butter(order, min(2.0 / window, 0.99), output="sos")
+    padlen = min(3 * (2 * len(sos) + 1), n - 1)
+    if padlen < 1:
+        return np.full(values.shape, np.nan)
+    smoothed = signal.sosfiltfilt(sos, filled, axis=0, padlen=padlen)
+    return np.where(finite, smoothed, np.nan)
+
+
+def apply_filter(values: np.ndarray, kernel: str, window: int) -> np.ndarray:
+    """
+    Aplica el filtro indicado por nombre (ver FILTER_KERNELS) a todas las columnas.
+
+    Args:
+        values (np.ndarray): Matriz (filas x columnas) de datos.
+        kernel (str): Nombre del filtro.
+        window (int): Ventana en muestras.
+
+    Returns:
+        np.ndarray: Matriz filtrada del mismo tamaño.
+    """
+    values = np.ascontiguousarray(values, dtype=float)
+    if values.ndim == 1:
+        return apply_filter(values[:, None], kernel, window)[:, 0]
+    window = int(window)
+    if kernel == MOVING_AVERAGE:
+        return moving_average(values, window)
+    if kernel == SAVITZKY_GOLAY:
+        return savitzky_golay(values, window)
+    if kernel == MEDIAN:
+        return moving_median(values, window)
+    if kernel == BUTTERWORTH:
+        return butterworth_lowpass(values, window)
+    raise ValueError(f"Filtro desconocido: {kernel}")
+
+
+def filter_columns(data, columns, kernel: str, window: int, cache=None, data_key=None) -> dict:
+    """
+    Filtra varias columnas de un DataFrame, memorizando el resultado de cada una.
+
+    Las columnas que no están en la caché se filtran juntas en una sola llamada.
+
+    Args:
+        data (pd.DataFrame): Datos de origen.
+        columns (list): Columnas a filtrar.
+        kernel (str): Nombre del filtro.
+        window (int): Ventana en muestras.
+        cache (IngestionCache, optional): Caché de resultados derivados.
+        data_key (str, optional): Clave del dataset (necesaria si se usa caché).
+
+    Returns:
+        dict: Columna -> array filtrado.
+    """
+    results = {}
+    missing = []
+    for col in columns:
+        cached = cache.get((data_key, "filter", col, kernel, int(window))) if cache is not None else None
+        if cached is None:
+            missing.append(col)
+        else:
+            results[col] = cached
+    if missing:
+        filtered = apply_filter(data[missing].to_numpy(dtype=float), kernel, window)
+        for j, col in enumerate(missing):
+            values = np.ascontiguousarray(filtered[:, j])
+            results[col] = values
+            if cache is not None:
+                cache.put((data_key, "filter", col, kernel, int(window)), values, nbytes=values.nbytes)
+    return {col: results[col] for col in columns}
@@ -0,0 +1,133 @@
+"""
+Trabajos en segundo plano compartidos entre sesiones.
+
+Los cálculos pesados se dividen en partes que se ejecutan en un pool de
+procesos único por servidor. Cada trabajo se identifica por una clave derivada
+de sus entradas (por ejemplo, el hash del dataset): si otra sesión pide el
+mismo cálculo mientras está en curso, recibe el mismo trabajo. El progreso es
+la fracción de partes terminadas y la página lo consulta en cada rerun (o
+desde un `st.fragment` con `run_every`) hasta que el resultado está listo.
+
+La cantidad de procesos se configura con la variable de entorno
+`LABSTORE_JOB_WORKERS`.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+JOB_WORKERS = int(os.environ.get("LABSTORE_JOB_WORKERS", max((os.cpu_count() or 2) - 1, 1)))
+# Por debajo de esta cantidad de filas conviene calcular en el mismo hilo
+JOB_MIN_ROWS = 500_000
+
+
+class Job:
+    """Trabajo formado por varias partes y una función que combina sus resultados."""
+    def __init__(self, key, futures: list, combine):
+        self.key = key
+        self.futures = futures
+        self.combine = combine
+        self.submitted_at = time.time()
+        self._result = None
+        self._combined = False
+        self._lock = threading.Lock()
+
+    @property
+    def progress(self) -> float:
+        """Fracción de partes terminadas (0 a 1)."""
+        if not self.futures:
+            return 1.0
+        return sum(future.done() for future in self.futures) / len(self.futures)
+
+    def done(self) -> bool:
+        return all(future.done() for future in self.futures)
+
+    def failed(self) -> bool:
+        return any(future.done() and future.exception() is not None for future in self.futures)
+
+    def elapsed(self) -> float:
+        return time.time() - self.submitted_at
+
+    def result(self):
+        """Combina los resultados de las partes (espera si alguna sigue en curso)."""
+        with self._lock:
+            if not self._combined:
+                self._result = self.combine([future.result() for future in self.futures])
+                self._combined = True
+            return self._result
+
+
+class JobStore:
+    """Registro de trabajos en curso indexados por clave, sobre un pool de procesos compartido."""
+    def __init__(self, max_workers: int = JOB_WORKERS):
+        self.max_workers = max_workers
+        self._executor = None
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is not None and self._executor._broken:
+            # Un proceso murió (por ejemplo, sin memoria): el pool no acepta más trabajos
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._executor is None:
+            # "spawn": el servidor de Streamlit tiene varios hilos y no es seguro hacer fork
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def submit(self, key, fn, parts, combine) -> Job:
+        """
+        Lanza `fn(*args)` para cada tupla de `parts`, o devuelve el trabajo en curso con la misma clave.
+
+        Args:
+            key: Clave del trabajo (debe identificar todas sus entradas).
+            fn (callable): Función de nivel de módulo (debe poder serializarse).
+            parts (list): Argumentos de cada parte.
+            combine (callable): Recibe la lista de resultados y devuelve el resultado final.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not job.failed():
+                return job
+            try:
+                futures = [self._get_executor().submit(fn, *args) for args in parts]
+            except BrokenProcessPool:
+                # El pool se rompió entre la verificación y el envío: se arma uno nuevo
+                futures = [self._get_executor().submit(fn, *args) for args in parts]
+            job = Job(key, futures, combine)
+            self._jobs[key] = job
+            return job
+
+    def get(self, key):
+        return self._jobs.get(key)
+
+    def pop(self, key):
+        """Quita un trabajo del registro (por ejemplo, una vez guardado su resultado)."""
+        with self._lock:
+            return self._jobs.pop(key, None)
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            self._jobs.clear()
+
+
+JOBS = JobStore()
+
+
+def row_ranges(n_rows: int, n_parts: int) -> list:
+    """Divide [0, n_rows) en `n_parts` rangos contiguos de tamaño similar."""
+    n_parts = max(min(n_parts, n_rows), 1)
+    edges = [round(i * n_rows / n_parts) for i in range(n_parts + 1)]
+    return list(zip(edges[:-1], edges[1:]))
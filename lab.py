@@ -1,8 +1,7 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
 
 from config import page_config
+from profiling import profiled
 
 
 class PlayStoreApp:
@@ -15,6 +14,7 @@ class PlayStoreApp:
         self.main()
 
     @staticmethod
+    @profiled
     def main():
         st.markdown('# Laboratorio de Experimental')
 
@@ -0,0 +1,76 @@
+"""
+Importación diferida de bibliotecas pesadas.
+
+Las páginas importan matplotlib, seaborn, scipy, reportlab o fpdf aunque el
+usuario no llegue a graficar ni a generar un PDF, y en un servidor recién
+iniciado eso son varios segundos antes de ver la página. Con
+
+    plt = lazy_module("matplotlib.pyplot")
+
+el nombre queda disponible de inmediato y el módulo se importa recién con el
+primer acceso a un atributo (`plt.subplots(...)`). Si el módulo ya estaba
+importado se devuelve el módulo real. Si hay una traza de perfilado abierta
+(ver profiling.py), la primera importación se registra como etapa; este
+módulo no importa profiling (que importa streamlit), así que los módulos de
+cálculo y los procesos del pool no cargan Streamlit por usarlo.
+
+El costo de importación de cada página se controla con
+`python -m benchmarks.import_time`.
+"""
+import importlib
+import importlib.util
+import sys
+import types
+from contextlib import nullcontext
+
+
+def _import_stage(name: str):
+    # Solo puede haber una traza abierta si profiling ya fue importado por la página
+    profiling = sys.modules.get("profiling")
+    if profiling is None:
+        return nullcontext()
+    return profiling.stage(f"import {name}")
+
+
+class LazyModule(types.ModuleType):
+    """Módulo que se importa al acceder al primero de sus atributos."""
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            if self.__name__ in sys.modules:
+                module = sys.modules[self.__name__]
+            else:
+                with _import_stage(self.__name__):
+                    module = importlib.import_module(self.__name__)
+            self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "cargado" if self.__dict__["_module"] is not None else "diferido"
+        return f"<módulo {state} '{self.__name__}'>"
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__["_module"] is not None
+
+
+def lazy_module(name: str):
+    """Devuelve el módulo `name`, importándolo recién en el primer uso."""
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
+
+
+def is_available(name: str) -> bool:
+    """Indica si un paquete está instalado sin importarlo."""
+    return importlib.util.find_spec(name.split(".")[0]) is not None
@@ -1,11 +1,15 @@
 from re import X
 import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
 
 from config import page_config
+from profiling import profiled
+from lazy_import import lazy_module
 import os
 
+# matplotlib se importa al graficar el primer archivo
+plt = lazy_module("matplotlib.pyplot")
+
 
 
 def encode_voltages(voltages: pd.Series) -> pd.Series:
@@ -44,6 +48,7 @@ class AWScriptGenerator:
         st.markdown("# Arbitrary Waveform Script Generator")
         self.layout()
 
+    @profiled
     def layout(self):
         with st.expander("ℹ️ Ayuda", expanded=False):
             st.markdown(
@@ -2,6 +2,7 @@ import pandas as pd
 import streamlit as st
 
 from config import page_config
+from profiling import profiled
 
 
 def compute_end_time(i_datetime: pd.Timestamp, time_to_add: float) -> tuple[pd.Timestamp, str, pd.Timestamp]:
@@ -24,6 +25,9 @@ class FTCCalc:
     def __init__(self):
         # use a frequency icon
         page_config(title="Calculadora de Frecuencia", icon=":infinity:")
+
+    @profiled
+    def run(self):
         # if 'result' not in st.session_state:
         #     st.session_state.result_freq = 1.0
         #     st.session_state.result_time = 1.0
@@ -80,3 +84,4 @@ class FTCCalc:
 
 if __name__ == "__main__":
     app = FTCCalc()
+    app.run()
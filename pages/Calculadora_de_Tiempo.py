@@ -2,6 +2,7 @@ import pandas as pd
 import streamlit as st
 
 from config import page_config
+from profiling import profiled
 
 
 
@@ -31,6 +32,7 @@ class TimeCalculatorApp:
     def __init__(self):
         page_config(title="Calculadora de Tiempo", icon="⏰")
 
+    @profiled
     def run(self):
         """
         El método run orquesta la ejecución de la aplicación. Llama a calculate_end_time para mostrar 
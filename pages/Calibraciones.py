@@ -1,24 +1,21 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 import io
 from io import BytesIO  # NUEVA IMPORTACIÓN
 from datetime import date
 import numpy as np
 from config import page_config
-import re
+from profiling import profiled
+from lazy_import import lazy_module
 import zipfile  # Importar zipfile
-try:
-    from report_generator import ReportGenerator
-except ImportError:
-    ReportGenerator = None
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch, cm
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT, TA_RIGHT
+from data_loader import file_digest
+from session_store import open_handle, store_frame
+from calibration_engine import (LOAD_ANGLE, REQUIRED_ANGLES, REQUIRED_COLUMNS, angle_code, angle_label, compute_calibration,
+                                drop_zero_rows, missing_columns, parse_sheet)
+from plot_renderer import PLOT_ABS_ERROR, PLOT_ORIGINAL, PLOT_REL_ERROR, cell_figure_specs, export_specs, plot_file_name, render_figures
 
+# reportlab solo se usa al generar el informe PDF
+report_generator = lazy_module("report_generator")
 
 class CalibrationApp:
     """
@@ -37,11 +34,14 @@ class CalibrationApp:
             layout="centered")
         self.st = st
         self.pd = pd
-        self.plt = plt
         self.io = io
         self.date = date
         self.np = np
-        self.report_generator = ReportGenerator()
+
+    @property
+    def report_generator(self):
+        """Generador de informes PDF (importa reportlab recién en el primer uso)."""
+        return report_generator.ReportGenerator()
 
     def _generar_plantilla_excel(self):
         """
@@ -61,7 +61,31 @@ class CalibrationApp:
         output.seek(0)
         return output
 
-    def generar_informe_pdf(self, st_obj, fecha_calibracion_str, denominacion_patron, unidad_fuerza, limite_tolerancia_rel, celda_indices, denominaciones, df_calibracion, all_plot_buffers_with_names, n_requerimiento=None, documentacion_aplicada=None, ficha_dut_file=None, ficha_patron_file=None, foto_montaje_file=None):
+    def _cargar_planilla(self, uploaded_file):
+        """
+        Lee la planilla de calibración subida usando el almacenamiento columnar.
+
+        La planilla se parsea una sola vez por contenido; en la sesión se guarda
+        solo el handle (que además evita que el archivo se borre mientras la
+        sesión lo usa) y en cada rerun se leen las columnas desde disco.
+
+        Args:
+            uploaded_file: Archivo subido con st.file_uploader.
+
+        Returns:
+            pd.DataFrame: Datos de la planilla.
+        """
+        raw = uploaded_file.getvalue()
+        key = f"{file_digest(raw)}-calibracion"
+        handle = self.st.session_state.get('calibracion_handle')
+        if handle is None or handle.key != key or not handle.exists():
+            handle = open_handle(key)
+            if handle is None:
+                handle = store_frame(self.pd.read_excel(BytesIO(raw)), key=key)
+            self.st.session_state['calibracion_handle'] = handle
+        return handle.load()
+
+    def generar_informe_pdf(self, st_obj, fecha_calibracion_str, denominacion_patron, unidad_fuerza, limite_tolerancia_rel, celda_indices, denominaciones, df_calibracion, all_plot_buffers_with_names, n_requerimiento=None, documentacion_aplicada=None, ficha_dut_file=None, ficha_patron_file=None, foto_montaje_file=None, progress=None):
         """
         Delega la generación del informe PDF al ReportGenerator.
 
@@ -80,6 +104,7 @@ class CalibrationApp:
             ficha_dut_file (BytesIO, optional): Archivo de imagen de la ficha DUT.
             ficha_patron_file (BytesIO, optional): Archivo de imagen de la ficha Patrón.
             foto_montaje_file (BytesIO, optional): Archivo de imagen de la foto del montaje.
+            progress (callable, optional): Recibe (secciones terminadas, total) mientras se arma el informe.
 
         Returns:
             BytesIO: Buffer con el PDF generado o None en caso de error.
@@ -87,9 +112,11 @@ class CalibrationApp:
         return self.report_generator.generar_informe_pdf(
             st_obj, fecha_calibracion_str, denominacion_patron, unidad_fuerza, limite_tolerancia_rel,
             celda_indices, denominaciones, df_calibracion, all_plot_buffers_with_names,
-            n_requerimiento, documentacion_aplicada, ficha_dut_file, ficha_patron_file, foto_montaje_file
+            n_requerimiento, documentacion_aplicada, ficha_dut_file, ficha_patron_file, foto_montaje_file,
+            progress=progress
         )
 
+    @profiled
     def run(self):
         """
         Ejecuta la lógica principal de la aplicación Streamlit.
@@ -99,7 +126,6 @@ class CalibrationApp:
         """
         st = self.st
         pd = self.pd
-        plt = self.plt
         io = self.io
         date = self.date
         np = self.np
@@ -151,6 +177,7 @@ class CalibrationApp:
             - `DUTn_120` (DUT durante carga a 120°)
             - `PATn_240` (Patrón durante carga a 240°)
             - `DUTn_240` (DUT durante carga a 240°)
+            - Se admite cualquier otro ángulo de carga con el mismo formato (`PATn_<ángulo>`, `DUTn_<ángulo>`).
 
             ### Formato para calibraciones de múltiples celdas:
             - Para cada celda adicional, agregue columnas siguiendo el patrón:
@@ -198,20 +225,20 @@ class CalibrationApp:
 
             denominaciones = {}
             # Lectura del archivo Excel
-            df = pd.read_excel(uploaded_file)
+            df = self._cargar_planilla(uploaded_file)
 
             # Verificación de columnas obligatorias
-            required_cols = ["PAT1_0", "DUT1_0", "PAT1_R", "DUT1_R"]
-            if not all(col in df.columns for col in required_cols):
-                st.error(f"El archivo debe contener las columnas: {', '.join(required_cols)}")
+            if missing_columns(df):
+                st.error(f"El archivo debe contener las columnas: {', '.join(REQUIRED_COLUMNS)}")
             else:
                 st.success("Archivo cargado correctamente.")
                 # Limpieza de filas con todos los valores en cero para las columnas requeridas
-                df = df.loc[~(df[required_cols] == 0).all(axis=1)]
+                df = drop_zero_rows(df)
 
-                # Identificación de los índices de las celdas calibradas
-                col_pattern = re.compile(r'PAT(\d+)_0')
-                celda_indices = sorted(set(int(col_pattern.match(col).group(1)) for col in df.columns if col_pattern.match(col)))
+                # Cálculo de errores, correlaciones, ajustes y métricas de todas las celdas a la vez
+                sheet = parse_sheet(df)
+                results = compute_calibration(sheet)
+                celda_indices = [int(c) for c in sheet.cells if LOAD_ANGLE in sheet.angles_of(c)]
 
                 denominaciones = {}
                 # Entradas para las denominaciones de cada celda
@@ -224,284 +251,88 @@ class CalibrationApp:
                 set_url_params(denominaciones, denominacion_patron, fecha_calibracion_str, unidad_fuerza, str(limite_tolerancia_rel))
                 st.divider()
 
-                all_plot_buffers = []  # Lista para almacenar todos los buffers de gráficos generados
-
-                # Bucle principal: procesamiento para cada celda de carga identificada
+                all_plot_buffers = []  # Lista para almacenar todos los buffers de gráficos generados (para el informe)
+                export_plot_specs = []  # Los mismos gráficos con patrón y fecha, para el ZIP (se dibujan al descargar)
+
+                # Gráficos de todas las celdas: se dibujan juntos (en paralelo si son varios) y se cachean
+                celdas_completas = [idx for idx in celda_indices if all(a in sheet.angles_of(idx) for a in REQUIRED_ANGLES)]
+                specs = {
+                    idx: cell_figure_specs(results, idx, denominaciones[idx], unidad_fuerza, limite_tolerancia_rel)
+                    for idx in celdas_completas
+                }
+                # Los de la página y el informe no llevan patrón ni fecha; los que se descargan sueltos
+                # sí, y se dibujan recién al pedir la descarga
+                pngs = render_figures([spec for idx in celdas_completas for spec in specs[idx]])
+                graficos = {idx: pngs[3 * pos:3 * pos + 3] for pos, idx in enumerate(celdas_completas)}
+                exportables = {idx: export_specs(specs[idx], denominacion_patron, fecha_calibracion_str) for idx in celdas_completas}
+
+                # Bucle principal: visualización de cada celda de carga identificada
                 for idx in celda_indices:
                     st.title(f'Calibración {denominaciones[idx]}')
-
-                    # Definición de nombres de columnas para la celda actual
-                    pat_0 = f'PAT{idx}_0'
-                    dut_0 = f'DUT{idx}_0'
-                    pat_r = f'PAT{idx}_R'
-                    dut_r = f'DUT{idx}_R'
-
-                    pat_120 = f'PAT{idx}_120'
-                    dut_120 = f'DUT{idx}_120'
-                    pat_240 = f'PAT{idx}_240'
-                    dut_240 = f'DUT{idx}_240'
-
-                    # Verificación de la existencia de datos para diferentes condiciones de carga
-                    has_0 = all(col in df.columns for col in [pat_0, dut_0])
-                    has_r = all(col in df.columns for col in [pat_r, dut_r])
-                    has_120 = all(col in df.columns for col in [pat_120, dut_120])
-                    has_240 = all(col in df.columns for col in [pat_240, dut_240])
+                    # Fecha y patrón van fuera de los gráficos: cambiarlos no vuelve a dibujarlos
+                    st.caption(f"Patrón: {denominacion_patron} · Fecha de Calibración: {fecha_calibracion_str}")
 
                     # Se requieren datos base de carga y descarga para continuar
-                    if not (has_0 and has_r):
+                    if idx not in graficos:
                         st.warning(f"Datos base (carga/descarga) incompletos para celda {idx}. Saltando.")
                         continue
-
-                    # Cálculo de errores absolutos y relativos para carga 0°
-                    abs_error_0, rel_error_0 = None, None
-                    if has_0:
-                        abs_error_0 = df[dut_0] - df[pat_0]
-                        rel_error_0 = abs_error_0 / df[pat_0].replace(0, pd.NA)
-
-                    # Cálculo de errores absolutos y relativos para descarga 0°
-                    abs_error_r, rel_error_r = None, None
-                    if has_r:
-                        abs_error_r = df[dut_r] - df[pat_r]
-                        rel_error_r = abs_error_r / df[pat_r].replace(0, pd.NA)
-
-                    # Cálculo de errores absolutos y relativos para carga 120° (excentricidad)
-                    abs_error_120, rel_error_120 = None, None
-                    if has_120:
-                        abs_error_120 = df[dut_120] - df[pat_120]
-                        rel_error_120 = abs_error_120 / df[pat_120].replace(0, pd.NA)
-
-                    # Cálculo de errores absolutos y relativos para carga 240° (excentricidad)
-                    abs_error_240, rel_error_240 = None, None
-                    if has_240:
-                        abs_error_240 = df[dut_240] - df[pat_240]
-                        rel_error_240 = abs_error_240 / df[pat_240].replace(0, pd.NA)
-
-                    # Cálculo y visualización de coeficientes de correlación de Pearson
-                    if has_0:
-                        corr_carga = df[pat_0].corr(df[dut_0])
-                        st.info(f"**Coeficiente de Correlación de Pearson (Carga 0°):** {corr_carga:.8f}")
-                    if has_r:
-                        corr_descarga = df[pat_r].corr(df[dut_r])
-                        st.info(f"**Coeficiente de Correlación de Pearson (Descarga 0°):** {corr_descarga:.8f}")
-                    if has_120:
-                        corr_carga_120 = df[pat_120].corr(df[dut_120])
-                        st.info(f"**Coeficiente de Correlación de Pearson (Carga 120°):** {corr_carga_120:.8f}")
-                    if has_240:
-                        corr_carga_240 = df[pat_240].corr(df[dut_240])
-                        st.info(f"**Coeficiente de Correlación de Pearson (Carga 240°):** {corr_carga_240:.8f}")
+                    angulos = sheet.angles_of(idx)
+                    series = {angulo: results.series(idx, angulo) for angulo in angulos}
+                    png_orig, png_abs, png_rel = graficos[idx]
+                    export_orig, export_abs, export_rel = exportables[idx]
+
+                    # Coeficientes de correlación de Pearson y métricas de la celda
+                    for angulo, datos in series.items():
+                        st.info(f"**Coeficiente de Correlación de Pearson ({angle_label(angulo)}):** {datos['pearson']:.8f}")
+                    metricas = [
+                        f"{nombre}: {valor:.4f} %"
+                        for nombre, valor in zip(["Reversibilidad máx.", "Excentricidad máx."],
+                                                 results.cell_metrics(idx).values())
+                        if np.isfinite(valor)
+                    ]
+                    if metricas:
+                        st.caption(" · ".join(metricas))
 
                     # Gráfico de Puntos de Medición Originales
-                    fig_orig, ax_orig = plt.subplots(figsize=(10, 5))
-
-                    if has_0:
-                        ax_orig.scatter(df[pat_0], df[dut_0], label="Carga 0°", color='tab:blue', marker='o', s=60, zorder=3)
-                    if has_r:
-                        ax_orig.scatter(df[pat_r], df[dut_r], label="Descarga 0°", color='tab:orange', marker='x', s=60, zorder=3)
-                    if has_120:
-                        ax_orig.scatter(df[pat_120], df[dut_120], label="Carga 120°", color='tab:green', marker='s', s=60, zorder=3)
-                    if has_240:
-                        ax_orig.scatter(df[pat_240], df[dut_240], label="Carga 240°", color='tab:red', marker='^', s=60, zorder=3)
-
-                    ax_orig.set_xlabel(f"Patrón ({unidad_fuerza})")
-                    ax_orig.set_ylabel(f"DUT ({unidad_fuerza})")
-                    ax_orig.set_title(f"Puntos de Medición Originales {denominaciones[idx]} - Patrón: {denominacion_patron}", pad=24)
-                    ax_orig.legend()
-                    ax_orig.grid(True)
-                    fig_orig.text(0.5, 0.91, f"Fecha de Calibración: {fecha_calibracion_str}", ha='center', fontsize=10, color='gray')
-                    st.pyplot(fig_orig)
-
-                    buf_orig = io.BytesIO()
-                    fig_orig.savefig(buf_orig, format="png", dpi=200)
-                    st.download_button(f"Descargar gráfico de puntos originales #{idx} (PNG)", data=buf_orig.getvalue(), file_name=f"puntos_originales_celda{idx}_{denominaciones[idx]}.png", mime="image/png")
-                    all_plot_buffers.append((f"puntos_originales_celda{idx}_{denominaciones[idx]}.png", buf_orig))
+                    st.image(png_orig, width="stretch")
+                    st.download_button(f"Descargar gráfico de puntos originales #{idx} (PNG)", data=lambda spec=export_orig: render_figures([spec])[0], file_name=f"puntos_originales_celda{idx}_{denominaciones[idx]}.png", mime="image/png")
+                    all_plot_buffers.append((plot_file_name(PLOT_ORIGINAL, idx, denominaciones[idx]), io.BytesIO(png_orig)))
+                    export_plot_specs.append((plot_file_name(PLOT_ORIGINAL, idx, denominaciones[idx]), export_orig))
                     st.divider()
 
-                    # Gráfico de Error Absoluto
-                    fig1, ax1 = plt.subplots(figsize=(10, 5))  # Ajustado figsize
-                    x = np.arange(len(df))
-
-                    # Cálculo del número de series para el gráfico de barras de error absoluto
-                    num_series_abs = 0
-                    if abs_error_0 is not None:
-                        num_series_abs += 1
-                    if abs_error_r is not None:
-                        num_series_abs += 1
-                    if abs_error_120 is not None:
-                        num_series_abs += 1
-                    if abs_error_240 is not None:
-                        num_series_abs += 1
-
-                    # Configuración de ancho de barras y desplazamiento para el gráfico
-                    bar_width = 0.8 / num_series_abs if num_series_abs > 0 else 0.2
-                    current_offset = -(num_series_abs - 1) * bar_width / 2
-
-                    # Generación de barras para cada serie de error absoluto
-                    if abs_error_0 is not None:
-                        ax1.bar(x + current_offset, abs_error_0, width=bar_width, label="Carga 0°", color='tab:blue', alpha=0.7)
-                        current_offset += bar_width
-                    if abs_error_r is not None:
-                        ax1.bar(x + current_offset, abs_error_r, width=bar_width, label="Descarga 0°", color='tab:orange', alpha=0.7)
-                        current_offset += bar_width
-                    if abs_error_120 is not None:
-                        ax1.bar(x + current_offset, abs_error_120, width=bar_width, label="Carga 120°", color='tab:green', alpha=0.7)
-                        current_offset += bar_width
-                    if abs_error_240 is not None:
-                        ax1.bar(x + current_offset, abs_error_240, width=bar_width, label="Carga 240°", color='tab:red', alpha=0.7)
-
-                    # Configuración y visualización del gráfico de error absoluto
-                    ax1.set_xlabel(f"Patrón ({unidad_fuerza})")
-                    ax1.set_ylabel(f"Error absoluto ({unidad_fuerza})")
-                    ax1.set_title(f"Error Absoluto {denominaciones[idx]} - Patrón: {denominacion_patron}", pad=24)
-                    ax1.set_xticks(x)
-                    ax1.legend()
-                    ax1.grid()
-                    ax1.axhline(0, color='black', linewidth=1)
-                    fig1.text(0.5, 0.91, f"Fecha de Calibración: {fecha_calibracion_str}", ha='center', fontsize=10, color='gray')
-                    st.pyplot(fig1)
-                    buf1 = io.BytesIO()
-                    fig1.savefig(buf1, format="png", dpi=200)
-                    st.download_button(f"Descargar gráfico de error absoluto #{idx} (PNG)", data=buf1.getvalue(), file_name=f"error_absoluto_celda{idx}.png", mime="image/png")
-                    all_plot_buffers.append((f"error_absoluto_celda{idx}_{denominaciones[idx]}.png", buf1))  # Agregar buffer a la lista
-
-                    # Preparación de datos para la tabla de error absoluto
+                    # Gráfico de Error Absoluto: una serie de barras por ángulo
+                    st.image(png_abs, width="stretch")
+                    st.download_button(f"Descargar gráfico de error absoluto #{idx} (PNG)", data=lambda spec=export_abs: render_figures([spec])[0], file_name=f"error_absoluto_celda{idx}.png", mime="image/png")
+                    all_plot_buffers.append((plot_file_name(PLOT_ABS_ERROR, idx, denominaciones[idx]), io.BytesIO(png_abs)))  # Agregar buffer a la lista
+                    export_plot_specs.append((plot_file_name(PLOT_ABS_ERROR, idx, denominaciones[idx]), export_abs))
+
+                    # Tabla de error absoluto
                     tabla_abs_data = {}
-                    if has_0:
-                        tabla_abs_data[f'PAT(L0°) [{unidad_fuerza}]'] = df[pat_0]
-                        tabla_abs_data[f'DUT(L0°) [{unidad_fuerza}]'] = df[dut_0]
-                        tabla_abs_data[f'Err(L0°) [{unidad_fuerza}]'] = abs_error_0
-                    if has_r:
-                        tabla_abs_data[f'PAT(U0°) [{unidad_fuerza}]'] = df[pat_r]
-                        tabla_abs_data[f'DUT(U0°) [{unidad_fuerza}]'] = df[dut_r]
-                        tabla_abs_data[f'Err(U0°) [{unidad_fuerza}]'] = abs_error_r
-                    if has_120 and abs_error_120 is not None:
-                        tabla_abs_data[f'PAT(L120°) [{unidad_fuerza}]'] = df[pat_120]
-                        tabla_abs_data[f'DUT(L120°) [{unidad_fuerza}]'] = df[dut_120]
-                        tabla_abs_data[f'Err(L120°) [{unidad_fuerza}]'] = abs_error_120
-                    if has_240 and abs_error_240 is not None:
-                        tabla_abs_data[f'PAT(L240°) [{unidad_fuerza}]'] = df[pat_240]
-                        tabla_abs_data[f'DUT(L240°) [{unidad_fuerza}]'] = df[dut_240]
-                        tabla_abs_data[f'Err(L240°) [{unidad_fuerza}]'] = abs_error_240
-
-                    # Visualización de la tabla de error absoluto
-                    tabla_abs = pd.DataFrame(tabla_abs_data)
+                    for angulo, datos in series.items():
+                        code = angle_code(angulo)
+                        tabla_abs_data[f'PAT({code}) [{unidad_fuerza}]'] = datos["pat"]
+                        tabla_abs_data[f'DUT({code}) [{unidad_fuerza}]'] = datos["dut"]
+                        tabla_abs_data[f'Err({code}) [{unidad_fuerza}]'] = datos["abs_error"]
+                    tabla_abs = pd.DataFrame(tabla_abs_data, index=df.index)
                     st.markdown(f'**Tabla de Error Absoluto {denominaciones[idx]}**')
                     st.dataframe(tabla_abs.style.format(precision=4).set_properties(**{'text-align': 'center'}), use_container_width=True)
                     st.info('Refs.: PAT=patrón, DUT=dispositivo, L=carga, U=descarga, Err=Error Absoluto o Relativo')
                     st.divider()
 
-                    # Gráfico de Error Relativo
-                    fig2, ax2 = plt.subplots(figsize=(10, 5))  # Ajustado figsize
-                    # Puntos de error relativo
-                    if rel_error_0 is not None:
-                        ax2.scatter(df[pat_0], rel_error_0 * 100, label="Carga 0°", color='tab:blue', s=60, marker='o', zorder=3)
-                    if rel_error_r is not None:
-                        ax2.scatter(df[pat_r], rel_error_r * 100, label="Descarga 0°", color='tab:orange', s=60, marker='x', zorder=3)
-                    if rel_error_120 is not None:
-                        ax2.scatter(df[pat_120], rel_error_120 * 100, label="Carga 120°", color='tab:green', s=60, marker='s', zorder=3)  # square marker
-                    if rel_error_240 is not None:
-                        ax2.scatter(df[pat_240], rel_error_240 * 100, label="Carga 240°", color='tab:red', s=60, marker='^', zorder=3)  # triangle_up marker
-
-                    # Ajustes polinómicos para las curvas de error relativo
-                    if has_0 and rel_error_0 is not None and len(df[pat_0]) >= 4:
-                        coef_carga = np.polyfit(df[pat_0].dropna(), rel_error_0.dropna() * 100, 3)
-                        poly_carga = np.poly1d(coef_carga)
-                        x_carga_plot = np.linspace(df[pat_0].min(), df[pat_0].max(), 200)
-                        ax2.plot(x_carga_plot, poly_carga(x_carga_plot), color='tab:blue', linestyle='--', label='Ajuste carga 0°', zorder=2)
-
-                    if has_r and rel_error_r is not None and len(df[pat_r]) >= 4:
-                        coef_descarga = np.polyfit(df[pat_r].dropna(), rel_error_r.dropna() * 100, 3)
-                        poly_descarga = np.poly1d(coef_descarga)
-                        x_descarga_plot = np.linspace(df[pat_r].min(), df[pat_r].max(), 200)
-                        ax2.plot(x_descarga_plot, poly_descarga(x_descarga_plot), color='tab:orange', linestyle='--', label='Ajuste descarga 0°', zorder=2)
-
-                    if has_120 and rel_error_120 is not None and len(df[pat_120]) >= 4:
-                        coef_carga_120 = np.polyfit(df[pat_120].dropna(), rel_error_120.dropna() * 100, 3)
-                        poly_carga_120 = np.poly1d(coef_carga_120)
-                        x_carga_120_plot = np.linspace(df[pat_120].min(), df[pat_120].max(), 200)
-                        ax2.plot(x_carga_120_plot, poly_carga_120(x_carga_120_plot), color='tab:green', linestyle='--', label='Ajuste carga 120°', zorder=2)
-
-                    if has_240 and rel_error_240 is not None and len(df[pat_240]) >= 4:
-                        coef_carga_240 = np.polyfit(df[pat_240].dropna(), rel_error_240.dropna() * 100, 3)
-                        poly_carga_240 = np.poly1d(coef_carga_240)
-                        x_carga_240_plot = np.linspace(df[pat_240].min(), df[pat_240].max(), 200)
-                        ax2.plot(x_carga_240_plot, poly_carga_240(x_carga_240_plot), color='tab:red', linestyle='--', label='Ajuste carga 240°', zorder=2)
-
-                    # Configuración del gráfico de error relativo
-                    ax2.set_xlabel(f"Patrón ({unidad_fuerza})")
-                    ax2.set_ylabel("Error relativo (%)")
-                    ax2.set_title(f"Error Relativo {denominaciones[idx]} - Patrón: {denominacion_patron}", pad=24)
-                    fig2.text(0.5, 0.91, f"Fecha de Calibración: {fecha_calibracion_str}", ha='center', fontsize=10, color='gray')
-                    ax2.axhline(0, color='black', linewidth=1)
-                    # Líneas de tolerancia y área sombreada
-                    ax2.axhline(-limite_tolerancia_rel, color='gray', linestyle='--', linewidth=1)
-                    ax2.axhline(limite_tolerancia_rel, color='gray', linestyle='--', linewidth=1)
-
-                    # Determinación del rango para el área sombreada de tolerancia
-                    all_pat_data = []
-                    if has_0:
-                        all_pat_data.append(df[pat_0].dropna())
-                    if has_r:
-                        all_pat_data.append(df[pat_r].dropna())
-                    if has_120:
-                        all_pat_data.append(df[pat_120].dropna())
-                    if has_240:
-                        all_pat_data.append(df[pat_240].dropna())
-
-                    if all_pat_data:
-                        combined_pat_data = pd.concat(all_pat_data)
-                        x_fill_min = combined_pat_data.min()
-                        x_fill_max = combined_pat_data.max()
-                        ax2.fill_between(
-                            np.linspace(x_fill_min, x_fill_max, 200),
-                            -limite_tolerancia_rel,
-                            limite_tolerancia_rel,
-                            color='green',
-                            alpha=0.1,
-                            label=f'Zona de tolerancia (+/-{limite_tolerancia_rel:.1f}%)'
-                        )
-                    else:  # Fallback si no hay datos de patrón
-                        ax2.fill_between(
-                            np.linspace(0, 1, 200),  # dummy range
-                            -limite_tolerancia_rel,
-                            limite_tolerancia_rel,
-                            color='green',
-                            alpha=0.1,
-                            label=f'Zona de tolerancia (+/-{limite_tolerancia_rel:.1f}%)'
-                        )
+                    # Gráfico de Error Relativo con los ajustes cúbicos y la zona de tolerancia
+                    st.image(png_rel, width="stretch")
+                    st.download_button(f"Descargar gráfico de error relativo #{idx} (PNG)", data=lambda spec=export_rel: render_figures([spec])[0], file_name=f"error_relativo_celda{idx}.png", mime="image/png")
+                    all_plot_buffers.append((plot_file_name(PLOT_REL_ERROR, idx, denominaciones[idx]), io.BytesIO(png_rel)))  # Agregar buffer a la lista
+                    export_plot_specs.append((plot_file_name(PLOT_REL_ERROR, idx, denominaciones[idx]), export_rel))
 
-                    # Visualización y descarga del gráfico de error relativo
-                    ax2.legend()
-                    ax2.grid()
-                    ax2.grid(which='major', linestyle='-', linewidth=0.7)
-                    ax2.grid(which='minor', linestyle=':', linewidth=0.5, alpha=1.0)
-                    ax2.minorticks_on()
-                    st.pyplot(fig2)
-                    buf2 = io.BytesIO()
-                    fig2.savefig(buf2, format="png", dpi=200)
-                    st.download_button(f"Descargar gráfico de error relativo #{idx} (PNG)", data=buf2.getvalue(), file_name=f"error_relativo_celda{idx}.png", mime="image/png")
-                    all_plot_buffers.append((f"error_relativo_celda{idx}_{denominaciones[idx]}.png", buf2))  # Agregar buffer a la lista
-
-                    # Preparación de datos para la tabla de error relativo
+                    # Tabla de error relativo
                     tabla_rel_data = {}
-                    if has_0 and rel_error_0 is not None:
-                        tabla_rel_data[f'PAT(L0°) [{unidad_fuerza}]'] = df[pat_0]
-                        tabla_rel_data[f'DUT(L0°) [{unidad_fuerza}]'] = df[dut_0]
-                        tabla_rel_data['Err(L0°) [%]'] = rel_error_0 * 100
-                    if has_r and rel_error_r is not None:
-                        tabla_rel_data[f'PAT(U0°) [{unidad_fuerza}]'] = df[pat_r]
-                        tabla_rel_data[f'DUT(U0°) [{unidad_fuerza}]'] = df[dut_r]
-                        tabla_rel_data['Err(U0°) [%]'] = rel_error_r * 100
-                    if has_120 and rel_error_120 is not None:
-                        tabla_rel_data[f'PAT(L120°) [{unidad_fuerza}]'] = df[pat_120]
-                        tabla_rel_data[f'DUT(L120°) [{unidad_fuerza}]'] = df[dut_120]
-                        tabla_rel_data['Err(L120°) [%]'] = rel_error_120 * 100
-                    if has_240 and rel_error_240 is not None:
-                        tabla_rel_data[f'PAT(L240°) [{unidad_fuerza}]'] = df[pat_240]
-                        tabla_rel_data[f'DUT(L240°) [{unidad_fuerza}]'] = df[dut_240]
-                        tabla_rel_data['Err(L240°) [%]'] = rel_error_240 * 100
-
-                    # Visualización de la tabla de error relativo
-                    tabla_rel = pd.DataFrame(tabla_rel_data)
+                    for angulo, datos in series.items():
+                        code = angle_code(angulo)
+                        tabla_rel_data[f'PAT({code}) [{unidad_fuerza}]'] = datos["pat"]
+                        tabla_rel_data[f'DUT({code}) [{unidad_fuerza}]'] = datos["dut"]
+                        tabla_rel_data[f'Err({code}) [%]'] = datos["rel_error"]
+                    tabla_rel = pd.DataFrame(tabla_rel_data, index=df.index)
                     st.markdown(f'**Tabla de Error Relativo {denominaciones[idx]}**')
                     st.dataframe(tabla_rel.style.format(precision=4).set_properties(**{'text-align': 'center'}), use_container_width=True)
                     st.info('Refs.: PAT=patrón, DUT=dispositivo, L=carga, U=descarga, Err=Error Absoluto o Relativo')
@@ -518,14 +349,14 @@ class CalibrationApp:
 
                 # Sección para descargar todos los gráficos en un ZIP y generar el informe PDF
                 if all_plot_buffers:
-                    # Creación del archivo ZIP en memoria
-                    zip_buffer = io.BytesIO()
-                    with zipfile.ZipFile(zip_buffer, "a", zipfile.ZIP_DEFLATED, False) as zip_file:
-                        for file_name, buf_data in all_plot_buffers:
-                            buf_data.seek(0)
-                            zip_file.writestr(file_name, buf_data.read())
-
-                    zip_buffer.seek(0)
+                    def zip_graficos():
+                        """Archivo ZIP en memoria con los gráficos exportados (se arma al descargar)."""
+                        exportados = render_figures([spec for _, spec in export_plot_specs])
+                        zip_buffer = io.BytesIO()
+                        with zipfile.ZipFile(zip_buffer, "a", zipfile.ZIP_DEFLATED, False) as zip_file:
+                            for (file_name, _), png in zip(export_plot_specs, exportados):
+                                zip_file.writestr(file_name, png)
+                        return zip_buffer.getvalue()
 
                     col_zip, col_pdf = st.columns(2)
 
@@ -533,7 +364,7 @@ class CalibrationApp:
                     with col_zip:
                         st.download_button(
                             label="Descargar todos los gráficos (ZIP)",
-                            data=zip_buffer,
+                            data=zip_graficos,
                             file_name=f"graficos_calibracion_{fecha_calibracion.strftime('%Y%m%d')}.zip",
                             mime="application/zip"
                         )
@@ -541,6 +372,7 @@ class CalibrationApp:
                     # Botón para generar y descargar el informe PDF
                     with col_pdf:
                         if st.button("Generar informe PDF"):
+                            barra = st.progress(0.0, text="Generando informe PDF...")
                             pdf_data = self.generar_informe_pdf(
                                 self.st,
                                 fecha_calibracion_str,
@@ -555,8 +387,10 @@ class CalibrationApp:
                                 documentacion_aplicada,
                                 ficha_dut_file,
                                 ficha_patron_file,
-                                foto_montaje_file
+                                foto_montaje_file,
+                                progress=lambda hechas, total: barra.progress(hechas / total, text=f"Generando informe PDF... ({hechas}/{total} secciones)")
                             )
+                            barra.empty()
                             if pdf_data:
                                 st.download_button(
                                     label="Descargar PDF generado",
@@ -3,11 +3,16 @@ import pandas as pd
 import streamlit as st
 
 from config import page_config
-from fpdf import FPDF
+from profiling import profiled
+from lazy_import import lazy_module
+from asset_cache import LOGO_PATH, PROBETA_PATH, asset_bytes, fpdf_image, hardness_table
 from datetime import datetime
 import os
 import re
 
+# fpdf solo se usa al guardar el informe
+fpdf = lazy_module("fpdf")
+
 # to install PIL use: pip install Pillow
 class TractionCalculator:
     """
@@ -22,10 +27,13 @@ class TractionCalculator:
             layout="wide"
 
         )
-        self.rk_cr_table = pd.read_csv('resources/RK_CR.csv', dtype={'RK': float, 'CR': float})
+        # Tabla compartida entre sesiones; se relee solo si cambia el archivo
+        self.rk_cr = hardness_table()
+        self.rk_cr_table = self.rk_cr.table
         self.left_col, self.center_col, self.right_col = st.columns([8, 22, 8])
 
 
+    @profiled
     def run(self):
         # Show RK-CR table                
         self.show_rk_cr_table()
@@ -48,17 +56,8 @@ class TractionCalculator:
             dataframe = self.rk_cr_table
             target = st.session_state.get('rk', None)
             if target is not None:
-                # Identificar la fila con RK menor o igual al target
-                lower_df = dataframe[dataframe['RK'] <= target]
-                # Identificar la fila con RK mayor o igual al target
-                upper_df = dataframe[dataframe['RK'] >= target]
-                target_idxs = set()
-                if not lower_df.empty:
-                    lower_idx = lower_df['RK'].idxmax()
-                    target_idxs.add(lower_idx)
-                if not upper_df.empty:
-                    upper_idx = upper_df['RK'].idxmin()
-                    target_idxs.add(upper_idx)
+                # Filas con el RK inmediato inferior y superior al target
+                target_idxs = self.rk_cr.bracket(target)
 
                 def highlight_row(row):
                     if row.name in target_idxs:
@@ -84,8 +83,7 @@ class TractionCalculator:
         
         # Mostrar la imagen ilustrativa en la columna de la izquierda
         with self.left_col:
-            img_path = 'resources/probeta.png'
-            st.image(img_path, width=200)
+            st.image(asset_bytes(PROBETA_PATH), width=200)
 
         with self.center_col:
             st.markdown('<h4 style="color:red">Calculadora de Fuerza de Tracción de Ensayo</h4>',
@@ -110,30 +108,9 @@ class TractionCalculator:
                 if st.form_submit_button("Calcular Carga de Prueba", type="primary"):
                    
                     s = np.pi * d ** 2 / 4
-                    # find the index of the closest value to cr in the table
-                    # idx = (np.abs(self.rk_cr_table['RK'] - rk)).idxmin()
-
-                    # interpolate the value of CR from the table
-                    # truncate the value of RK
-                    rk_low = np.trunc(rk)
-                    rk_high = np.ceil(rk)
-
-                    if rk_low == rk_high:
-                        idx = (np.abs(self.rk_cr_table['RK'] - rk_low)).idxmin()
-                        cr = self.rk_cr_table.loc[idx, 'CR']
-                    else:
-                        idx_low = self.rk_cr_table['RK'].sub(rk_low).gt(0).idxmin()
-                        idx_high = self.rk_cr_table['RK'].sub(rk_high).gt(0).idxmin()
-
-                        cr_low = self.rk_cr_table.loc[idx_low, 'CR']
-                        cr_high = self.rk_cr_table.loc[idx_high, 'CR']
-                        print(f'rk_low: {rk_low}, rk_high: {rk_high}')
-                        print(f'cr_low: {cr_low}, cr_high: {cr_high}')
-
-                        cr = cr_low + (cr_high - cr_low) / (rk_high - rk_low) * (rk - rk_low)
-                        print(f'cr: {cr}')
+                    # Interpolación lineal de CR entre las filas vecinas de la tabla
+                    cr = self.rk_cr.strength(rk)
 
-                    # cr = self.rk_cr_table.loc[idx, 'CR']
                     break_force = s * cr
                     break_force_dan = break_force * 9.81 / 10
                     traction_force = break_force * 0.75  # kgf
@@ -175,11 +152,11 @@ class TractionCalculator:
                 :small[*Fórmula utilizada para el cálculo de la Fuerza:*]  
                 :blue[$ F = \\sigma_R \\times S_0 \\times 0.75  $]''')
 
-            # Add download button
-            pdf_output = self.generate_pdf(st.session_state.results)
+            # El PDF se arma recién al descargarlo, no en cada rerun
+            results = dict(st.session_state.results)
             st.download_button(
                 label="Descargar PDF",
-                data=pdf_output,
+                data=lambda: self.generate_pdf(results),
                 file_name="Resultados_Calculo_Traccion.pdf",
                 mime="application/pdf"
             )
@@ -217,11 +194,10 @@ class TractionCalculator:
                 # If the pattern doesn't match, assume the whole text is the name
                 return limpiar_markdown(texto.strip()), ""
 
-        class PDF(FPDF):
+        class PDF(fpdf.FPDF):
             def header(self):
-                image_path = "fadea_logo.png"
-                if os.path.exists(image_path):
-                    self.image(image_path, x=10, y=10, w=190)
+                if os.path.exists(LOGO_PATH):
+                    self.image(fpdf_image(self, LOGO_PATH), x=10, y=10, w=190)
                 self.ln(50) # Increased line break
 
             def footer(self):
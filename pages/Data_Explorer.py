@@ -1,18 +1,37 @@
 import pandas as pd
 import numpy as np
 import streamlit as st
-import matplotlib.pyplot as plt
-from matplotlib.ticker import FuncFormatter
 from datetime import datetime, time, date, timedelta
+from time import perf_counter
 
 from config import page_config
-import seaborn as sns
+from profiling import profiled, stage
+from lazy_import import lazy_module
+import io
 import os
 
 from utils import ss_get, ss_set
-
+from data_export import EXPORT_FORMATS, ExportTransform, export_file_name, lazy_export
+from data_grid import show_data_grid
+from alignment import RANGE_MODES, SAMPLE_AXIS, align_datasets
+from compact import DEFAULT_TOLERANCE
+from data_loader import DERIVED_CACHE, load_uploaded_file, load_uploaded_files
+from downsampling import DECIMATORS, MinMaxPyramid, decimate, target_points
+from filters import FILTER_KERNELS, filter_columns
+from session_store import store_frame
+from jobs import JOB_MIN_ROWS, JOBS, row_ranges
+from streaming_stats import (CORRELATION_METHODS, DEFAULT_CHUNK_ROWS, KENDALL_MAX_ROWS, compute_histograms, compute_stats,
+                             histogram_ranges, iter_frame_chunks, merge_stats, rank_correlation, stats_for_rows)
+
+# Bibliotecas de gráficos: se importan al dibujar el primer gráfico
+plt = lazy_module("matplotlib.pyplot")
+ticker = lazy_module("matplotlib.ticker")
+sns = lazy_module("seaborn")
 
 NOPLOT_COLS = ["t", "ts", "n", "time", "timespan", "tspan", "sample#", "sample"]
+PLOT_FIGSIZE = (20, 10)
+HIST_GRID_COLS = 3
+CORR_ANNOTATE_MAX_COLS = 12
 
 
 def format_seconds_hmsms(seconds: float) -> str:
@@ -23,6 +42,136 @@ def format_seconds_hmsms(seconds: float) -> str:
     sec = total_seconds % 60
     return f"{hours:02d}:{minutes:02d}:{sec:06.3f}"
 
+def masked_rows(x_values: np.ndarray, x_lower: float, x_upper: float, is_sorted: bool = False):
+    """
+    Devuelve las posiciones de las filas con X dentro de [x_lower, x_upper].
+
+    Si las posiciones son contiguas se devuelve un slice, que permite indexar
+    sin copiar los datos. Si X es no decreciente (`is_sorted`), el slice se
+    obtiene por búsqueda binaria en O(log n), sin recorrer la columna.
+    """
+    if is_sorted:
+        start = int(np.searchsorted(x_values, x_lower, side="left"))
+        stop = int(np.searchsorted(x_values, x_upper, side="right"))
+        return slice(start, max(start, stop))
+    positions = np.flatnonzero((x_values >= x_lower) & (x_values <= x_upper))
+    if len(positions) == 0:
+        return slice(0, 0)
+    if positions[-1] - positions[0] + 1 == len(positions):
+        return slice(int(positions[0]), int(positions[-1]) + 1)
+    return positions
+
+
+def render_correlation_heatmap(corr: pd.DataFrame, title: str) -> bytes:
+    """
+    Dibuja una matriz de correlación como heatmap y la devuelve como PNG.
+
+    Las matrices anchas (más de CORR_ANNOTATE_MAX_COLS columnas) se dibujan sin
+    anotar cada celda, para que el tiempo de render no crezca con n².
+    """
+    fig, ax = plt.subplots()
+    annotate = len(corr.columns) <= CORR_ANNOTATE_MAX_COLS
+    sns.heatmap(corr, annot=annotate, cmap='coolwarm', ax=ax, fmt="0.3f", annot_kws={"size": 5})
+    ax.set_title(title)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def render_histogram_grid(counts: np.ndarray, edges: np.ndarray, labels: list) -> bytes:
+    """
+    Dibuja histogramas ya calculados en una única figura en grilla y la devuelve como PNG.
+
+    Args:
+        counts (np.ndarray): Conteos (columnas x bins).
+        edges (np.ndarray): Bordes de los bins (columnas x bins+1).
+        labels (list): Nombre de cada columna.
+    """
+    n_rows = -(-len(labels) // HIST_GRID_COLS)
+    fig, axes = plt.subplots(n_rows, HIST_GRID_COLS, figsize=(6.4 * HIST_GRID_COLS, 4.8 * n_rows), squeeze=False)
+    for ax, count, edge, label in zip(axes.flat, counts, edges, labels):
+        ax.stairs(count, edge, fill=True, alpha=0.7)
+        ax.set_title(f"Histogram of {label}")
+        ax.set_xlabel(label)
+        ax.set_ylabel("Frequency")
+    for ax in axes.flat[len(labels):]:
+        ax.set_visible(False)
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+class PlotArrays:
+    """
+    Datos listos para graficar: un vector X común y una matriz Y (filas x series).
+
+    Los límites de los ejes se calculan con reducciones de NumPy sobre la
+    matriz completa en lugar de concatenar series individuales.
+    """
+    def __init__(self, x, y, labels, x_shift=None):
+        self.x = x
+        self.y = y
+        self.labels = list(labels)
+        self.finite = np.isfinite(y)
+        self.x_shift = np.zeros(y.shape[1]) if x_shift is None else x_shift
+
+    def series(self, j):
+        """Devuelve (x, y) de la serie j sin los valores NaN."""
+        valid = self.finite[:, j]
+        return self.x[valid] - self.x_shift[j], self.y[valid, j]
+
+    def has_data(self, j) -> bool:
+        return bool(self.finite[:, j].any())
+
+    def limits(self):
+        """Devuelve (x_min, x_max, y_min, y_max) de los datos válidos, o None si no hay."""
+        used = self.finite.any(axis=0)
+        if not used.any():
+            return None
+        x_col = self.x[:, None]
+        x_min = (np.where(self.finite, x_col, np.inf).min(axis=0) - self.x_shift)[used].min()
+        x_max = (np.where(self.finite, x_col, -np.inf).max(axis=0) - self.x_shift)[used].max()
+        y_valid = self.y[:, used]
+        return float(x_min), float(x_max), float(np.nanmin(y_valid)), float(np.nanmax(y_valid))
+
+
+def prepare_plot_arrays(x_values, index_values, y_matrix, labels, convert_x_time=False, period_s=1e-3,
+                        offset_seconds=0.0, scale_time=1.0, scale_rest=1.0, start_zero=False) -> PlotArrays:
+    """
+    Construye los arrays a graficar en una sola pasada.
+
+    Args:
+        x_values (np.ndarray): Columna X ya enmascarada.
+        index_values (np.ndarray): Índice de las filas enmascaradas (para convertir a tiempo).
+        y_matrix (np.ndarray): Matriz (filas x series) ya enmascarada.
+        labels (list): Rótulo de cada serie.
+        convert_x_time (bool): Si es True, X = índice * período + offset.
+        period_s (float): Período de muestreo en segundos.
+        offset_seconds (float): Desplazamiento inicial del eje X en segundos.
+        scale_time (float): Factor de escala del eje X.
+        scale_rest (float): Factor de escala de las series.
+        start_zero (bool): Si es True, cada serie comienza en X = 0.
+
+    Returns:
+        PlotArrays: Datos escalados y desplazamientos por serie.
+    """
+    if convert_x_time:
+        x = index_values * period_s + offset_seconds
+    else:
+        x = np.asarray(x_values, dtype=float)
+    x = x * scale_time
+    y = np.asarray(y_matrix, dtype=float) * scale_rest
+    x_shift = None
+    if start_zero:
+        finite = np.isfinite(y)
+        first_x = np.where(finite, x[:, None], np.inf).min(axis=0)
+        x_shift = np.where(np.isfinite(first_x), first_x, 0.0)
+    return PlotArrays(x, y, labels, x_shift)
+
+
 class DataExplorer:
     def __init__(self):
         page_config(title="Data Explorer", icon="📊", layout='wide')
@@ -30,9 +179,21 @@ class DataExplorer:
         self.layout()
         
     
+    @profiled
     def layout(self):
         st.html('<h2>Explorador de Datos</h2>')
         # default_file_name = r'data\sample_data.csv'
+
+        if st.toggle("Comparar varios archivos", key="batch_mode"):
+            uploaded_files = st.file_uploader(
+                "Choose CSV or Excel files",
+                type=["csv", "txt", "xlsx", "xls"],
+                accept_multiple_files=True,
+                key="batch_files",
+            )
+            if uploaded_files:
+                self.compare_files(uploaded_files)
+            return
                 
         # load a csv file from disk and display a plot of its data
         uploaded_file = st.file_uploader(
@@ -40,39 +201,142 @@ class DataExplorer:
             type=["csv", "txt", "xlsx", "xls"],
         )
 
+        col_compact, col_tolerance, _ = st.columns([1, 1, 2], vertical_alignment="bottom")
+        compact = col_compact.toggle("Modo compacto (menos memoria)", key="compact_mode")
+        tolerance = col_tolerance.number_input(
+            "Tolerancia float32 (relativa al rango)", min_value=0.0, value=DEFAULT_TOLERANCE,
+            format="%.0e", key="compact_tolerance", disabled=not compact,
+        )
+
         if uploaded_file is not None:
-            data_file = uploaded_file
-            self.data_file_name = data_file.name
-            extension = os.path.splitext(self.data_file_name)[1].lower()
-            if extension in [".xlsx", ".xls"]:
-                raw_data = pd.read_excel(data_file)
-            else:
-                raw_data = pd.read_csv(data_file, sep=None, engine="python")
-            self.data = raw_data.select_dtypes(include=[np.number])
+            # El parseo se cachea por contenido: los reruns por cambios de UI no releen el archivo
+            with stage("carga") as load_stage:
+                dataset = load_uploaded_file(uploaded_file, compact=compact, tolerance=tolerance)
+                load_stage.add_rows(len(dataset.data))
+            self.data_file_name = dataset.name
+            self.data_key = dataset.key
+            self.data = dataset.data
+            self.data_handle = dataset.handle
+            self.sorted_columns = dataset.sorted_columns
+            origin = "caché" if dataset.from_cache else f"motor {dataset.engine}"
+            st.caption(
+                f"Parseo ({origin}): {dataset.parse_seconds:.3f} s, "
+                f"{dataset.rows_per_second:,.0f} filas/s"
+            )
+            if dataset.compact is not None:
+                st.caption(
+                    f"Modo compacto: {dataset.compact.original_nbytes / 2**20:,.1f} MB → "
+                    f"{dataset.compact.nbytes / 2**20:,.1f} MB compactos ({dataset.compact.ratio:.1f}×). "
+                    + ", ".join(f"{col}: {kind}" for col, kind in dataset.compact.describe_parts().items())
+                )
             self.plot_data()
             self.show_data_stats()
           
                
+    @profiled
+    def compare_files(self, uploaded_files):
+        """Superpone varias corridas alineadas sobre un eje X común, canal por canal."""
+        start = perf_counter()
+        datasets = load_uploaded_files(uploaded_files)
+        wall = perf_counter() - start
+        st.caption(
+            f"{len(datasets)} archivos cargados en {wall:.3f} s "
+            f"(suma de parseos: {sum(d.parse_seconds for d in datasets if not d.from_cache):.3f} s)"
+        )
+        names = [d.name for d in datasets]
+        if len(set(names)) < len(names):
+            names = [f"{i + 1}: {name}" for i, name in enumerate(names)]
+        frames = dict(zip(names, (d.data for d in datasets)))
+
+        common = [col for col in datasets[0].data.columns if all(col in d.data.columns for d in datasets[1:])]
+        if not common:
+            st.warning("Los archivos no tienen columnas en común.")
+            return
+        col_x, col_mode, col_points = st.columns(3)
+        x_col = col_x.selectbox("Eje X común", [SAMPLE_AXIS] + common, key="batch_x_col")
+        mode = col_mode.radio("Rango X", RANGE_MODES, horizontal=True, key="batch_range_mode")
+        n_points = col_points.number_input(
+            "Puntos de la grilla", min_value=100,
+            value=target_points(PLOT_FIGSIZE[0], plt.rcParams["figure.dpi"]), step=500, key="batch_points",
+        )
+        channel_options = [col for col in common if col != x_col and col.lower() not in NOPLOT_COLS]
+        channels = st.multiselect("Canales", channel_options, default=channel_options[:1], key="batch_channels")
+        if not channels:
+            return
+
+        key = ("batch", tuple(d.key for d in datasets), tuple(names), x_col, tuple(channels), int(n_points), mode)
+        try:
+            aligned = DERIVED_CACHE.get_or_compute(
+                key, lambda: align_datasets(frames, channels, x_col, int(n_points), mode)
+            )
+        except ValueError as e:
+            st.warning(str(e))
+            return
+
+        fig, axes = plt.subplots(len(channels), 1, figsize=(PLOT_FIGSIZE[0], 5 * len(channels)),
+                                 sharex=True, squeeze=False)
+        x = aligned[x_col].to_numpy()
+        for ax, channel in zip(axes[:, 0], channels):
+            for name in names:
+                ax.plot(x, aligned[f"{channel} [{name}]"].to_numpy(), label=name)
+            ax.set_ylabel(channel)
+            ax.legend()
+            ax.grid(True)
+        axes[-1, 0].set_xlabel(x_col)
+        st.pyplot(fig)
+        plt.close(fig)
+
+        st.download_button(
+            label="Descargar comparación como CSV",
+            data=lambda: aligned.to_csv(index=False).encode('utf-8'),
+            file_name="comparacion.csv",
+            mime='text/csv'
+        )
+
+    @profiled
     def show_data_stats(self):       
         st.subheader("Data Statistics", divider=True)
         st.html(f'<span style="color: green; padding-left: 8px;">{self.data.shape[0]} rows, {self.data.shape[1]} columns</span>')
-        st.write(self.data.head(50))
+        # Solo se envía al navegador la página visible
+        show_data_grid(self.data, key="explorer", data_key=self.data_key)
+        stats = self._stats()
+        if stats is None:
+            self._poll_job((self.data_key, "stats"), "Calculando estadísticas en segundo plano")
+            return
         # Display the summary statistics
         st.subheader("Summary Statistics:", divider=True)
-        st.write(self.data.describe())
+        st.write(stats.describe())
         
         # Display the correlation matrix as a heatmap
         st.subheader("Correlation Matrix Heatmap", divider='rainbow')
         cols = st.columns([1,2,1])
         with cols[1]:
             # Eliminar columnas constantes
-            data = self.data.loc[:, self.data.nunique() > 1]
-            data = data.loc[:, ~data.columns.str.lower().isin(NOPLOT_COLS)]
-            corr = data.corr()
-            fig, ax = plt.subplots()
-            sns.heatmap(corr, annot=True, cmap='coolwarm', ax=ax, fmt="0.3f", annot_kws={"size": 5})
-            ax.set_title("Correlation Matrix Heatmap")
-            st.pyplot(fig)
+            candidate_cols = [col for col in stats.non_constant_columns() if col.lower() not in NOPLOT_COLS]
+            method = st.radio(
+                "Método", options=CORRELATION_METHODS, horizontal=True, key="corr_method",
+                format_func=str.capitalize,
+            )
+            corr_cols = st.multiselect("Columnas", options=candidate_cols, default=candidate_cols, key="corr_cols")
+            if len(corr_cols) > 1:
+                # Matriz y figura memorizadas por dataset, método y columnas seleccionadas
+                corr_key = (self.data_key, "corr", method, tuple(corr_cols))
+
+                def build_corr():
+                    if method == "pearson":
+                        return stats.corr(corr_cols)
+                    return rank_correlation(self.data, corr_cols, method)
+
+                def build_heatmap():
+                    corr = DERIVED_CACHE.get_or_compute(corr_key, build_corr, nbytes=lambda df: df.values.nbytes)
+                    return render_correlation_heatmap(corr, f"Correlation Matrix Heatmap ({method.capitalize()})")
+
+                png = DERIVED_CACHE.get_or_compute(corr_key + ("png",), build_heatmap, nbytes=len)
+                st.image(png, width="stretch")
+                if method == "kendall" and len(self.data) > KENDALL_MAX_ROWS:
+                    st.caption(f"Kendall estimado sobre {KENDALL_MAX_ROWS:,} filas equiespaciadas del dataset.")
+            else:
+                st.info("Selecciona al menos dos columnas para la matriz de correlación.")
         
         
         # Display the histogram of each column
@@ -85,24 +349,173 @@ class DataExplorer:
             key="hist_bins_input",
         )
         st.session_state["hist_bins"] = bins
-        cols = st.columns(3)
-        for i, col_name in enumerate(self.data.columns):
+        hist_cols = []
+        for col_name, n_valid in zip(stats.columns, stats.count):
             if col_name.lower() in NOPLOT_COLS:
                 continue
-            # Filtrar valores NaN y verificar si la columna tiene datos válidos
-            column_data = self.data[col_name].dropna()
-            if column_data.empty:
+            if n_valid == 0:
                 st.warning(f"La columna '{col_name}' no tiene datos válidos para graficar.")
                 continue
-            with cols[i % 3]:
-                fig, ax = plt.subplots()
-                ax.hist(self.data[col_name], bins=int(bins), alpha=0.7)
-                ax.set_title(f"Histogram of {col_name}")
-                ax.set_xlabel(col_name)
-                ax.set_ylabel("Frequency")
-                st.pyplot(fig)
-        
-        
+            hist_cols.append(col_name)
+        if hist_cols:
+            # Conteos en una pasada con los rangos ya conocidos; una sola figura por cantidad de bins
+            def build_histograms():
+                ranges = histogram_ranges(stats, hist_cols)
+                counts, edges = compute_histograms(self._chunks(hist_cols), hist_cols, ranges, int(bins))
+                return render_histogram_grid(counts, edges, hist_cols)
+
+            png = DERIVED_CACHE.get_or_compute((self.data_key, "hist", int(bins)), build_histograms, nbytes=len)
+            st.image(png, width="stretch")
+
+
+    def _chunks(self, columns=None):
+        """Bloques del dataset leídos del almacenamiento columnar (o de la memoria si no está guardado)."""
+        columns = list(columns) if columns is not None else list(self.data.columns)
+        if self.data_handle is None:
+            return iter_frame_chunks(self.data[columns])
+        return self.data_handle.iter_chunks(DEFAULT_CHUNK_ROWS, columns)
+
+    def _stats(self):
+        """
+        Estadísticas del dataset en una sola pasada por bloques, memorizadas por dataset.
+
+        Los datasets grandes se procesan por rangos de filas en el pool de
+        procesos compartido; mientras el trabajo está en curso devuelve None.
+        """
+        key = (self.data_key, "stats")
+        stats = DERIVED_CACHE.get(key)
+        if stats is not None:
+            return stats
+        if len(self.data) < JOB_MIN_ROWS or self.data_handle is None:
+            stats = compute_stats(self._chunks())
+            DERIVED_CACHE.put(key, stats, nbytes=stats.nbytes)
+            return stats
+
+        columns = list(self.data.columns)
+        # Todas las partes se centran con la media de las primeras filas para poder combinarlas
+        shift = np.nan_to_num(self.data.iloc[:DEFAULT_CHUNK_ROWS].mean().to_numpy(dtype=float))
+        parts = [(self.data_handle, start, stop, columns, shift)
+                 for start, stop in row_ranges(len(self.data), 4 * JOBS.max_workers)]
+        try:
+            job = JOBS.submit(key, stats_for_rows, parts, merge_stats)
+        except Exception:
+            # Sin pool disponible: se calcula en el mismo hilo
+            job = None
+        if job is not None and not job.done():
+            return None
+        JOBS.pop(key)
+        if job is None or job.failed():
+            stats = compute_stats(self._chunks())
+        else:
+            stats = job.result()
+        DERIVED_CACHE.put(key, stats, nbytes=stats.nbytes)
+        return stats
+
+    def _poll_job(self, key, text):
+        """Muestra el progreso de un trabajo y vuelve a ejecutar la página cuando termina."""
+        @st.fragment(run_every=0.5)
+        def progress():
+            job = JOBS.get(key)
+            if job is None or job.done():
+                st.rerun()
+            st.progress(job.progress, text=f"{text}... {job.progress:.0%} ({job.elapsed():.1f} s)")
+
+        progress()
+
+    def _interactive_plot(self, x_col, selected_cols):
+        """
+        Gráfico interactivo sobre la pirámide min/max de cada canal.
+
+        Al mover el rango solo se lee el nivel de detalle que corresponde a las
+        filas visibles, sin recorrer ni redibujar la serie completa.
+        """
+        if not selected_cols:
+            st.info("Selecciona al menos una columna para graficar.")
+            return
+        pyramids = [
+            DERIVED_CACHE.get_or_compute(
+                (self.data_key, "lod", col),
+                lambda col=col: MinMaxPyramid(self.data[col].to_numpy(dtype=float)),
+                nbytes=lambda pyramid: pyramid.nbytes,
+            )
+            for col in selected_cols
+        ]
+        x_all = self.data[x_col].to_numpy(dtype=float)
+        n_rows = len(x_all)
+        if n_rows == 0:
+            return
+        if x_col in self.sorted_columns:
+            x_min, x_max = float(x_all[0]), float(x_all[-1])
+            x_range = st.slider("Rango X", x_min, x_max, (x_min, x_max), key=f"lod_range_{x_col}")
+            rows = masked_rows(x_all, *x_range, is_sorted=True)
+            start, stop, axis = rows.start, rows.stop, x_col
+        else:
+            start, stop = st.slider("Rango de muestras", 0, n_rows, (0, n_rows), key=f"lod_rows_{x_col}")
+            axis = SAMPLE_AXIS
+        max_points = int(st.session_state.get("decimation_points", target_points(PLOT_FIGSIZE[0], plt.rcParams["figure.dpi"])))
+
+        # Todas las pirámides tienen el mismo largo: las posiciones coinciden entre canales
+        positions = None
+        columns = {}
+        for col, pyramid in zip(selected_cols, pyramids):
+            positions, columns[col] = pyramid.query(start, stop, max_points)
+        x_plot = np.interp(positions, np.arange(n_rows), x_all) if axis == x_col else positions
+        st.line_chart(pd.DataFrame({axis: x_plot, **columns}), x=axis, y=selected_cols)
+        st.caption(
+            f"Nivel de detalle {pyramids[0].level_for(stop - start, max_points)}: "
+            f"{len(positions):,} puntos por serie para {stop - start:,} filas"
+        )
+
+    def _cached_rows(self, x_col, x_lower, x_upper):
+        """Devuelve las filas dentro de los límites X, reutilizando el cálculo del rerun anterior."""
+        cache_key = (self.data_key, x_col, x_lower, x_upper)
+        cached = st.session_state.get('plot_rows_cache')
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
+        rows = masked_rows(self.data[x_col].to_numpy(), x_lower, x_upper, is_sorted=x_col in self.sorted_columns)
+        st.session_state['plot_rows_cache'] = (cache_key, rows)
+        return rows
+
+    def _draw_plot(self, plot_arrays, x_col, convert_x_time, title, x_lower, x_upper, y_lower, y_upper,
+                   max_points, decimator):
+        """Grafica las series de `plot_arrays` y aplica los límites calculados o los ingresados."""
+        fig, ax = plt.subplots(figsize=PLOT_FIGSIZE)
+        for j, label in enumerate(plot_arrays.labels):
+            if not plot_arrays.has_data(j):
+                st.warning(f"La serie '{label}' no tiene datos válidos en el rango X después de NaNs.")
+                continue
+            x_plot, y_plot = decimate(*plot_arrays.series(j), int(max_points), decimator)
+            ax.plot(x_plot, y_plot, label=label)
+
+        # Usar los límites de entrada como predeterminados para el gráfico
+        limits = plot_arrays.limits()
+        plot_x_min, plot_x_max, plot_y_min, plot_y_max = limits or (x_lower, x_upper, y_lower, y_upper)
+
+        if convert_x_time:
+            ax.set_xlabel(f"{x_col} (hh:mm:ss.mmm)")
+            ax.xaxis.set_major_formatter(
+                ticker.FuncFormatter(lambda v, _: format_seconds_hmsms(v))
+            )
+        else:
+            ax.set_xlabel(x_col)
+        ax.set_ylabel('Value')
+        ax.set_title(title)
+        ax.set_xlim(plot_x_min, plot_x_max)
+        ax.set_ylim(plot_y_min, plot_y_max)
+        ax.grid()
+        if limits is not None:
+            ax.legend()
+        st.pyplot(fig)
+        plt.close(fig)
+
+        if st.session_state.get("chk_reset", False):
+            ss_set('x_lower', plot_x_min)
+            ss_set('x_upper', plot_x_max)
+            ss_set('y_lower', plot_y_min)
+            ss_set('y_upper', plot_y_max)
+            st.rerun()
+
+    @profiled
     def plot_data(self):
 
         # data, x_col, NOPLOT_COLS, etc. deben definirse antes de usarse fuera del formulario
@@ -127,21 +540,29 @@ class DataExplorer:
             key="x_col_select"
         )
         
-        x_lower_val = ss_get('x_lower', float(data[x_col].min()))
-        x_upper_val = ss_get('x_upper', float(data[x_col].max()))
-        
-        others_for_y_calc = [col for col in data.columns if col != x_col and col.lower() not in NOPLOT_COLS and np.issubdtype(data[col].dtype, np.number)]
-        if others_for_y_calc:
-            y_vals = pd.concat([data[col].dropna() for col in others_for_y_calc if not data[col].dropna().empty])
-            if not y_vals.empty:
-                y_lower_val = ss_get('y_lower', float(y_vals.min()))
-                y_upper_val = ss_get('y_upper', float(y_vals.max()))
-            else: # Fallback si todas las columnas 'others' están vacías después de dropna
-                y_lower_val = ss_get('y_lower', 0.0)
-                y_upper_val = ss_get('y_upper', 1.0)
-        else: # Fallback si no hay columnas 'others'
-            y_lower_val = ss_get('y_lower', 0.0)
-            y_upper_val = ss_get('y_upper', 1.0)
+        # Los valores por defecto solo se calculan si todavía no hay límites en la sesión
+        if 'x_lower' not in st.session_state or 'x_upper' not in st.session_state:
+            x_values_all = data[x_col].to_numpy(dtype=float)
+            if x_col in self.sorted_columns:
+                ss_get('x_lower', float(x_values_all[0]))
+                ss_get('x_upper', float(x_values_all[-1]))
+            else:
+                ss_get('x_lower', float(np.nanmin(x_values_all)))
+                ss_get('x_upper', float(np.nanmax(x_values_all)))
+        x_lower_val = ss_get('x_lower')
+        x_upper_val = ss_get('x_upper')
+
+        if 'y_lower' not in st.session_state or 'y_upper' not in st.session_state:
+            others_for_y_calc = [col for col in data.columns if col != x_col and col.lower() not in NOPLOT_COLS and np.issubdtype(data[col].dtype, np.number)]
+            y_all = data[others_for_y_calc].to_numpy(dtype=float)
+            if y_all.size and np.isfinite(y_all).any():
+                ss_get('y_lower', float(np.nanmin(y_all)))
+                ss_get('y_upper', float(np.nanmax(y_all)))
+            else: # Fallback si no hay columnas 'others' o están vacías
+                ss_get('y_lower', 0.0)
+                ss_get('y_upper', 1.0)
+        y_lower_val = ss_get('y_lower')
+        y_upper_val = ss_get('y_upper')
 
         col1, col2, col3, col4 = st.columns(4)
         x_lower = col1.number_input(":green[Límite inferior eje X]", value=x_lower_val, key="x_lower_input")
@@ -187,11 +608,14 @@ class DataExplorer:
                 selected_cols.append(col_loop_var)
             i += 1
 
+        if st.toggle("Modo interactivo (zoom por niveles de detalle)", key="lod_mode"):
+            self._interactive_plot(x_col, selected_cols)
+
         with st.form("data_processing_form"): # Clave de formulario única
             st.subheader('Procesamiento y Filtrado de Datos', divider=True)
             
             # Sección para seleccionar columnas a filtrar
-            st.markdown("### Selecciona las columnas a Filtrar (para Media Móvil):")
+            st.markdown("### Selecciona las columnas a Filtrar:")
             selected_cols_for_filter = []
             cols_filter_selection = st.columns(6)
             i_filter = 0
@@ -245,7 +669,7 @@ class DataExplorer:
                 + offset_time.microsecond / 1e6
             )
             # ESCALADO
-            col_scale_time, col_scale_rest, col_dec = st.columns(3)
+            col_scale_time, col_scale_rest, col_dec, col_format = st.columns(4)
             scale_time = col_scale_time.number_input(
                 "Factor de escala tiempo", value=1.0, step=0.01, key="scale_time"
             )
@@ -255,258 +679,148 @@ class DataExplorer:
             decimals = col_dec.number_input(
                 "Número de decimales", min_value=0, value=2, step=1, key="decimals"
             )
+            col_format.selectbox("Formato de descarga", options=list(EXPORT_FORMATS), key="export_format")
+
+            # DECIMACIÓN: cada serie se reduce a ~2 puntos por píxel antes de graficar
+            col_decimator, col_points, _ = st.columns([1, 1, 1])
+            decimator = col_decimator.selectbox(
+                "Decimación para graficar", options=DECIMATORS, index=0, key="decimator"
+            )
+            max_points = col_points.number_input(
+                "Puntos por serie",
+                min_value=100,
+                value=target_points(PLOT_FIGSIZE[0], plt.rcParams["figure.dpi"]),
+                step=500,
+                key="decimation_points",
+            )
 
-            col_buttons = st.columns([3,1,2,7], vertical_alignment="bottom")
+            col_buttons = st.columns([3,1,2,2,5], vertical_alignment="bottom")
             submitted_plot = col_buttons[0].form_submit_button("Graficar")
             submitted_filter = col_buttons[1].form_submit_button("Filtrar")
-            window_size = col_buttons[2].number_input("Ventana Media Móvil", min_value=3, value=st.session_state.get('window_size', 21), step=1, key='window_size_input')
+            window_size = col_buttons[2].number_input("Ventana del filtro", min_value=3, value=st.session_state.get('window_size', 21), step=1, key='window_size_input')
             st.session_state.window_size = window_size # Guardar en session state para persistencia
+            filter_kernel = col_buttons[3].selectbox("Tipo de filtro", options=FILTER_KERNELS, index=0, key="filter_kernel")
 
-            if submitted_plot:
+            if submitted_plot or submitted_filter:
                 start_zero = st.session_state.get('chk_start_zero', False)
-                # Filtrar los datos basados en los límites del eje X ingresados por el usuario
-                user_mask = (data[x_col] >= x_lower) & (data[x_col] <= x_upper)
-                fig, ax = plt.subplots(figsize=(20, 10))
-
-                all_plot_x_data = []
-                all_plot_y_data = []
-                any_data_plotted_for_limits = False
-
-                for col in selected_cols:
-                    y_series_masked = data.loc[user_mask, col]
-                    x_series_masked = data.loc[user_mask, x_col]
-                    if convert_x_time:
-                        indices = data.loc[user_mask].index
-                        period_s = sample_period_us / 1e6
-                        x_series_masked = indices * period_s + offset_seconds
-                    # aplicar escalado
-                    x_series_masked = x_series_masked * scale_time
-                    y_series_masked = y_series_masked * scale_rest
-
-                    temp_df_plot = pd.DataFrame({
-                        'x': x_series_masked,
-                        'y': y_series_masked
-                    }).dropna(subset=['y'])
-                    if start_zero:
-                        temp_df_plot['x'] = temp_df_plot['x'] - temp_df_plot['x'].min()
-
-                    if not temp_df_plot.empty:
-                        ax.plot(temp_df_plot['x'], temp_df_plot['y'], label=col)
-                        all_plot_x_data.append(temp_df_plot['x'])
-                        all_plot_y_data.append(temp_df_plot['y'])
-                        any_data_plotted_for_limits = True
-                    else:
-                        st.warning(f"La columna '{col}' no tiene datos válidos para graficar después de aplicar la máscara y dropna.")
-                
-                # Usar los límites de entrada como predeterminados para el gráfico
-                plot_x_min, plot_x_max = x_lower, x_upper
-                plot_y_min, plot_y_max = y_lower, y_upper
-
-                if any_data_plotted_for_limits:
-                    combined_x_data = pd.concat(all_plot_x_data)
-                    combined_y_data = pd.concat(all_plot_y_data)
-                    if not combined_x_data.empty:
-                        plot_x_min = combined_x_data.min()
-                        plot_x_max = combined_x_data.max()
-                    if not combined_y_data.empty:
-                        plot_y_min = combined_y_data.min()
-                        plot_y_max = combined_y_data.max()
-                
-                if convert_x_time:
-                    ax.set_xlabel(f"{x_col} (hh:mm:ss.mmm)")
-                    ax.xaxis.set_major_formatter(
-                        FuncFormatter(lambda v, _: format_seconds_hmsms(v))
-                    )
-                else:
-                    ax.set_xlabel(x_col)
-                ax.set_ylabel('Value')
-                ax.set_title("Data Plot")
-                ax.set_xlim(plot_x_min, plot_x_max)
-                ax.set_ylim(plot_y_min, plot_y_max)
-                ax.grid()
-                if selected_cols and any_data_plotted_for_limits:
-                    ax.legend()
-                st.pyplot(fig)
+                # Máscara del eje X: se calcula una vez y se reutiliza entre reruns si no cambian los límites
+                rows = self._cached_rows(x_col, x_lower, x_upper)
+                index_values = data.index.to_numpy()[rows]
+                x_values = data[x_col].to_numpy()[rows]
+                period_s = sample_period_us / 1e6
+
+            if submitted_plot:
+                plot_arrays = prepare_plot_arrays(
+                    x_values,
+                    index_values,
+                    # Solo se copian las filas de la ventana X
+                    data[selected_cols].iloc[rows].to_numpy(dtype=float) if selected_cols else np.empty((len(x_values), 0)),
+                    selected_cols,
+                    convert_x_time=convert_x_time,
+                    period_s=period_s,
+                    offset_seconds=offset_seconds,
+                    scale_time=scale_time,
+                    scale_rest=scale_rest,
+                    start_zero=start_zero,
+                )
+                self._draw_plot(plot_arrays, x_col, convert_x_time, "Data Plot", x_lower, x_upper, y_lower, y_upper,
+                                max_points, decimator)
 
                 # Preparar descarga
                 if save_data:
                     columns_to_save = [x_col] + selected_cols
-                    selected_data_to_save = data.loc[user_mask, columns_to_save].copy()
-                    if st.session_state.get('chk_start_zero', False):
-                        selected_data_to_save[x_col] = selected_data_to_save[x_col] - selected_data_to_save[x_col].min()
-                    # aplicar escalado a CSV seleccionado
-                    selected_data_to_save[x_col] = selected_data_to_save[x_col] * st.session_state.get('scale_time', 1.0)
-                    for c in selected_cols:
-                        selected_data_to_save[c] = selected_data_to_save[c] * st.session_state.get('scale_rest', 1.0)
-                    # redondear según decimales
-                    dec = st.session_state.get('decimals', 2)
-                    selected_data_to_save = selected_data_to_save.round(dec)
-                    csv = selected_data_to_save.to_csv(index=False).encode('utf-8')
+                    # Se guardan los datos crudos de la ventana X: desplazamiento, escalado y
+                    # redondeo se aplican por bloques al descargar
+                    if isinstance(rows, slice) and self.data_handle is not None:
+                        # Ventana contigua: un handle sobre el dataset ya guardado, sin copiar filas
+                        selected_handle = self.data_handle.window(rows.start, rows.stop, map(str, columns_to_save))
+                    else:
+                        selected_handle = store_frame(data[columns_to_save].iloc[rows])
                     original_name = os.path.basename(self.data_file_name)
                     output_file_name = f"selected_{original_name}"
-                    st.session_state['selected_data_df'] = selected_data_to_save
+                    # En la sesión solo se guarda un handle al almacenamiento columnar
+                    st.session_state['selected_data_handle'] = selected_handle
                     st.session_state['selected_data_name'] = output_file_name
                     st.success(f"Dataset seleccionado listo para descargar.")
 
-                if st.session_state.get("chk_reset", False):
-                    ss_set('x_lower', plot_x_min)
-                    ss_set('x_upper', plot_x_max)
-                    ss_set('y_lower', plot_y_min)
-                    ss_set('y_upper', plot_y_max)
-                    st.session_state.chk_reset = False 
-                    st.experimental_rerun()
-
             if submitted_filter:
-                start_zero = st.session_state.get('chk_start_zero', False)
-                st.write("Aplicando filtro de media móvil (ventana {})...".format(window_size))
+                st.write("Aplicando filtro {} (ventana {})...".format(filter_kernel, window_size))
                 cols_to_filter = selected_cols_for_filter
 
                 if not cols_to_filter:
                     st.warning("No hay columnas numéricas para aplicar el filtro.")
                 else:
-                    filtered_df = self.data.copy()
-                    for col in cols_to_filter:
-                        filtered_df[f"{col}_f"] = filtered_df[col].rolling(window=window_size, center=True).mean()
-
-                    df_for_download = pd.DataFrame()
-                    if x_col in data.columns:
-                        df_for_download[x_col] = data[x_col].copy()
-                    for col_to_plot_original_name in selected_cols:
-                        if col_to_plot_original_name in cols_to_filter:
-                            filtered_col_name_for_download = f"{col_to_plot_original_name}_f"
-                            if filtered_col_name_for_download in filtered_df.columns:
-                                df_for_download[filtered_col_name_for_download] = filtered_df[filtered_col_name_for_download].copy()
+                    # Solo se filtran las columnas que además se grafican; cada resultado se
+                    # memoriza por (columna, filtro, ventana) y se reutiliza entre reruns
+                    filtered_cols = [col for col in selected_cols if col in cols_to_filter]
+                    filtered = filter_columns(data, filtered_cols, filter_kernel, window_size,
+                                              cache=DERIVED_CACHE, data_key=self.data_key)
+
+                    download_columns = {x_col: data[x_col].to_numpy()}
+                    plot_columns = []
+                    plot_labels = []
+                    for col in selected_cols:
+                        if col in cols_to_filter:
+                            values = filtered[col]
+                            download_columns[f"{col}_f"] = values
+                            plot_labels.append(f"{col} (filtrado)")
                         else:
-                            if col_to_plot_original_name in data.columns:
-                                df_for_download[col_to_plot_original_name] = data[col_to_plot_original_name].copy()
-                    
-                    st.session_state['filtered_data_df'] = df_for_download
+                            values = data[col].to_numpy()
+                            download_columns[col] = values
+                            plot_labels.append(col)
+                        plot_columns.append(values)
+
+                    st.session_state['filtered_data_handle'] = store_frame(pd.DataFrame(download_columns))
                     st.session_state['filtered_data_name'] = f"plotted_data_{os.path.basename(self.data_file_name)}"
-                    st.success("Filtro de media móvil aplicado.")
+                    st.success(f"Filtro {filter_kernel} aplicado.")
                     st.info("El botón de descarga aparecerá debajo del formulario.")
 
                     st.write("Graficando datos...")
-                    fig, ax = plt.subplots(figsize=(20, 10))
-                    any_data_plotted_for_limits = False
-                    all_plot_x_data_filter = []
-                    all_plot_y_data_filter = []
-
-                    for col_to_plot_original_name in selected_cols:
-                        if col_to_plot_original_name in cols_to_filter:
-                            col_y_axis_name = f"{col_to_plot_original_name}_f"
-                            source_df_for_plot = filtered_df
-                            plot_series_label = f"{col_to_plot_original_name} (filtrado)"
-                        else:
-                            col_y_axis_name = col_to_plot_original_name
-                            source_df_for_plot = data
-                            plot_series_label = f"{col_to_plot_original_name}"
-
-                        if x_col not in source_df_for_plot.columns:
-                            st.warning(f"Columna X '{x_col}' no encontrada para '{plot_series_label}'.")
-                            continue
-                        if col_y_axis_name not in source_df_for_plot.columns:
-                            st.warning(f"Columna Y '{col_y_axis_name}' no encontrada para '{plot_series_label}'.")
-                            continue
-                            
-                        # Aplicar límites del eje X definidos por el usuario para la selección de datos
-                        current_series_data_bounded = source_df_for_plot[
-                            (source_df_for_plot[x_col] >= x_lower) & (source_df_for_plot[x_col] <= x_upper)
-                        ][[x_col, col_y_axis_name]].copy()
-
-                        current_series_data_bounded.dropna(subset=[col_y_axis_name], inplace=True)
-                        if convert_x_time:
-                            period_s = sample_period_us / 1e6
-                            current_series_data_bounded[x_col] = (
-                                current_series_data_bounded.index * period_s + offset_seconds
-                            )
-
-                        if current_series_data_bounded.empty:
-                            st.warning(f"La serie '{plot_series_label}' no tiene datos válidos en el rango X después de NaNs.")
-                            continue
-                        
-                        ax.plot(current_series_data_bounded[x_col], current_series_data_bounded[col_y_axis_name], label=plot_series_label)
-                        all_plot_x_data_filter.append(current_series_data_bounded[x_col])
-                        all_plot_y_data_filter.append(current_series_data_bounded[col_y_axis_name])
-                        any_data_plotted_for_limits = True
-                    
-                    plot_x_min_f, plot_x_max_f = x_lower, x_upper
-                    plot_y_min_f, plot_y_max_f = y_lower, y_upper
-
-                    if any_data_plotted_for_limits:
-                        combined_x_data_f = pd.concat(all_plot_x_data_filter)
-                        combined_y_data_f = pd.concat(all_plot_y_data_filter)
-                        if not combined_x_data_f.empty:
-                            plot_x_min_f = combined_x_data_f.min()
-                            plot_x_max_f = combined_x_data_f.max()
-                        if not combined_y_data_f.empty:
-                            plot_y_min_f = combined_y_data_f.min()
-                            plot_y_max_f = combined_y_data_f.max()
-                    
-                    if convert_x_time:
-                        ax.set_xlabel(f"{x_col} (hh:mm:ss.mmm)")
-                        ax.xaxis.set_major_formatter(
-                            FuncFormatter(lambda v, _: format_seconds_hmsms(v))
-                        )
-                    else:
-                        ax.set_xlabel(x_col)
-                    ax.set_ylabel('Value')
-                    ax.set_title("Gráfico de Datos (con columnas filtradas y originales)")
-                    ax.set_xlim(plot_x_min_f, plot_x_max_f)
-                    ax.set_ylim(plot_y_min_f, plot_y_max_f)
-                    ax.grid()
-                    if any_data_plotted_for_limits:
-                        ax.legend()
-                    st.pyplot(fig)
-
-                    if st.session_state.get("chk_reset", False):
-                        ss_set('x_lower', plot_x_min_f)
-                        ss_set('x_upper', plot_x_max_f)
-                        ss_set('y_lower', plot_y_min_f)
-                        ss_set('y_upper', plot_y_max_f)
-                        st.session_state.chk_reset = False
-                        st.experimental_rerun()
+                    y_matrix = np.column_stack([values[rows] for values in plot_columns]) if plot_columns else np.empty((len(x_values), 0))
+                    plot_arrays = prepare_plot_arrays(
+                        x_values,
+                        index_values,
+                        y_matrix,
+                        plot_labels,
+                        convert_x_time=convert_x_time,
+                        period_s=period_s,
+                        offset_seconds=offset_seconds,
+                    )
+                    self._draw_plot(plot_arrays, x_col, convert_x_time,
+                                    "Gráfico de Datos (con columnas filtradas y originales)",
+                                    x_lower, x_upper, y_lower, y_upper, max_points, decimator)
 
         # Check session state outside the form to display the download button
-        if 'filtered_data_df' in st.session_state:
-            filtered_df_to_download = st.session_state['filtered_data_df']
-            # aplicar desplazamiento y escalado a datos filtrados
-            df_fd = filtered_df_to_download.copy()
-            if st.session_state.get('chk_start_zero', False):
-                x0 = df_fd.columns[0]
-                df_fd[x0] = df_fd[x0] - df_fd[x0].min()
-            df_fd[df_fd.columns[0]] = df_fd[df_fd.columns[0]] * st.session_state.get('scale_time', 1.0)
-            for c in df_fd.columns[1:]:
-                df_fd[c] = df_fd[c] * st.session_state.get('scale_rest', 1.0)
-            # redondear según decimales
-            dec = st.session_state.get('decimals', 2)
-            df_fd = df_fd.round(dec)
-            csv = df_fd.to_csv(index=False).encode('utf-8')
+        export_format = st.session_state.get('export_format', "CSV")
+        mime = EXPORT_FORMATS[export_format][1]
+        dec = st.session_state.get('decimals', 2)
+
+        # Desplazamiento, escalado y redondeo se aplican por bloques al hacer clic en descargar
+        transform = ExportTransform(
+            start_zero=st.session_state.get('chk_start_zero', False),
+            scale_time=st.session_state.get('scale_time', 1.0),
+            scale_rest=st.session_state.get('scale_rest', 1.0),
+            decimals=dec,
+        )
+
+        if 'filtered_data_handle' in st.session_state:
+            download_name = st.session_state['filtered_data_name']
             st.download_button(
-                label="Descargar datos filtrados como CSV",
-                data=csv,
-                file_name=download_name,
-                mime='text/csv'
+                label=f"Descargar datos filtrados como {export_format}",
+                data=lazy_export(st.session_state['filtered_data_handle'], export_format, transform),
+                file_name=export_file_name(download_name, export_format),
+                mime=mime
             )
-            # Remove 'filtered_data_df' from session state after download
-            del st.session_state['filtered_data_df']
+            # Remove 'filtered_data_handle' from session state after download
+            del st.session_state['filtered_data_handle']
         
-        if 'selected_data_df' in st.session_state:
-            selected_df_to_download = st.session_state['selected_data_df']
+        if 'selected_data_handle' in st.session_state:
             download_name = st.session_state['selected_data_name']
-            # Aplicar desplazamiento a cero si corresponde
-            df_to_download = selected_df_to_download.copy()
-            if st.session_state.get('chk_start_zero', False):
-                x_col_dl = df_to_download.columns[0]
-                df_to_download[x_col_dl] = df_to_download[x_col_dl] - df_to_download[x_col_dl].min()
-            # redondear según decimales
-            dec = st.session_state.get('decimals', 2)
-            df_to_download = df_to_download.round(dec)
-            csv = df_to_download.to_csv(index=False).encode('utf-8')
             st.download_button(
-                label="Descargar datos seleccionados como CSV",
-                data=csv,
-                file_name=download_name,
-                mime='text/csv'
+                label=f"Descargar datos seleccionados como {export_format}",
+                data=lazy_export(st.session_state['selected_data_handle'], export_format, transform),
+                file_name=export_file_name(download_name, export_format),
+                mime=mime
             )
                 
                 
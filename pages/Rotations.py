@@ -4,6 +4,7 @@ import random # Importar random
 import io # Añadido para la descarga de Excel
 import numpy as np # AÑADIDO para generación de arrays aleatorios
 from config import page_config
+from profiling import end_rerun
 
 # Configuración de la página
 page_config(title="Cell Rotations", icon="🔄")
@@ -181,6 +182,9 @@ if uploaded_file is not None:
     except Exception as e:
         st.error(f"Error al leer o procesar el archivo Excel: {e}")
 
+# Cierra la traza de tiempos del rerun (ver profiling.py)
+end_rerun()
+
 # Aquí puedes agregar más contenido o funcionalidades para esta página en el futuro.
 # st.write("Página en construcción.")
 
@@ -2,6 +2,7 @@ import pandas as pd
 import streamlit as st
 
 from config import page_config
+from profiling import profiled
 from utils import ss_get, ss_set
 
 
@@ -19,6 +20,7 @@ class TestPage:
         
         
         
+    @profiled
     def layout(self):
         
         @st.fragment()
@@ -2,6 +2,8 @@ import pandas as pd
 import streamlit as st
 
 from config import page_config
+from data_grid import show_data_grid
+from data_loader import file_digest
 
 
 class Graficador:
@@ -31,7 +33,7 @@ class Graficador:
                             else:
                                 df = pd.read_excel(file)
                             st.markdown(f"### {file.name}")
-                            st.write(df)
+                            show_data_grid(df, key=file.name, data_key=file_digest(file.getvalue()))
                             st.markdown(f"### Estadísticas Descriptivas para {file.name}")
                             st.write(df.describe())
 
@@ -0,0 +1,255 @@
+"""
+Gráficos de calibración renderizados a PNG fuera del hilo del script.
+
+Cada gráfico se describe con un `FigureSpec` (datos y textos, sin objetos de
+matplotlib) que se dibuja con el backend Agg en el pool de procesos compartido
+de `jobs.py`. Los PNG se guardan en `DERIVED_CACHE` indexados por (hash de los
+datos, celda, tipo de gráfico, estilo): un rerun que no cambia nada de lo que
+se ve en el gráfico (por ejemplo, solo los datos del informe) no vuelve a
+rasterizar. La fecha de calibración y el patrón no se dibujan en los gráficos
+que ve la página ni en los del informe (la página los muestra aparte y el
+informe en el encabezado de cada hoja), de modo que cambiarlos no invalida
+esos PNG ni las secciones del informe. Solo los PNG que se exportan sueltos
+(descargas, ZIP, archivos de la campaña) los llevan, como `caption` del spec
+(ver `export_specs`); la página los dibuja recién cuando se pide la descarga.
+"""
+import hashlib
+import io
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from calibration_engine import angle_label
+from data_loader import DERIVED_CACHE
+from jobs import JOBS
+
+
+PLOT_DPI = 200
+PLOT_SIZE = (10, 5)
+PLOT_ORIGINAL = "puntos_originales"
+PLOT_ABS_ERROR = "error_absoluto"
+PLOT_REL_ERROR = "error_relativo"
+PLOT_KINDS = (PLOT_ORIGINAL, PLOT_ABS_ERROR, PLOT_REL_ERROR)
+# Por debajo de esta cantidad de gráficos pendientes conviene dibujar en el mismo hilo
+POOL_MIN_FIGURES = 6
+
+# Color y marcador de cada condición de ensayo; otros ángulos toman los de EXTRA_STYLES en orden
+ANGLE_STYLES = {
+    "0": ("tab:blue", "o"),
+    "R": ("tab:orange", "x"),
+    "120": ("tab:green", "s"),
+    "240": ("tab:red", "^"),
+}
+EXTRA_STYLES = [("tab:purple", "D"), ("tab:brown", "v"), ("tab:pink", "P"), ("tab:gray", "*"), ("tab:olive", "h"), ("tab:cyan", "X")]
+
+
+def angle_style(angle: str, position: int) -> tuple:
+    """Color y marcador para graficar la serie de un ángulo."""
+    return ANGLE_STYLES.get(angle) or EXTRA_STYLES[position % len(EXTRA_STYLES)]
+
+
+def plot_file_name(kind: str, cell: int, denominacion: str) -> str:
+    """Nombre del PNG de un gráfico; el informe PDF lo asocia a la celda por `celda<n>_`."""
+    return f"{kind}_celda{cell}_{denominacion}.png"
+
+
+@dataclass(frozen=True)
+class SeriesSpec:
+    """Serie de un ángulo: puntos (x, y) y, opcionalmente, la curva de ajuste."""
+    label: str
+    color: str
+    marker: str
+    x: np.ndarray
+    y: np.ndarray
+    fit: tuple = None
+
+
+@dataclass(frozen=True)
+class FigureSpec:
+    """Descripción completa de un gráfico de calibración."""
+    kind: str
+    cell: int
+    title: str
+    unit: str
+    series: tuple
+    tolerance: float = None
+    dpi: int = PLOT_DPI
+    caption: str = None
+
+    def data_digest(self) -> str:
+        """Hash de los datos graficados."""
+        digest = hashlib.sha1()
+        for serie in self.series:
+            for values in (serie.x, serie.y) + tuple(serie.fit or ()):
+                digest.update(np.ascontiguousarray(values, dtype=float).tobytes())
+                digest.update(b"|")
+        return digest.hexdigest()
+
+    def style(self) -> tuple:
+        """Todo lo que cambia el aspecto del gráfico además de los datos."""
+        return (self.title, self.unit, self.tolerance, self.dpi, self.caption,
+                tuple((serie.label, serie.color, serie.marker) for serie in self.series))
+
+    def cache_key(self) -> tuple:
+        return (self.data_digest(), self.cell, self.kind, self.style())
+
+
+def cell_figure_specs(results, cell: int, denominacion: str, unidad: str, tolerancia: float) -> list:
+    """
+    Specs de los tres gráficos de una celda (puntos originales, error absoluto y error relativo).
+
+    Args:
+        results (CalibrationResults): Resultados del motor de calibración.
+        cell (int): Número de celda.
+        denominacion (str): Denominación de la celda.
+        unidad (str): Unidad de fuerza.
+        tolerancia (float): Límite de tolerancia relativo (%).
+    """
+    angles = results.sheet.angles_of(cell)
+    series = {angle: results.series(cell, angle) for angle in angles}
+    styles = {angle: angle_style(angle, pos) for pos, angle in enumerate(angles)}
+
+    def spec(kind, title, y_field, with_fit=False, tolerance=None):
+        return FigureSpec(
+            kind=kind,
+            cell=int(cell),
+            title=f"{title} {denominacion}",
+            unit=unidad,
+            series=tuple(
+                SeriesSpec(
+                    label=angle_label(angle),
+                    color=styles[angle][0],
+                    marker=styles[angle][1],
+                    x=data["pat"],
+                    y=data[y_field],
+                    fit=results.fit_curve(cell, angle) if with_fit else None,
+                )
+                for angle, data in series.items()
+            ),
+            tolerance=tolerance,
+        )
+
+    return [
+        spec(PLOT_ORIGINAL, "Puntos de Medición Originales", "dut"),
+        spec(PLOT_ABS_ERROR, "Error Absoluto", "abs_error"),
+        spec(PLOT_REL_ERROR, "Error Relativo", "rel_error", with_fit=True, tolerance=tolerancia),
+    ]
+
+
+def export_caption(denominacion_patron: str, fecha: str) -> str:
+    """Leyenda que identifica la calibración en un gráfico exportado."""
+    return f"Patrón: {denominacion_patron} - Fecha de Calibración: {fecha}"
+
+
+def export_specs(specs: list, denominacion_patron: str, fecha: str) -> list:
+    """Los mismos specs con el patrón y la fecha de calibración dibujados bajo el título."""
+    caption = export_caption(denominacion_patron, fecha)
+    return [replace(spec, caption=caption) for spec in specs]
+
+
+def _draw_original(ax, spec: FigureSpec):
+    for serie in spec.series:
+        ax.scatter(serie.x, serie.y, label=serie.label, color=serie.color, marker=serie.marker, s=60, zorder=3)
+    ax.set_xlabel(f"Patrón ({spec.unit})")
+    ax.set_ylabel(f"DUT ({spec.unit})")
+    ax.legend()
+    ax.grid(True)
+
+
+def _draw_abs_error(ax, spec: FigureSpec):
+    # Una serie de barras por ángulo, indexadas por punto de medición
+    n_points = len(spec.series[0].y) if spec.series else 0
+    x = np.arange(n_points)
+    bar_width = 0.8 / max(len(spec.series), 1)
+    offset = -(len(spec.series) - 1) * bar_width / 2
+    for serie in spec.series:
+        ax.bar(x + offset, serie.y, width=bar_width, label=serie.label, color=serie.color, alpha=0.7)
+        offset += bar_width
+    ax.set_xlabel(f"Patrón ({spec.unit})")
+    ax.set_ylabel(f"Error absoluto ({spec.unit})")
+    ax.set_xticks(x)
+    ax.legend()
+    ax.grid()
+    ax.axhline(0, color="black", linewidth=1)
+
+
+def _draw_rel_error(ax, spec: FigureSpec):
+    for serie in spec.series:
+        ax.scatter(serie.x, serie.y, label=serie.label, color=serie.color, s=60, marker=serie.marker, zorder=3)
+    for serie in spec.series:
+        if serie.fit is not None:
+            ax.plot(*serie.fit, color=serie.color, linestyle="--", label=f"Ajuste {serie.label.lower()}", zorder=2)
+    ax.set_xlabel(f"Patrón ({spec.unit})")
+    ax.set_ylabel("Error relativo (%)")
+    ax.axhline(0, color="black", linewidth=1)
+    if spec.tolerance is not None:
+        ax.axhline(-spec.tolerance, color="gray", linestyle="--", linewidth=1)
+        ax.axhline(spec.tolerance, color="gray", linestyle="--", linewidth=1)
+        # Área de tolerancia sobre todo el rango del patrón de la celda
+        pat = np.concatenate([np.asarray(serie.x, dtype=float) for serie in spec.series]) if spec.series else np.array([])
+        pat = pat[np.isfinite(pat)]
+        x_min, x_max = (pat.min(), pat.max()) if len(pat) else (0, 1)
+        ax.fill_between(np.linspace(x_min, x_max, 200), -spec.tolerance, spec.tolerance,
+                        color="green", alpha=0.1, label=f"Zona de tolerancia (+/-{spec.tolerance:.1f}%)")
+    ax.legend()
+    ax.grid()
+    ax.grid(which="major", linestyle="-", linewidth=0.7)
+    ax.grid(which="minor", linestyle=":", linewidth=0.5, alpha=1.0)
+    ax.minorticks_on()
+
+
+_DRAWERS = {
+    PLOT_ORIGINAL: _draw_original,
+    PLOT_ABS_ERROR: _draw_abs_error,
+    PLOT_REL_ERROR: _draw_rel_error,
+}
+
+
+def render_png(spec: FigureSpec) -> bytes:
+    """Dibuja un gráfico con Agg y devuelve el PNG (no usa pyplot ni su estado global)."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=PLOT_SIZE)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    _DRAWERS[spec.kind](ax, spec)
+    if spec.caption:
+        ax.set_title(spec.title, pad=24)
+        fig.text(0.5, 0.91, spec.caption, ha="center", fontsize=10, color="gray")
+    else:
+        ax.set_title(spec.title)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=spec.dpi)
+    return buffer.getvalue()
+
+
+def render_figures(specs: list, cache=DERIVED_CACHE, jobs=JOBS, pool_min: int = POOL_MIN_FIGURES) -> list:
+    """
+    PNG de cada spec, en el mismo orden.
+
+    Los que no están en la caché se dibujan en el pool de procesos si son al
+    menos `pool_min`; si son menos, o si el pool falla (un proceso caído, un
+    error al serializar), en el mismo hilo.
+    """
+    keys = [spec.cache_key() for spec in specs]
+    pngs = [cache.get(("plot",) + key) if cache is not None else None for key in keys]
+    missing = [i for i, png in enumerate(pngs) if png is None]
+    if not missing:
+        return pngs
+    rendered = None
+    if jobs is not None and len(missing) >= pool_min:
+        job_key = ("plots",) + tuple(keys[i] for i in missing)
+        try:
+            rendered = jobs.submit(job_key, render_png, [(specs[i],) for i in missing], list).result()
+        except Exception:
+            rendered = None
+        finally:
+            jobs.pop(job_key)
+    if rendered is None:
+        rendered = [render_png(specs[i]) for i in missing]
+    for i, png in zip(missing, rendered):
+        pngs[i] = png
+        if cache is not None:
+            cache.put(("plot",) + keys[i], png, nbytes=len(png))
+    return pngs
@@ -0,0 +1,236 @@
+"""
+Instrumentación de tiempos y memoria por rerun.
+
+`config.page_config` abre una traza por cada ejecución de la página y los
+métodos principales de cada página se decoran con `@profiled`. Dentro de ellos
+se pueden marcar etapas con `with stage("nombre", rows=n):`. Al terminar la
+etapa más externa la traza se cierra (las páginas de script sin métodos
+decorados llaman a `end_rerun()` al final):
+
+- se agrega al historial de la sesión (últimos `HISTORY_SIZE` reruns);
+- se escribe como una línea JSON en `LABSTORE_TRACE_FILE`, para agregar
+  resultados de todos los usuarios;
+- si el panel de depuración está habilitado (`LABSTORE_DEBUG=1` o `?debug=1`
+  en la URL) se muestra en la barra lateral.
+
+El pico de memoria se mide con tracemalloc, que se activa una sola vez al
+iniciar el proceso con `LABSTORE_PROFILE_MEMORY=1` porque agrega costo a cada
+asignación. tracemalloc es global al proceso: ninguna sesión lo detiene ni
+reinicia su pico, y el pico de cada etapa se informa como diferencia respecto
+de la memoria al entrar (con sesiones concurrentes es aproximado, porque
+incluye lo que asignan los demás hilos).
+"""
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+import streamlit as st
+
+
+TRACE_FILE = os.environ.get("LABSTORE_TRACE_FILE", os.path.join(tempfile.gettempdir(), "labstore_trace.jsonl"))
+DEBUG_PANEL = os.environ.get("LABSTORE_DEBUG", "") == "1"
+HISTORY_SIZE = 20
+
+_local = threading.local()
+_file_lock = threading.Lock()
+
+if os.environ.get("LABSTORE_PROFILE_MEMORY", "") == "1":
+    tracemalloc.start()
+
+
+@dataclass
+class StageRecord:
+    """Tiempo, pico de memoria (sobre la memoria al entrar) y filas procesadas de una etapa."""
+    name: str
+    depth: int
+    seconds: float = 0.0
+    peak_bytes: int = None
+    rows: int = None
+
+
+@dataclass
+class RerunTrace:
+    """Etapas registradas durante una ejecución de la página."""
+    page: str
+    started_at: float
+    stages: list = field(default_factory=list)
+    seconds: float = 0.0
+    peak_bytes: int = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class _OpenStage:
+    """Etapa en curso; `add_rows` acumula las filas procesadas."""
+    def __init__(self, record: StageRecord):
+        self.record = record
+        self.start_bytes = 0
+        self.start_peak = 0
+
+    def add_rows(self, rows: int):
+        self.record.rows = (self.record.rows or 0) + int(rows)
+
+
+def current_trace():
+    return getattr(_local, "trace", None)
+
+
+def begin_rerun(page: str):
+    """
+    Abre la traza de un rerun (la llama `page_config`).
+
+    Si la traza del rerun anterior quedó abierta (ninguna etapa la cerró), se
+    escribe antes con el tiempo medido en sus etapas.
+    """
+    if current_trace() is not None:
+        pending = current_trace()
+        _finish_rerun(seconds=sum(record.seconds for record in pending.stages if record.depth == 0),
+                      show_panel=False)
+    _local.trace = RerunTrace(page=page, started_at=time.time())
+    _local.stack = []
+    _local.perf_start = time.perf_counter()
+
+
+@contextmanager
+def stage(name: str, rows: int = None):
+    """
+    Registra el tiempo y el pico de memoria de un bloque de código.
+
+    Si no hay una traza abierta (por ejemplo, en los tests) no registra nada.
+    """
+    trace = current_trace()
+    if trace is None:
+        yield _OpenStage(StageRecord(name=name, depth=0))
+        return
+    stack = _local.stack
+    record = StageRecord(name=name, depth=len(stack), rows=rows)
+    trace.stages.append(record)
+    tracing = tracemalloc.is_tracing()
+    open_stage = _OpenStage(record)
+    if tracing:
+        open_stage.start_bytes, open_stage.start_peak = tracemalloc.get_traced_memory()
+    stack.append(open_stage)
+    start = time.perf_counter()
+    try:
+        yield open_stage
+    finally:
+        record.seconds = time.perf_counter() - start
+        stack.pop()
+        if tracing and tracemalloc.is_tracing():
+            record.peak_bytes = _stage_peak(open_stage)
+        if not stack:
+            _finish_rerun()
+
+
+def _stage_peak(open_stage: _OpenStage) -> int:
+    """
+    Pico de la etapa sobre la memoria al entrar, sin reiniciar el pico global.
+
+    Si durante la etapa el pico del proceso superó al que había al entrar, ese
+    nuevo pico ocurrió dentro de la etapa; si no, solo se sabe que la etapa
+    retuvo al menos la memoria actual.
+    """
+    current, peak = tracemalloc.get_traced_memory()
+    top = peak if peak > open_stage.start_peak else current
+    return max(top - open_stage.start_bytes, 0)
+
+
+def profiled(func=None, *, name: str = None):
+    """
+    Decorador que registra un método de página como etapa.
+
+    Si no hay traza abierta, abre una con el nombre de la clase; al salir de la
+    etapa más externa se cierra el rerun. También se cierra si Streamlit corta
+    la ejecución con st.stop() o st.rerun().
+    """
+    if func is None:
+        return functools.partial(profiled, name=name)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if current_trace() is None:
+            owner = type(args[0]).__name__ if args else func.__module__
+            begin_rerun(owner)
+        with stage(name or func.__qualname__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def end_rerun():
+    """Cierra la traza del rerun si sigue abierta (páginas de script sin `@profiled`)."""
+    if current_trace() is not None and not _local.stack:
+        _finish_rerun()
+
+
+def _finish_rerun(seconds: float = None, show_panel: bool = True):
+    trace = _local.trace
+    _local.trace = None
+    trace.seconds = time.perf_counter() - _local.perf_start if seconds is None else seconds
+    peaks = [record.peak_bytes for record in trace.stages if record.peak_bytes is not None]
+    trace.peak_bytes = max(peaks) if peaks else None
+    write_trace(trace)
+    try:
+        history = st.session_state.setdefault("_profiling_history", deque(maxlen=HISTORY_SIZE))
+        history.append(trace)
+        if show_panel and debug_enabled():
+            show_debug_panel(history)
+    except Exception:
+        # Fuera de una sesión de Streamlit (scripts, tests) solo se escribe el archivo
+        pass
+
+
+def write_trace(trace: RerunTrace, path: str = None):
+    """Agrega la traza como una línea JSON al archivo de trazas."""
+    path = path or TRACE_FILE
+    line = json.dumps(trace.to_dict(), ensure_ascii=False)
+    try:
+        with _file_lock, open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError:
+        pass
+
+
+def debug_enabled() -> bool:
+    return DEBUG_PANEL or st.query_params.get("debug") == "1"
+
+
+def show_debug_panel(history):
+    """Panel lateral con los últimos reruns de la sesión y las etapas del último."""
+    with st.sidebar.expander("🔧 Perfilado", expanded=False):
+        if not tracemalloc.is_tracing():
+            st.caption("Medición de memoria desactivada (iniciar con LABSTORE_PROFILE_MEMORY=1)")
+        st.dataframe(
+            [
+                {
+                    "página": trace.page,
+                    "hora": time.strftime("%H:%M:%S", time.localtime(trace.started_at)),
+                    "s": round(trace.seconds, 3),
+                    "pico MB": round(trace.peak_bytes / 2**20, 1) if trace.peak_bytes is not None else None,
+                }
+                for trace in reversed(history)
+            ],
+            hide_index=True,
+        )
+        last = history[-1]
+        st.caption(f"Etapas del último rerun ({last.page})")
+        st.dataframe(
+            [
+                {
+                    "etapa": "  " * record.depth + record.name,
+                    "s": round(record.seconds, 4),
+                    "pico MB": round(record.peak_bytes / 2**20, 1) if record.peak_bytes is not None else None,
+                    "filas": record.rows,
+                }
+                for record in last.stages
+            ],
+            hide_index=True,
+        )
+        st.caption(f"Trazas: {TRACE_FILE}")
@@ -0,0 +1,231 @@
+"""
+Almacenamiento columnar en disco para datasets de sesión.
+
+En lugar de guardar DataFrames completos en st.session_state, las páginas
+guardan los datos en archivos Feather (Arrow IPC sin compresión) dentro de un
+directorio de caché local y conservan en la sesión solo un `DatasetHandle`.
+Las columnas se leen bajo demanda con memory-mapping, por lo que muchas
+sesiones concurrentes comparten la caché de páginas del sistema operativo en
+lugar de duplicar los datos en memoria.
+
+Los archivos sin uso durante `MAX_AGE_SECONDS` se borran la primera vez que el
+proceso guarda un dataset; nunca se borra un archivo al que apunta un handle
+vivo del proceso (por ejemplo, uno guardado en la sesión de un usuario).
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import weakref
+from collections import Counter
+from dataclasses import dataclass, replace
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+
+STORE_DIR = os.environ.get("LABSTORE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "labstore_cache"))
+MAX_AGE_SECONDS = 24 * 3600
+
+# Archivos referenciados por handles vivos del proceso (ruta -> cantidad de handles)
+_live_paths = Counter()
+_live_lock = threading.Lock()
+_pruned = False
+
+
+def _release(path: str):
+    with _live_lock:
+        _live_paths[path] -= 1
+        if _live_paths[path] <= 0:
+            del _live_paths[path]
+
+
+@dataclass(frozen=True)
+class DatasetHandle:
+    """
+    Referencia liviana a un dataset guardado en el almacenamiento columnar.
+
+    Un handle puede abarcar solo una ventana de filas (desde `offset`) y un
+    subconjunto de columnas del archivo (ver `window`): así una selección se
+    guarda en la sesión sin copiar datos.
+    """
+    key: str
+    path: str
+    columns: tuple
+    n_rows: int
+    offset: int = 0
+
+    def __post_init__(self):
+        # Mientras el handle exista, prune_store no borra su archivo
+        with _live_lock:
+            _live_paths[os.path.abspath(self.path)] += 1
+        weakref.finalize(self, _release, os.path.abspath(self.path))
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def window(self, start: int, stop: int, columns=None) -> "DatasetHandle":
+        """Handle de las filas [start, stop) y, opcionalmente, solo de algunas columnas."""
+        start = min(max(start, 0), self.n_rows)
+        stop = min(max(stop, start), self.n_rows)
+        columns = tuple(columns) if columns is not None else self.columns
+        return replace(self, columns=columns, n_rows=stop - start, offset=self.offset + start)
+
+    def _table(self, columns, start: int = 0, stop: int = None):
+        # Filas [start, stop) de la ventana, solo con las columnas pedidas
+        columns = list(columns) if columns is not None else list(self.columns)
+        stop = self.n_rows if stop is None else min(stop, self.n_rows)
+        length = max(stop - start, 0)
+        if feather is None:
+            df = pd.read_pickle(self.path)[columns]
+            return df.iloc[self.offset + start:self.offset + start + length].reset_index(drop=True)
+        table = feather.read_table(self.path, columns=columns, memory_map=True)
+        return table.slice(self.offset + start, length)
+
+    def load(self, columns=None) -> pd.DataFrame:
+        """Lee el dataset (o solo las columnas indicadas) con memory-mapping."""
+        table = self._table(columns)
+        return table if feather is None else table.to_pandas()
+
+    def column(self, name) -> pd.Series:
+        """Lee una única columna."""
+        return self.load([name])[name]
+
+    def load_rows(self, start: int, stop: int, columns=None) -> pd.DataFrame:
+        """Lee solo las filas [start, stop) del dataset."""
+        table = self._table(columns, start, stop)
+        return table if feather is None else table.to_pandas()
+
+    def iter_chunks(self, chunk_rows: int, columns=None):
+        """Recorre el dataset en bloques de `chunk_rows` filas, convirtiendo uno por vez."""
+        table = self._table(columns)
+        for start in range(0, self.n_rows, chunk_rows):
+            chunk = table.iloc[start:start + chunk_rows] if feather is None else table.slice(start, chunk_rows)
+            yield chunk if feather is None else chunk.to_pandas()
+
+
+def frame_key(df: pd.DataFrame) -> str:
+    """Calcula una clave de contenido para un DataFrame (datos y nombres de columnas)."""
+    digest = hashlib.sha1()
+    digest.update("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def _arrow_compatible(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Copia del DataFrame que Arrow puede escribir.
+
+    Las columnas de objetos con tipos mezclados (p. ej. una columna de
+    observaciones con textos y números) se convierten a texto; los vacíos se
+    conservan como nulos.
+    """
+    df = df.copy()
+    for col in df.columns:
+        values = df[col]
+        if values.dtype == object and pd.api.types.infer_dtype(values, skipna=True).startswith("mixed"):
+            df[col] = values.where(values.isna(), values.astype(str))
+    return df
+
+
+def _write_frame(df: pd.DataFrame, path: str):
+    if feather is None:
+        df.to_pickle(path)
+        return
+    try:
+        feather.write_feather(df, path, compression="uncompressed")
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        feather.write_feather(_arrow_compatible(df), path, compression="uncompressed")
+
+
+def _path_for(key: str, store_dir: str) -> str:
+    extension = ".feather" if feather is not None else ".pkl"
+    return os.path.join(store_dir, f"{key}{extension}")
+
+
+def store_frame(df: pd.DataFrame, key: str = None, store_dir: str = None) -> DatasetHandle:
+    """
+    Guarda un DataFrame en el almacenamiento columnar y devuelve su handle.
+
+    El almacenamiento es direccionado por contenido: si ya existe un archivo con
+    la misma clave no se vuelve a escribir. El índice no se conserva.
+
+    Args:
+        df (pd.DataFrame): Datos a guardar.
+        key (str, optional): Clave a utilizar (por defecto, hash del contenido).
+        store_dir (str, optional): Directorio de la caché (por defecto STORE_DIR).
+
+    Returns:
+        DatasetHandle: Referencia al dataset guardado.
+    """
+    global _pruned
+    store_dir = store_dir or STORE_DIR
+    os.makedirs(store_dir, exist_ok=True)
+    if not _pruned and store_dir == STORE_DIR:
+        # Limpieza de archivos viejos una vez por proceso, desde el proceso que guarda datasets
+        _pruned = True
+        prune_store()
+    df = df.reset_index(drop=True)
+    df.columns = [str(col) for col in df.columns]
+    key = key or frame_key(df)
+    path = _path_for(key, store_dir)
+
+    if not os.path.exists(path):
+        # Escritura atómica: otra sesión puede estar leyendo la misma clave
+        fd, tmp_path = tempfile.mkstemp(dir=store_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            _write_frame(df, tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    else:
+        os.utime(path)
+    return DatasetHandle(key=key, path=path, columns=tuple(df.columns), n_rows=len(df))
+
+
+def open_handle(key: str, store_dir: str = None):
+    """Devuelve el handle de una clave ya guardada, o None si no existe."""
+    path = _path_for(key, store_dir or STORE_DIR)
+    if not os.path.exists(path):
+        return None
+    os.utime(path)
+    if feather is not None:
+        # Con memory-mapping solo se leen los metadatos del archivo
+        table = feather.read_table(path, memory_map=True)
+        columns, n_rows = tuple(table.column_names), table.num_rows
+    else:
+        df = pd.read_pickle(path)
+        columns, n_rows = tuple(df.columns), len(df)
+    return DatasetHandle(key=key, path=path, columns=columns, n_rows=n_rows)
+
+
+def prune_store(max_age_seconds: float = MAX_AGE_SECONDS, store_dir: str = None) -> int:
+    """
+    Elimina los archivos no utilizados en los últimos `max_age_seconds`, salvo
+    los que referencia un handle vivo. Devuelve cuántos borró.
+    """
+    store_dir = store_dir or STORE_DIR
+    if not os.path.isdir(store_dir):
+        return 0
+    removed = 0
+    now = time.time()
+    for name in os.listdir(store_dir):
+        path = os.path.join(store_dir, name)
+        with _live_lock:
+            if os.path.abspath(path) in _live_paths:
+                continue
+        try:
+            if now - os.path.getmtime(path) > max_age_seconds:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            continue
+    return removed
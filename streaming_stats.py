@@ -0,0 +1,335 @@
+"""
+Estadísticas en streaming para datasets grandes.
+
+Los datos se procesan por bloques (chunks), típicamente leídos con
+memory-mapping del almacenamiento columnar (`DatasetHandle.iter_chunks`), y se acumulan estadísticos
+combinables: conteo/media/varianza (Welford, combinados con la fórmula de
+Chan), mínimo/máximo, cuantiles aproximados (sketch de centroides al estilo
+t-digest) y matrices de co-momentos para la correlación de Pearson. Una sola
+pasada produce la tabla de `describe()` y la matriz de correlación.
+"""
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_CHUNK_ROWS = 200_000
+DESCRIBE_QUANTILES = (0.25, 0.5, 0.75)
+CORRELATION_METHODS = ["pearson", "spearman", "kendall"]
+# Kendall no tiene versión en una pasada: por encima de estas filas se estima sobre una muestra
+KENDALL_MAX_ROWS = 20_000
+
+
+class QuantileSketch:
+    """
+    Resumen combinable de una distribución para estimar cuantiles.
+
+    Cada bloque se resume en centroides (valor, peso) equiespaciados en rango;
+    al combinar se ordenan y se comprimen a `max_centroids` centroides, de
+    modo que el error es del orden de 1 / max_centroids en rango.
+    """
+    def __init__(self, max_centroids: int = 512):
+        self.max_centroids = max_centroids
+        self.values = np.empty(0)
+        self.weights = np.empty(0)
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def update(self, values: np.ndarray):
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return
+        values = np.sort(values)
+        if len(values) > self.max_centroids:
+            # Centroides: medias de grupos de igual cantidad de muestras
+            edges = np.linspace(0, len(values), self.max_centroids + 1).astype(int)
+            weights = np.diff(edges).astype(float)
+            means = np.add.reduceat(values, edges[:-1]) / weights
+        else:
+            means, weights = values, np.ones(len(values))
+        self._merge(means, weights)
+
+    def merge(self, other: "QuantileSketch"):
+        self._merge(other.values, other.weights)
+
+    def _merge(self, values, weights):
+        values = np.concatenate([self.values, values])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(values, kind="stable")
+        values, weights = values[order], weights[order]
+        if len(values) > self.max_centroids:
+            # Agrupa centroides consecutivos en tramos de igual peso acumulado
+            cum = np.cumsum(weights)
+            group = np.minimum((cum - weights / 2) / cum[-1] * self.max_centroids, self.max_centroids - 1).astype(int)
+            group_weights = np.bincount(group, weights=weights, minlength=self.max_centroids)
+            group_sums = np.bincount(group, weights=values * weights, minlength=self.max_centroids)
+            used = group_weights > 0
+            values = group_sums[used] / group_weights[used]
+            weights = group_weights[used]
+        self.values, self.weights = values, weights
+
+    def quantile(self, q: float) -> float:
+        """
+        Estima el cuantil q (0..1) interpolando entre centroides.
+
+        Cada centroide se ubica en el rango medio (base 0) de sus muestras y se
+        interpola en q * (n - 1), como np.quantile: sin compresión el resultado
+        es exacto.
+        """
+        if len(self.values) == 0:
+            return np.nan
+        ranks = np.cumsum(self.weights) - (self.weights + 1) / 2
+        return float(np.interp(q * (self.weights.sum() - 1), ranks, self.values))
+
+
+class StreamingStats:
+    """
+    Acumulador de estadísticas por columna y co-momentos por pares de columnas.
+
+    La correlación usa, como pandas, las filas donde ambas columnas son válidas.
+    Los datos se centran con la media del primer bloque para evitar pérdida de
+    precisión con columnas de valores grandes (por ejemplo, timestamps).
+    """
+    def __init__(self, columns, max_centroids: int = 512, shift=None):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.count = np.zeros(k)
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros(k)
+        self.min = np.full(k, np.inf)
+        self.max = np.full(k, -np.inf)
+        self.sketches = [QuantileSketch(max_centroids) for _ in range(k)]
+        self.rows = 0
+        self._shift = None if shift is None else np.asarray(shift, dtype=float)
+        # Co-momentos por pares sobre las filas donde ambas columnas son válidas
+        self._pair_n = np.zeros((k, k))
+        self._pair_sx = np.zeros((k, k))
+        self._pair_sxx = np.zeros((k, k))
+        self._pair_sxy = np.zeros((k, k))
+
+    def update(self, chunk: pd.DataFrame):
+        """Incorpora un bloque de filas (con las mismas columnas)."""
+        values = chunk[self.columns].to_numpy(dtype=float)
+        self.rows += len(values)
+        if len(values) == 0:
+            return
+        finite = np.isfinite(values)
+
+        # Conteo, media y varianza del bloque, combinados con la fórmula de Chan
+        n_b = finite.sum(axis=0).astype(float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sums = np.where(finite, values, 0.0).sum(axis=0)
+            mean_b = np.where(n_b > 0, sums / n_b, 0.0)
+            dev = np.where(finite, values - mean_b, 0.0)
+            m2_b = (dev * dev).sum(axis=0)
+            n = self.count + n_b
+            delta = mean_b - self.mean
+            self.mean = np.where(n > 0, self.mean + delta * n_b / np.where(n > 0, n, 1), 0.0)
+            self.m2 = self.m2 + m2_b + delta * delta * self.count * n_b / np.where(n > 0, n, 1)
+        self.count = n
+        self.min = np.minimum(self.min, np.where(finite, values, np.inf).min(axis=0))
+        self.max = np.maximum(self.max, np.where(finite, values, -np.inf).max(axis=0))
+
+        for j, sketch in enumerate(self.sketches):
+            sketch.update(values[:, j])
+
+        if self._shift is None:
+            self._shift = np.where(n_b > 0, mean_b, 0.0)
+        x = np.where(finite, values - self._shift, 0.0)
+        m = finite.astype(float)
+        self._pair_n += m.T @ m
+        self._pair_sx += x.T @ m
+        self._pair_sxx += (x * x).T @ m
+        self._pair_sxy += x.T @ x
+
+    def merge(self, other: "StreamingStats"):
+        """
+        Incorpora otro acumulador de las mismas columnas (por ejemplo, de otro proceso).
+
+        Para combinar los co-momentos ambos deben usar el mismo centrado: se
+        crean con el mismo `shift`.
+        """
+        if other.columns != self.columns:
+            raise ValueError("Los acumuladores tienen columnas distintas.")
+        if self._shift is None:
+            self._shift = other._shift
+        elif other._shift is not None and not np.array_equal(self._shift, other._shift):
+            raise ValueError("Los acumuladores usan centrados distintos.")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            n = self.count + other.count
+            delta = other.mean - self.mean
+            safe_n = np.where(n > 0, n, 1)
+            self.mean = np.where(n > 0, self.mean + delta * other.count / safe_n, 0.0)
+            self.m2 = self.m2 + other.m2 + delta * delta * self.count * other.count / safe_n
+        self.count = n
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+        self.rows += other.rows
+        self._pair_n += other._pair_n
+        self._pair_sx += other._pair_sx
+        self._pair_sxx += other._pair_sxx
+        self._pair_sxy += other._pair_sxy
+        return self
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria aproximada del acumulador."""
+        k = len(self.columns)
+        return 8 * (4 * k * k + 6 * k) + sum(16 * len(sk.values) for sk in self.sketches)
+
+    def std(self) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > 1, np.sqrt(self.m2 / (self.count - 1)), np.nan)
+
+    def describe(self) -> pd.DataFrame:
+        """Devuelve una tabla equivalente a `DataFrame.describe()` para columnas numéricas."""
+        has_data = self.count > 0
+        table = {
+            "count": self.count,
+            "mean": np.where(has_data, self.mean, np.nan),
+            "std": self.std(),
+            "min": np.where(has_data, self.min, np.nan),
+        }
+        for q in DESCRIBE_QUANTILES:
+            table[f"{q:.0%}"] = [sketch.quantile(q) for sketch in self.sketches]
+        table["max"] = np.where(has_data, self.max, np.nan)
+        return pd.DataFrame(table, index=self.columns).T
+
+    def non_constant_columns(self) -> list:
+        """Columnas con al menos dos valores distintos (equivale a nunique() > 1)."""
+        return [col for col, lo, hi in zip(self.columns, self.min, self.max) if np.isfinite(lo) and hi > lo]
+
+    def corr(self, columns=None) -> pd.DataFrame:
+        """Matriz de correlación de Pearson con eliminación por pares, como `DataFrame.corr()`."""
+        columns = self.columns if columns is None else list(columns)
+        idx = [self.columns.index(col) for col in columns]
+        ix = np.ix_(idx, idx)
+        n = self._pair_n[ix]
+        sx = self._pair_sx[ix]       # suma de x_i donde i y j son válidas
+        sy = sx.T                     # suma de x_j donde i y j son válidas
+        sxx = self._pair_sxx[ix]
+        syy = sxx.T
+        sxy = self._pair_sxy[ix]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = sxy - sx * sy / n
+            var_x = sxx - sx * sx / n
+            var_y = syy - sy * sy / n
+            corr = cov / np.sqrt(var_x * var_y)
+        corr = np.where(n > 1, np.clip(corr, -1.0, 1.0), np.nan)
+        np.fill_diagonal(corr, np.where(np.diag(n) > 1, 1.0, np.nan))
+        return pd.DataFrame(corr, index=columns, columns=columns)
+
+
+def rank_correlation(df: pd.DataFrame, columns, method: str = "spearman") -> pd.DataFrame:
+    """
+    Correlación de rangos por transformación a rangos.
+
+    Spearman se calcula como la correlación de Pearson de los rangos promedio
+    de cada columna, reutilizando el acumulador de co-momentos (una pasada y
+    un producto matricial). Si hay NaN, los rangos se calculan por columna y no
+    por par de columnas, por lo que puede diferir levemente de pandas.
+
+    Kendall no forma parte de la pasada única: se calcula con pandas y, con más
+    de `KENDALL_MAX_ROWS` filas, sobre filas equiespaciadas hasta ese límite
+    (una estimación, no el valor exacto).
+    """
+    columns = list(columns)
+    if method == "kendall":
+        step = -(-len(df) // KENDALL_MAX_ROWS) if len(df) > KENDALL_MAX_ROWS else 1
+        return df[columns].iloc[::step].corr(method="kendall")
+    if method == "spearman":
+        ranks = df[columns].rank(method="average")
+        return compute_stats(iter_frame_chunks(ranks), columns).corr(columns)
+    raise ValueError(f"Método de correlación desconocido: {method}")
+
+
+def histogram_ranges(stats: StreamingStats, columns) -> np.ndarray:
+    """
+    Devuelve los rangos (mínimo, máximo) de cada columna para histogramas.
+
+    Igual que np.histogram, un rango degenerado se amplía en ±0.5.
+    """
+    idx = [stats.columns.index(col) for col in columns]
+    lo, hi = stats.min[idx].copy(), stats.max[idx].copy()
+    flat = lo == hi
+    lo[flat] -= 0.5
+    hi[flat] += 0.5
+    return np.column_stack([lo, hi])
+
+
+def compute_histograms(chunks, columns, ranges: np.ndarray, bins: int):
+    """
+    Calcula los histogramas de varias columnas en una sola pasada por bloques.
+
+    Todas las columnas se binean a la vez con un único np.bincount sobre la
+    matriz del bloque. Los bins coinciden con los de np.histogram(range=...).
+
+    Args:
+        chunks: Secuencia de DataFrames.
+        columns (list): Columnas a procesar.
+        ranges (np.ndarray): Matriz (columnas x 2) con el rango de cada columna.
+        bins (int): Cantidad de bins.
+
+    Returns:
+        tuple: (counts, edges) con formas (columnas x bins) y (columnas x bins+1).
+    """
+    columns = list(columns)
+    k = len(columns)
+    lo, hi = ranges[:, 0], ranges[:, 1]
+    width = (hi - lo) / bins
+    counts = np.zeros(k * bins, dtype=np.int64)
+    offsets = np.arange(k) * bins
+    for chunk in chunks:
+        values = chunk[columns].to_numpy(dtype=float)
+        valid = np.isfinite(values) & (values >= lo) & (values <= hi)
+        idx = np.floor((values - lo) / width)
+        # El borde derecho pertenece al último bin
+        idx = np.clip(np.nan_to_num(idx, nan=0.0), 0, bins - 1).astype(np.int64) + offsets
+        counts += np.bincount(idx[valid], minlength=k * bins)
+    edges = lo[:, None] + width[:, None] * np.arange(bins + 1)
+    edges[:, -1] = hi
+    return counts.reshape(k, bins), edges
+
+
+def iter_frame_chunks(df: pd.DataFrame, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    """Recorre un DataFrame en bloques de filas (vistas, sin copia)."""
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def stats_for_rows(handle, start: int, stop: int, columns=None, shift=None) -> StreamingStats:
+    """
+    Calcula el acumulador de las filas [start, stop) de un dataset guardado.
+
+    Pensada para ejecutarse en un proceso de trabajo: solo recibe el handle y
+    lee las filas con memory-mapping. Los resultados parciales se combinan con
+    `StreamingStats.merge` si todos usan el mismo `shift`.
+    """
+    columns = list(columns) if columns is not None else list(handle.columns)
+    stats = StreamingStats(columns, shift=shift)
+    # Un bloque por vez: la memoria del proceso no depende del tamaño del rango
+    for chunk in handle.window(start, stop, columns).iter_chunks(DEFAULT_CHUNK_ROWS):
+        stats.update(chunk)
+    return stats
+
+
+def merge_stats(partials) -> StreamingStats:
+    """Combina acumuladores parciales (en orden) en uno solo."""
+    partials = list(partials)
+    merged = partials[0]
+    for partial in partials[1:]:
+        merged.merge(partial)
+    return merged
+
+
+def compute_stats(chunks, columns=None) -> StreamingStats:
+    """Procesa una secuencia de bloques en una sola pasada y devuelve el acumulador."""
+    stats = None
+    for chunk in chunks:
+        if stats is None:
+            stats = StreamingStats(columns if columns is not None else chunk.columns)
+        stats.update(chunk)
+    return stats if stats is not None else StreamingStats(columns or [])
@@ -0,0 +1,23 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from jobs import Job, JobStore
+
+
+class _BrokenJobs(JobStore):
+    """Pool cuyos procesos terminan abruptamente."""
+    def submit(self, key, fn, parts, combine):
+        future = Future()
+        future.set_exception(BrokenProcessPool('proceso terminado'))
+        self._jobs[key] = Job(key, [future], combine)
+        return self._jobs[key]
+
+
+@pytest.fixture
+def broken_jobs():
+    """JobStore cuyos trabajos fallan con BrokenProcessPool."""
+    return _BrokenJobs()
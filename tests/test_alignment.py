@@ -0,0 +1,32 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import numpy as np
+import pandas as pd
+import pytest
+
+from alignment import SAMPLE_AXIS, align_datasets
+
+
+def test_align_datasets_interpolates_onto_common_x():
+    """Cada corrida se interpola sobre la grilla común; fuera de su rango queda NaN."""
+    run_a = pd.DataFrame({'ts': [0.0, 1.0, 2.0, 3.0], 'F1': [0.0, 10.0, 20.0, 30.0]})
+    run_b = pd.DataFrame({'ts': [2.0, 1.0, 4.0], 'F1': [5.0, 3.0, 9.0]})
+    frames = {'CROMO': run_a, 'CADMIO': run_b}
+
+    aligned = align_datasets(frames, ['F1'], 'ts', n_points=5, mode='Intersección')
+    np.testing.assert_allclose(aligned['ts'], [1.0, 1.5, 2.0, 2.5, 3.0])
+    np.testing.assert_allclose(aligned['F1 [CROMO]'], [10.0, 15.0, 20.0, 25.0, 30.0])
+    np.testing.assert_allclose(aligned['F1 [CADMIO]'], [3.0, 4.0, 5.0, 6.0, 7.0])
+
+    union = align_datasets(frames, ['F1'], 'ts', n_points=5, mode='Unión')
+    assert np.isnan(union['F1 [CROMO]'].iloc[-1]) and np.isnan(union['F1 [CADMIO]'].iloc[0])
+
+    by_sample = align_datasets(frames, ['F1'], SAMPLE_AXIS, n_points=3)
+    np.testing.assert_allclose(by_sample[SAMPLE_AXIS], [0.0, 1.0, 2.0])
+
+
+def test_align_datasets_without_overlap_raises():
+    frames = {'a': pd.DataFrame({'ts': [0.0, 1.0], 'F1': [1.0, 2.0]}),
+              'b': pd.DataFrame({'ts': [5.0, 6.0], 'F1': [1.0, 2.0]})}
+    with pytest.raises(ValueError):
+        align_datasets(frames, ['F1'], 'ts', n_points=10)
@@ -0,0 +1,47 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import fpdf
+import numpy as np
+
+from asset_cache import ASSETS, LOGO_PATH, AssetCache, fpdf_image, hardness_table, read_bytes
+
+
+def test_asset_cache_reloads_only_when_file_changes(tmp_path):
+    path = tmp_path / 'logo.bin'
+    path.write_bytes(b'uno')
+    cache = AssetCache()
+    assert cache.get(str(path), read_bytes) == b'uno'
+    assert cache.get(str(path), read_bytes) == b'uno' and cache.loads == 1
+    path.write_bytes(b'dos!')
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+    assert cache.get(str(path), read_bytes) == b'dos!' and cache.loads == 2
+
+
+def test_hardness_table_lookup_matches_table_rows():
+    table = hardness_table()
+    assert hardness_table() is table
+    df = table.table
+    assert table.strength(51.0) == df.loc[df['RK'] == 51, 'CR'].item()
+    cr50, cr51 = (df.loc[df['RK'] == rk, 'CR'].item() for rk in (50, 51))
+    np.testing.assert_allclose(table.strength(50.25), cr50 + 0.25 * (cr51 - cr50))
+    assert table.bracket(50.25) == set(df.index[df['RK'].isin([50, 51])])
+    assert table.bracket(51.0) == set(df.index[df['RK'] == 51])
+
+
+def test_fpdf_image_decodes_the_logo_once_per_process():
+    documents = []
+    for _ in range(2):
+        pdf = fpdf.FPDF()
+        pdf.add_page()
+        pdf.image(fpdf_image(pdf, LOGO_PATH), x=10, y=10, w=190)
+        documents.append(pdf.output(dest='S'))
+    loads = ASSETS.loads
+    pdf = fpdf.FPDF()
+    pdf.add_page()
+    pdf.image(fpdf_image(pdf, LOGO_PATH), x=10, y=10, w=190)
+    assert ASSETS.loads == loads
+
+    plain = fpdf.FPDF()
+    plain.add_page()
+    plain.image(LOGO_PATH, x=10, y=10, w=190)
+    assert len(documents[1]) == len(plain.output(dest='S'))
@@ -0,0 +1,26 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import numpy as np
+
+from benchmarks.generators import KC390_COLUMNS, calibration_sheet, kc390_log, waveform
+from benchmarks.run import compare
+from pages.Arbitrary_Waveform_Script_Generator import validate_format
+
+
+def test_generators_match_real_file_layouts():
+    log = kc390_log(1_000)
+    assert log.columns.tolist() == KC390_COLUMNS
+    assert (np.diff(log['ts']) > 0).all() and (log['F2'] == 0).all()
+    sheet = calibration_sheet(4, n_points=6, angles=("0", "R", "120"))
+    assert sheet.shape == (6, 4 * 3 * 2) and 'DUT4_120' in sheet.columns
+    assert (sheet.iloc[0] == 0).all()
+    assert validate_format(waveform(100)) is None
+
+
+def test_compare_reports_percent_change_against_baseline():
+    results = {'a[1]': {'median': 1.2}, 'b[1]': {'median': 0.5}, 'c[1]': {'median': 1.0}}
+    baseline = {'a[1]': {'median': 1.0}, 'b[1]': {'median': 1.0}}
+    rows = {row[0]: row for row in compare(results, baseline, threshold=10)}
+    assert round(rows['a[1]'][3]) == 20 and rows['a[1]'][4]
+    assert round(rows['b[1]'][3]) == -50 and not rows['b[1]'][4]
+    assert rows['c[1]'][2] is None and not rows['c[1]'][4]
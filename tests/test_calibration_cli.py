@@ -0,0 +1,121 @@
+import json
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+
+import pandas as pd
+
+from benchmarks.generators import calibration_sheet
+import calibration_cli
+from calibration_cli import INDEX_FILE, SUMMARY_FILE, find_workbooks, main, output_names
+
+
+def _write_campaign(directory):
+    directory.mkdir()
+    calibration_sheet(2, n_points=5).to_excel(directory / 'banco_a.xlsx', index=False)
+    calibration_sheet(1, n_points=5, seed=1).to_excel(directory / 'banco_b.xlsx', index=False)
+    pd.DataFrame({'PAT1_0': [1.0]}).to_excel(directory / 'incompleta.xlsx', index=False)
+    (directory / 'notas.txt').write_text('no es una planilla')
+
+
+def test_find_workbooks_and_output_names(tmp_path):
+    _write_campaign(tmp_path / 'c')
+    paths = find_workbooks([str(tmp_path / 'c'), str(tmp_path / 'c' / 'banco_*.xlsx')])
+    assert [os.path.basename(p) for p in paths] == ['banco_a.xlsx', 'banco_b.xlsx', 'incompleta.xlsx']
+    names = output_names(['/x/banco.xlsx', '/y/banco.xlsx', '/y/otro.xlsx'])
+    assert names['/y/otro.xlsx'] == 'otro' and len(set(names.values())) == 3
+
+
+def test_campaign_writes_outputs_and_skips_unchanged_files(tmp_path):
+    _write_campaign(tmp_path / 'c')
+    out = tmp_path / 'out'
+    args = [str(tmp_path / 'c'), '-o', str(out), '--fecha', '01/05/2025', '--workers', '1']
+    assert main(args) == 1  # la planilla incompleta falla sin frenar al resto
+
+    records = {os.path.basename(r['archivo']): r for r in json.loads((out / INDEX_FILE).read_text(encoding='utf-8'))}
+    assert records['banco_a.xlsx']['estado'] == 'ok' and records['banco_a.xlsx']['celdas'] == [1, 2]
+    assert 'PAT1_R' in records['incompleta.xlsx']['mensaje']
+    assert (out / 'banco_a' / 'informe_calibracion_banco_a.pdf').read_bytes().startswith(b'%PDF')
+    assert len(list((out / 'banco_a').glob('*.png'))) == 6
+    summary = pd.read_csv(out / SUMMARY_FILE)
+    assert len(summary) == 2 * 2 + 2 and set(summary['angulo']) == {'0', 'R'}
+
+    calibration_sheet(1, n_points=5, seed=2).to_excel(tmp_path / 'c' / 'banco_b.xlsx', index=False)
+    main(args)
+    estados = {os.path.basename(r['archivo']): r['estado'] for r in json.loads((out / INDEX_FILE).read_text(encoding='utf-8'))}
+    assert estados == {'banco_a.xlsx': 'sin cambios', 'banco_b.xlsx': 'ok', 'incompleta.xlsx': 'error'}
+    assert len(pd.read_csv(out / SUMMARY_FILE)) == 6
+
+    # Sin --fecha no se reprocesa lo que no cambió, y lo nuevo lleva la fecha de hoy
+    calibration_sheet(1, n_points=5, seed=3).to_excel(tmp_path / 'c' / 'banco_b.xlsx', index=False)
+    main([str(tmp_path / 'c'), '-o', str(out), '--workers', '1'])
+    records = {os.path.basename(r['archivo']): r for r in json.loads((out / INDEX_FILE).read_text(encoding='utf-8'))}
+    assert [r['estado'] for r in records.values()] == ['sin cambios', 'ok', 'error']
+    assert records['banco_a.xlsx']['fecha'] == '01/05/2025'
+    assert records['banco_b.xlsx']['fecha'] == date.today().strftime('%d/%m/%Y')
+
+    # Con otra --fecha se reprocesan también las que no cambiaron
+    main([str(tmp_path / 'c'), '-o', str(out), '--fecha', '02/05/2025', '--workers', '1'])
+    assert _estados(out) == {'banco_a.xlsx': 'ok', 'banco_b.xlsx': 'ok', 'incompleta.xlsx': 'error'}
+
+
+def _estados(out):
+    return {os.path.basename(r['archivo']): r['estado'] for r in json.loads((out / INDEX_FILE).read_text(encoding='utf-8'))}
+
+
+def test_campaign_in_process_pool(tmp_path):
+    _write_campaign(tmp_path / 'c')
+    out = tmp_path / 'out'
+    assert main([str(tmp_path / 'c'), '-o', str(out), '--fecha', '01/05/2025', '--workers', '2']) == 1
+    assert _estados(out) == {'banco_a.xlsx': 'ok', 'banco_b.xlsx': 'ok', 'incompleta.xlsx': 'error'}
+    assert len(pd.read_csv(out / SUMMARY_FILE)) == 6
+
+
+class _BrokenExecutor:
+    """Pool cuyos procesos terminan abruptamente."""
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_exception(BrokenProcessPool('proceso terminado'))
+        return future
+
+
+def test_campaign_finishes_inline_when_the_pool_fails(tmp_path, monkeypatch):
+    monkeypatch.setattr(calibration_cli, 'ProcessPoolExecutor', _BrokenExecutor)
+    _write_campaign(tmp_path / 'c')
+    out = tmp_path / 'out'
+    assert main([str(tmp_path / 'c'), '-o', str(out), '--fecha', '01/05/2025', '--workers', '2']) == 1
+    assert _estados(out) == {'banco_a.xlsx': 'ok', 'banco_b.xlsx': 'ok', 'incompleta.xlsx': 'error'}
+    assert (out / 'banco_b' / 'informe_calibracion_banco_b.pdf').read_bytes().startswith(b'%PDF')
+
+
+def test_campaign_writes_index_when_interrupted(tmp_path, monkeypatch):
+    _write_campaign(tmp_path / 'c')
+    out = tmp_path / 'out'
+    args = [str(tmp_path / 'c'), '-o', str(out), '--fecha', '01/05/2025', '--workers', '1']
+    main(args)
+    calibration_sheet(1, n_points=5, seed=2).to_excel(tmp_path / 'c' / 'banco_b.xlsx', index=False)
+    process_workbook = calibration_cli.process_workbook
+
+    def interrupted(path, *args):
+        if path.endswith('incompleta.xlsx'):
+            raise KeyboardInterrupt
+        return process_workbook(path, *args)
+
+    monkeypatch.setattr(calibration_cli, 'process_workbook', interrupted)
+    try:
+        main(args + ['--force'])
+    except KeyboardInterrupt:
+        pass
+    estados = _estados(out)
+    assert estados == {'banco_a.xlsx': 'ok', 'banco_b.xlsx': 'ok', 'incompleta.xlsx': 'error'}
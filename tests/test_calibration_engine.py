@@ -0,0 +1,56 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import numpy as np
+import pandas as pd
+
+from benchmarks.generators import calibration_sheet
+from calibration_engine import compute_calibration, parse_sheet, polyfit_batched
+
+
+def test_parse_sheet_accepts_any_cells_and_angles():
+    df = calibration_sheet(3, angles=("0", "R", "120", "45"))
+    df = df.drop(columns=["PAT2_45", "DUT2_45"])
+    df["DUT3_0"] = df["DUT3_0"].astype(object)
+    df.loc[4, "DUT3_0"] = "n/a"
+    sheet = parse_sheet(df)
+    assert list(sheet.cells) == [1, 2, 3]
+    assert sheet.angles == ["0", "R", "45", "120"]
+    assert sheet.angles_of(2) == ["0", "R", "120"]
+    assert sheet.complete_cells() == [1, 2, 3]
+    assert np.isnan(sheet.dut[2, 0, 4])
+
+
+def test_engine_matches_per_cell_polyfit_and_pandas_corr():
+    df = calibration_sheet(4, angles=("0", "R", "120", "240"), seed=3)
+    df.loc[6, "PAT2_R"] = np.nan
+    results = compute_calibration(parse_sheet(df))
+    for cell in (1, 2, 4):
+        for angle in ("0", "R", "240"):
+            pat, dut = df[f"PAT{cell}_{angle}"], df[f"DUT{cell}_{angle}"]
+            data = results.series(cell, angle)
+            np.testing.assert_allclose(data["pearson"], pat.corr(dut))
+            rel = ((dut - pat) / pat * 100).where(pat != 0)
+            valid = rel.notna()
+            expected = np.polyfit(pat[valid], rel[valid], 3)
+            np.testing.assert_allclose(data["fit"], expected, rtol=1e-6, atol=1e-12)
+
+
+def test_polyfit_batched_needs_enough_points():
+    x = np.array([[1.0, 2.0, 3.0, np.nan, np.nan]])
+    assert np.isnan(polyfit_batched(x, x * 2)).all()
+
+
+def test_cell_metrics_and_summary():
+    df = pd.DataFrame({
+        "PAT1_0": [0.0, 100.0, 200.0], "DUT1_0": [0.0, 101.0, 202.0],
+        "PAT1_R": [0.0, 100.0, 200.0], "DUT1_R": [0.0, 102.0, 202.0],
+        "PAT1_120": [0.0, 100.0, 200.0], "DUT1_120": [0.0, 99.0, 200.0],
+    })
+    results = compute_calibration(parse_sheet(df))
+    metrics = results.cell_metrics(1)
+    assert metrics["reversibilidad_max"] == 1.0
+    assert metrics["excentricidad_max"] == 2.0
+    assert set(metrics) == {"reversibilidad_max", "excentricidad_max"}
+    summary = results.summary(tolerance=1.5)
+    assert list(summary["angulo"]) == ["0", "R", "120"]
+    assert list(summary["dentro_tolerancia"]) == [True, False, True]
@@ -0,0 +1,30 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import numpy as np
+import pandas as pd
+
+from compact import ConstantColumn, RangeColumn, compact_frame
+
+
+def test_compact_frame_representations_and_roundtrip():
+    """Constantes como escalar, contadores como (inicio, paso) y float32 solo dentro de la tolerancia."""
+    n = 10_000
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({
+        'ts': 7e8 + np.cumsum(rng.uniform(999, 1001, n)),
+        'n': np.arange(1, n + 1),
+        'F1': rng.normal(3800, 5, n),
+        'F2': np.zeros(n),
+        'TGT1': np.where(np.arange(n) % 7 == 0, np.nan, 3462.0),
+    })
+    compact = compact_frame(df, tolerance=1e-4)
+    assert isinstance(compact.parts['F2'], ConstantColumn)
+    assert compact.parts['n'] == RangeColumn(1, 1, np.dtype(np.int16))
+    assert compact.parts['F1'].dtype == np.float32
+    # Un timestamp absoluto en ms pierde precisión en float32: se conserva en float64
+    assert compact.parts['ts'].dtype == np.float64
+    assert compact.ratio > 1.5
+
+    restored = compact.to_frame()
+    assert restored['F2'].to_numpy().strides == (0,)
+    pd.testing.assert_frame_equal(restored.astype(float), df.astype(float), rtol=1e-6)
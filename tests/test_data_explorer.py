@@ -0,0 +1,32 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import numpy as np
+
+from pages.Data_Explorer import masked_rows, prepare_plot_arrays
+
+
+def test_masked_rows_contiguous_returns_slice():
+    """Un rango contiguo de filas se devuelve como slice (vista sin copia)."""
+    x = np.arange(10.0)
+    assert masked_rows(x, 2.0, 5.0) == slice(2, 6)
+    np.testing.assert_array_equal(masked_rows(np.array([1.0, 9.0, 2.0]), 0.0, 3.0), [0, 2])
+
+
+def test_masked_rows_binary_search_matches_mask():
+    """Con X ordenado, la búsqueda binaria devuelve el mismo rango que la máscara."""
+    x = np.array([0.0, 1.0, 1.0, 2.5, 3.0, 7.0])
+    for lower, upper in [(1.0, 3.0), (-5.0, 0.5), (4.0, 6.0), (7.0, 9.0), (3.0, 1.0)]:
+        rows = masked_rows(x, lower, upper, is_sorted=True)
+        np.testing.assert_array_equal(x[rows], x[masked_rows(x, lower, upper)])
+        assert np.shares_memory(x[rows], x) or len(x[rows]) == 0
+
+
+def test_prepare_plot_arrays_limits_and_start_zero():
+    """Los límites ignoran NaN y cada serie se desplaza a su primer X válido."""
+    x = np.array([10.0, 11.0, 12.0, 13.0])
+    y = np.array([[np.nan, 1.0], [2.0, 5.0], [3.0, -1.0], [4.0, 0.0]])
+    arrays = prepare_plot_arrays(x, np.arange(4), y, ["A", "B"], scale_rest=2.0, start_zero=True)
+    xa, ya = arrays.series(0)
+    np.testing.assert_array_equal(xa, [0.0, 1.0, 2.0])
+    np.testing.assert_array_equal(ya, [4.0, 6.0, 8.0])
+    assert arrays.limits() == (0.0, 3.0, -2.0, 10.0)
@@ -0,0 +1,56 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import gzip
+import io
+
+import numpy as np
+import pandas as pd
+
+from data_export import EXPORT_FORMATS, ExportTransform, lazy_export, write_export
+from session_store import store_frame
+
+
+def test_chunked_export_matches_in_memory_pipeline(tmp_path):
+    """Transformar y escribir por bloques produce el mismo CSV que copiar el DataFrame completo."""
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({'ts': np.arange(1_000) * 0.5 + 100.0, 'F1_f': rng.normal(size=1_000)})
+    handle = store_frame(df, store_dir=str(tmp_path))
+    transform = ExportTransform(start_zero=True, scale_time=2.0, scale_rest=10.0, decimals=3)
+
+    expected = df.copy()
+    expected['ts'] = (expected['ts'] - expected['ts'].min()) * 2.0
+    expected['F1_f'] = expected['F1_f'] * 10.0
+    expected = expected.round(3).to_csv(index=False).encode('utf-8')
+
+    assert lazy_export(handle, 'CSV', transform, chunk_rows=128)().read() == expected
+    with write_export(handle, 'CSV (gzip)', transform, chunk_rows=128) as spool:
+        assert gzip.decompress(spool.read()) == expected
+    if 'Parquet' in EXPORT_FORMATS:
+        parquet = pd.read_parquet(lazy_export(handle, 'Parquet', transform, chunk_rows=128)())
+        pd.testing.assert_frame_equal(parquet, pd.read_csv(io.BytesIO(expected)))
+
+
+def test_empty_selection_exports_header_and_schema(tmp_path):
+    """Una selección sin filas exporta el encabezado (CSV) o un Parquet válido con las columnas."""
+    df = pd.DataFrame({'ts': np.arange(5) * 0.5, 'F1_f': np.ones(5)}).iloc[:0]
+    handle = store_frame(df, store_dir=str(tmp_path))
+    transform = ExportTransform(start_zero=True, decimals=2)
+    assert lazy_export(handle, 'CSV', transform)().read() == b'ts,F1_f\n'
+    with write_export(handle, 'CSV (gzip)', transform) as spool:
+        assert gzip.decompress(spool.read()) == b'ts,F1_f\n'
+    if 'Parquet' in EXPORT_FORMATS:
+        parquet = pd.read_parquet(lazy_export(handle, 'Parquet', transform)())
+        assert list(parquet.columns) == ['ts', 'F1_f'] and len(parquet) == 0
+
+
+def test_export_of_window_handle_applies_transform_once(tmp_path):
+    """Una ventana de filas del dataset guardado se exporta con desplazamiento, escalado y redondeo una sola vez."""
+    df = pd.DataFrame({'ts': np.arange(50) * 0.5 + 10.0, 'F1': np.arange(50) * 1.25, 'F2': np.ones(50)})
+    window = store_frame(df, store_dir=str(tmp_path)).window(10, 30, ['ts', 'F1'])
+    assert window.n_rows == 20 and window.columns == ('ts', 'F1')
+    transform = ExportTransform(start_zero=True, scale_time=2.0, scale_rest=10.0, decimals=1)
+
+    expected = df[['ts', 'F1']].iloc[10:30].reset_index(drop=True)
+    expected['ts'] = (expected['ts'] - expected['ts'].min()) * 2.0
+    expected['F1'] = expected['F1'] * 10.0
+    assert lazy_export(window, 'CSV', transform, chunk_rows=7)().read() == expected.round(1).to_csv(index=False).encode('utf-8')
@@ -0,0 +1,17 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import numpy as np
+import pandas as pd
+
+from data_grid import fetch_window
+
+
+def test_fetch_window_sorts_filters_and_pages_server_side():
+    """Solo se devuelve la ventana pedida; el orden pone los NaN al final y respeta el índice original."""
+    df = pd.DataFrame({'F1': [3.0, 1.0, np.nan, 2.0, 1.0, 5.0]}, index=range(10, 16))
+    window, total = fetch_window(df, 0, 3, sort_by='F1', ascending=False)
+    assert total == 6
+    assert list(window.index) == [15, 10, 13]
+    window, total = fetch_window(df, 1, 2, sort_by='F1', filter_col='F1', lower=1.5, data_key='k')
+    assert total == 3
+    assert list(window['F1']) == [3.0, 5.0]
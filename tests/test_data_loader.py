@@ -0,0 +1,75 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import io
+import pandas as pd
+
+from data_loader import IngestionCache, load_uploaded_file, load_uploaded_files, frame_nbytes, parse_file, sniff_csv_format
+
+
+class FakeUpload(io.BytesIO):
+    def __init__(self, raw, name):
+        super().__init__(raw)
+        self.name = name
+
+
+def test_load_uploaded_file_uses_cache():
+    """La segunda carga del mismo contenido se resuelve desde la caché."""
+    cache = IngestionCache()
+    raw = b"ts\tF1\tlabel\n1\t10.5\ta\n2\t11.5\tb\n"
+    first = load_uploaded_file(FakeUpload(raw, "log.csv"), cache)
+    second = load_uploaded_file(FakeUpload(raw, "otro_nombre.csv"), cache)
+    assert not first.from_cache
+    assert second.from_cache
+    assert second.data is first.data
+    assert first.data.columns.tolist() == ["ts", "F1"]
+    assert second.sorted_columns == ("ts", "F1")
+
+
+
+def test_compact_load_expands_the_frame_once():
+    """En modo compacto el DataFrame reconstruido se cachea: los reruns no lo vuelven a armar."""
+    cache = IngestionCache()
+    raw = "n,F1,F2\n" + "".join(f"{i},{i * 0.5},0\n" for i in range(1000))
+    first = load_uploaded_file(FakeUpload(raw.encode(), "log.csv"), cache, compact=True)
+    second = load_uploaded_file(FakeUpload(raw.encode(), "log.csv"), cache, compact=True)
+    assert second.from_cache and second.data is first.data
+    assert first.data["F2"].to_numpy().strides == (0,)
+    assert cache.total_bytes == first.compact.frame_nbytes < frame_nbytes(first.data)
+
+def test_load_uploaded_files_keeps_order():
+    cache = IngestionCache()
+    uploads = [FakeUpload(f"ts,F1\n1,{i}\n2,{i + 1}\n".encode(), f"run{i}.csv") for i in range(5)]
+    datasets = load_uploaded_files(uploads, cache, max_workers=3)
+    assert [d.name for d in datasets] == [f"run{i}.csv" for i in range(5)]
+    assert [d.data["F1"].iloc[0] for d in datasets] == list(range(5))
+    assert len(cache) == 5
+
+
+def test_ingestion_cache_lru_eviction():
+    """Al superar el límite de memoria se desaloja la entrada menos usada."""
+    df = pd.DataFrame({"a": range(100)})
+    cache = IngestionCache(max_bytes=int(frame_nbytes(df) * 2.5))
+    cache.put("a", df)
+    cache.put("b", df.copy())
+    cache.get("a")
+    cache.put("c", df.copy())
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert cache.total_bytes <= cache.max_bytes
+
+
+def test_sniff_csv_format_semicolon_decimal_comma():
+    """Detecta punto y coma como separador y coma como marca decimal."""
+    fmt = sniff_csv_format(b"ts;F1\n1;2,5\n2;2,75\n")
+    assert fmt.delimiter == ";"
+    assert fmt.decimal == ","
+    assert fmt.header
+
+
+def test_parse_file_tab_separated_matches_python_engine():
+    """El parseo rápido devuelve lo mismo que el motor python con sep=None."""
+    raw = b"ts\tn\tF1\n758.0\t1\t3794.91\n2418.0\t2\t3796.28\n"
+    parsed = parse_file(raw, ".csv")
+    expected = pd.read_csv(io.BytesIO(raw), sep=None, engine="python")
+    pd.testing.assert_frame_equal(parsed.data, expected)
+    assert parsed.engine in ("c", "pyarrow")
@@ -0,0 +1,49 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import numpy as np
+
+from downsampling import MinMaxPyramid, minmax_decimate, lttb
+
+
+def test_minmax_decimate_keeps_peaks():
+    """Los picos aislados sobreviven a la decimación min/max."""
+    x = np.arange(100_000)
+    y = np.zeros(100_000)
+    y[12_345] = 50.0
+    y[67_890] = -40.0
+    xd, yd = minmax_decimate(x, y, 1000)
+    assert len(xd) <= 1000
+    assert yd.max() == 50.0 and yd.min() == -40.0
+    assert np.all(np.diff(xd) > 0)
+
+
+def test_lttb_keeps_endpoints_and_size():
+    """LTTB devuelve exactamente n_out puntos incluyendo los extremos."""
+    x = np.linspace(0, 10, 5000)
+    y = np.sin(x)
+    xd, yd = lttb(x, y, 200)
+    assert len(xd) == 200
+    assert xd[0] == x[0] and xd[-1] == x[-1]
+
+
+def test_short_series_untouched():
+    x = np.arange(10)
+    y = np.arange(10.0)
+    xd, yd = minmax_decimate(x, y, 100)
+    np.testing.assert_array_equal(yd, y)
+
+
+def test_minmax_pyramid_query_keeps_extremes_and_bounds_points():
+    """Cada consulta entrega a lo sumo max_points puntos y conserva los extremos del rango."""
+    rng = np.random.default_rng(4)
+    y = np.cumsum(rng.normal(size=100_001))
+    y[50_000] = 1e4
+    y[10:20] = np.nan
+    pyramid = MinMaxPyramid(y)
+    for start, stop in [(0, len(y)), (40_000, 60_000), (49_990, 50_010)]:
+        positions, values = pyramid.query(start, stop, 1_000)
+        assert len(values) <= 1_000
+        assert np.nanmax(values) == np.nanmax(y[start:stop])
+        assert positions.min() >= start and positions.max() < stop
+    positions, values = pyramid.query(5, 25, 1_000)
+    np.testing.assert_array_equal(values, y[5:25])
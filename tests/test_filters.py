@@ -0,0 +1,42 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import numpy as np
+import pandas as pd
+
+from data_loader import IngestionCache
+from filters import MEDIAN, MOVING_AVERAGE, SAVITZKY_GOLAY, apply_filter, filter_columns
+
+
+def _frame(n=5_000):
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({'F1': rng.normal(3.8e8, 5, n), 'TGT1': rng.normal(size=n)})
+    df.loc[100:104, 'TGT1'] = np.nan
+    return df
+
+
+def test_moving_average_and_median_match_pandas_rolling():
+    """Mismos valores y mismos NaN (extremos y ventanas con huecos) que rolling(center=True)."""
+    df = _frame()
+    for window in (4, 21):
+        rolling = df.rolling(window, center=True)
+        np.testing.assert_allclose(apply_filter(df.to_numpy(), MOVING_AVERAGE, window), rolling.mean().to_numpy(),
+                                   rtol=1e-12, atol=1e-12, equal_nan=True)
+        np.testing.assert_array_equal(apply_filter(df.to_numpy(), MEDIAN, window), rolling.median().to_numpy())
+
+
+def test_savitzky_golay_preserves_quadratics():
+    x = np.arange(50.0)
+    y = 0.5 * x ** 2 - 3 * x + 1
+    smoothed = apply_filter(y, SAVITZKY_GOLAY, 7)
+    np.testing.assert_allclose(smoothed[3:-3], y[3:-3])
+    assert np.isnan(smoothed[:3]).all() and np.isnan(smoothed[-3:]).all()
+
+
+def test_filter_columns_memoizes_per_column():
+    df = _frame()
+    cache = IngestionCache(max_bytes=10**7)
+    first = filter_columns(df, ['F1'], MOVING_AVERAGE, 21, cache=cache, data_key='k')
+    both = filter_columns(df, ['TGT1', 'F1'], MOVING_AVERAGE, 21, cache=cache, data_key='k')
+    assert list(both) == ['TGT1', 'F1']
+    assert both['F1'] is first['F1']
+    assert len(cache) == 2
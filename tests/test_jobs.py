@@ -0,0 +1,38 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from jobs import JobStore, row_ranges
+
+
+def test_job_store_coalesces_by_key_and_combines_parts():
+    store = JobStore(max_workers=1)
+    try:
+        job = store.submit(('k', 1), pow, [(2, 3), (3, 2)], sum)
+        assert store.submit(('k', 1), pow, [(5, 5)], sum) is job
+        assert job.result() == 17
+        assert job.progress == 1.0 and job.done()
+        assert store.pop(('k', 1)) is job and len(store) == 0
+    finally:
+        store.shutdown()
+
+
+def test_job_store_rebuilds_a_broken_pool():
+    store = JobStore(max_workers=1)
+    try:
+        crashed = store.submit(('k', 1), os._exit, [(1,)], list)  # el proceso muere sin responder
+        with pytest.raises(BrokenProcessPool):
+            crashed.result()
+        assert crashed.failed()
+        assert store.submit(('k', 2), pow, [(2, 3)], sum).result() == 8
+    finally:
+        store.shutdown()
+
+
+def test_row_ranges_cover_all_rows():
+    ranges = row_ranges(10, 3)
+    assert ranges[0][0] == 0 and ranges[-1][1] == 10
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    assert row_ranges(2, 8) == [(0, 1), (1, 2)]
@@ -0,0 +1,49 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import subprocess
+
+from benchmarks.import_time import module_imports, parse_importtime
+from lazy_import import LazyModule, lazy_module
+
+
+def test_lazy_module_imports_on_first_attribute_access():
+    sys.modules.pop('tabnanny', None)
+    module = lazy_module('tabnanny')
+    assert isinstance(module, LazyModule) and not module.loaded
+    assert 'tabnanny' not in sys.modules
+    assert callable(module.check)
+    assert module.loaded and 'tabnanny' in sys.modules
+    # Si ya estaba importado se devuelve el módulo real
+    assert lazy_module('tabnanny') is sys.modules['tabnanny']
+
+
+def test_compute_modules_do_not_import_streamlit():
+    """Los módulos de cálculo (y los procesos del pool que los importan) no cargan Streamlit."""
+    root = os.path.dirname(os.path.dirname(__file__))
+    code = ("import sys, filters, lazy_import; lazy_import.lazy_module('tabnanny').check; "
+            "print('streamlit' in sys.modules)")
+    result = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False'
+
+
+def test_first_import_is_a_stage_of_the_open_trace(tmp_path, monkeypatch):
+    import profiling
+    from profiling import begin_rerun, current_trace, stage
+    monkeypatch.setattr(profiling, 'TRACE_FILE', str(tmp_path / 'trace.jsonl'))
+    sys.modules.pop('tabnanny', None)
+    begin_rerun('Prueba')
+    with stage('pagina'):
+        trace = current_trace()
+        lazy_module('tabnanny').check
+    assert [record.name for record in trace.stages] == ['pagina', 'import tabnanny']
+
+
+def test_import_time_helpers(tmp_path):
+    page = tmp_path / 'page.py'
+    page.write_text("import os\ntry:\n    import json\nexcept ImportError:\n    json = None\nx = 1\nfrom re import compile\n")
+    assert module_imports(str(page)).splitlines() == [
+        'import os', 'try:', '    import json', 'except ImportError:', '    json = None', 'from re import compile']
+    stderr = ("import time: self [us] | cumulative | imported package\n"
+              "import time:       120 |        120 |   pandas._libs\n"
+              "import time:      1500 |       1620 | pandas\n")
+    assert parse_importtime(stderr) == {'pandas._libs': 120e-6, 'pandas': 1500e-6}
@@ -0,0 +1,67 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from dataclasses import replace
+
+from benchmarks.generators import calibration_sheet
+from calibration_engine import compute_calibration, parse_sheet
+from data_loader import IngestionCache
+from jobs import JobStore
+from plot_renderer import PLOT_KINDS, cell_figure_specs, export_specs, render_figures
+
+PNG_MAGIC = b'\x89PNG\r\n\x1a\n'
+
+
+def _specs(n_cells=1, title='Celda'):
+    results = compute_calibration(parse_sheet(calibration_sheet(n_cells, n_points=5, angles=('0', 'R', '90'))))
+    return [spec for cell in results.sheet.cells
+            for spec in cell_figure_specs(results, cell, f'{title} {cell}', 'kgf', 1.0)]
+
+
+def test_specs_cover_each_plot_kind_and_key_on_style():
+    specs = _specs()
+    assert [spec.kind for spec in specs] == list(PLOT_KINDS)
+    assert [s.label for s in specs[2].series] == ['Carga 0°', 'Descarga 0°', 'Carga 90°']
+    assert all(s.fit is not None for s in specs[2].series)
+    assert _specs()[0].cache_key() == specs[0].cache_key()
+    assert _specs(title='Otra')[0].cache_key() != specs[0].cache_key()
+    assert replace(specs[0], tolerance=2.0).cache_key() != specs[0].cache_key()
+
+
+def test_render_figures_caches_pngs():
+    specs = _specs()
+    cache = IngestionCache()
+    pngs = render_figures(specs, cache=cache, jobs=None)
+    assert all(png.startswith(PNG_MAGIC) for png in pngs)
+    assert len(cache) == 3 and cache.misses == 3
+    assert render_figures(specs, cache=cache, jobs=None) == pngs
+    assert cache.hits == 3
+
+
+def test_export_specs_add_the_caption_only_to_exports():
+    specs = _specs()
+    exported = export_specs(specs, 'PAT-01', '01/05/2025')
+    assert all(spec.caption is None for spec in specs)
+    assert {spec.caption for spec in exported} == {'Patrón: PAT-01 - Fecha de Calibración: 01/05/2025'}
+    assert exported[0].cache_key() != specs[0].cache_key()
+    assert export_specs(specs, 'PAT-01', '02/05/2025')[0].cache_key() != exported[0].cache_key()
+    plain, stamped = render_figures([specs[0], exported[0]], cache=None, jobs=None)
+    assert stamped.startswith(PNG_MAGIC) and stamped != plain
+
+
+def test_render_figures_in_process_pool():
+    store = JobStore(max_workers=1)
+    try:
+        specs = _specs()[:2]
+        pngs = render_figures(specs, cache=None, jobs=store, pool_min=1)
+        assert pngs == render_figures(specs, cache=None, jobs=None)
+        assert len(store) == 0
+    finally:
+        store.shutdown()
+
+
+def test_render_figures_falls_back_inline_when_the_pool_fails(broken_jobs):
+    store = broken_jobs
+    specs = _specs()[:2]
+    pngs = render_figures(specs, cache=None, jobs=store, pool_min=1)
+    assert pngs == render_figures(specs, cache=None, jobs=None)
+    assert len(store) == 0
@@ -0,0 +1,79 @@
+import json
+import os, sys
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import profiling
+from profiling import begin_rerun, current_trace, end_rerun, profiled, stage
+
+
+class _Page:
+    @profiled
+    def run(self, n):
+        with stage("carga") as s:
+            s.add_rows(n)
+            with stage("parseo", rows=n):
+                data = bytearray(n * 16)
+        return len(data) // 16
+
+
+def test_profiled_records_nested_stages_and_writes_trace(tmp_path, monkeypatch):
+    trace_file = tmp_path / "trace.jsonl"
+    monkeypatch.setattr(profiling, "TRACE_FILE", str(trace_file))
+    # El pico de tracemalloc es del proceso: el perfilado nunca lo reinicia
+    monkeypatch.setattr(tracemalloc, "reset_peak", None)
+    tracemalloc.start()
+    try:
+        begin_rerun("Prueba")
+        assert _Page().run(100_000) == 100_000
+    finally:
+        tracemalloc.stop()
+    assert current_trace() is None
+
+    lines = trace_file.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1
+    trace = json.loads(lines[0])
+    assert trace["page"] == "Prueba"
+    stages = [(s["name"], s["depth"], s["rows"]) for s in trace["stages"]]
+    assert stages == [("_Page.run", 0, None), ("carga", 1, 100_000), ("parseo", 2, 100_000)]
+    # El pico de la etapa padre incluye el de sus hijas
+    peaks = [s["peak_bytes"] for s in trace["stages"]]
+    assert peaks[2] >= 100_000 * 8 and peaks[0] >= peaks[1] >= peaks[2]
+
+
+def test_stage_without_trace_is_a_no_op():
+    with stage("suelta", rows=3) as s:
+        s.add_rows(2)
+    assert current_trace() is None
+
+
+def test_rerun_without_stages_is_written(tmp_path, monkeypatch):
+    """Una traza sin etapas se escribe con end_rerun() o, si quedó abierta, al abrir el rerun siguiente."""
+    trace_file = tmp_path / "trace.jsonl"
+    monkeypatch.setattr(profiling, "TRACE_FILE", str(trace_file))
+    begin_rerun("Script")
+    end_rerun()
+    assert current_trace() is None
+    begin_rerun("Sin cerrar")
+    begin_rerun("Siguiente")
+    assert current_trace().page == "Siguiente"
+    end_rerun()
+    pages = [json.loads(line)["page"] for line in trace_file.read_text(encoding="utf-8").splitlines()]
+    assert pages == ["Script", "Sin cerrar", "Siguiente"]
+
+
+def test_stage_peak_is_a_delta_over_an_earlier_global_peak(tmp_path, monkeypatch):
+    """Un pico global anterior (de otra sesión o rerun) no se atribuye a la etapa."""
+    monkeypatch.setattr(profiling, "TRACE_FILE", str(tmp_path / "trace.jsonl"))
+    tracemalloc.start()
+    try:
+        big = bytearray(8 * 2**20)
+        del big
+        begin_rerun("Prueba")
+        with stage("chica"):
+            small = bytearray(2**20)
+        trace = json.loads((tmp_path / "trace.jsonl").read_text(encoding="utf-8"))
+    finally:
+        tracemalloc.stop()
+    peak = trace["stages"][0]["peak_bytes"]
+    assert len(small) <= peak < 4 * 2**20
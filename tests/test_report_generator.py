@@ -0,0 +1,136 @@
+import io
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import numpy as np
+import pandas as pd
+import pypdf
+from reportlab.platypus import LongTable, Table
+
+import report_generator
+from benchmarks.generators import calibration_sheet
+from data_loader import IngestionCache
+from report_generator import ReportGenerator, build_sections, build_story, cell_columns, cell_story, data_table, format_column, section_key
+
+
+class _RaiseOnError:
+    @staticmethod
+    def error(message):
+        raise RuntimeError(message)
+
+
+def _png():
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(4, 2))
+    ax.plot([0, 1], [0, 1])
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png')
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def _report(df, n_requerimiento='REQ-1', fecha='01/01/2025', **kwargs):
+    denominaciones = {1: 'Celda 1', 2: 'Celda 2', 10: 'Celda 10'}
+    png = _png()
+    plots = [(f'grafico_celda{idx}_{name}.png', io.BytesIO(png)) for idx, name in denominaciones.items()]
+    pdf = ReportGenerator.generar_informe_pdf(
+        _RaiseOnError, fecha, 'Patrón', 'kgf', 0.5, list(denominaciones), denominaciones, df, plots,
+        n_requerimiento, 'N/C', jobs=None, **kwargs)
+    return pdf.getvalue()
+
+
+def _sheet():
+    df = calibration_sheet(10, n_points=5)
+    return df[[col for col in df.columns if col[3:].split('_')[0] in ('1', '2', '10')]]
+
+
+def test_cell_columns_and_section_keys():
+    df = _sheet()
+    assert cell_columns(df, 1) == ['PAT1_0', 'DUT1_0', 'PAT1_R', 'DUT1_R']
+    args = (1, 'Celda 1', 'kgf', df[cell_columns(df, 1)], [('g.png', b'png')], None, None)
+    assert section_key('celda', args) == section_key('celda', args)
+    edited = df[cell_columns(df, 1)].copy()
+    edited.iloc[2, 1] += 1
+    assert section_key('celda', args[:3] + (edited,) + args[4:]) != section_key('celda', args)
+    assert section_key('celda', args[:1] + ('Otra',) + args[2:]) != section_key('celda', args)
+    assert section_key('celda', args[:4] + ([('g.png', b'png2')],) + args[5:]) != section_key('celda', args)
+    assert section_key('celda', args[:4] + ([('g.pn', b'gpng')],) + args[5:]) != section_key('celda', args)
+
+
+def test_cell_story_covers_every_angle():
+    """Correlaciones y tablas incluyen todos los ángulos de la planilla, con los valores del motor."""
+    df = calibration_sheet(2, n_points=5, angles=('0', 'R', '60', '120', '180', '240', '300'))
+    story = cell_story(2, 'Celda 2', 'kgf', df[cell_columns(df, 2)], [])
+    correlation = next(f for f in story if type(f) is Table)._cellvalues
+    assert [row[0] for row in correlation[1:]] == ['Carga 0°', 'Descarga 0°', 'Carga 60°', 'Carga 120°',
+                                                   'Carga 180°', 'Carga 240°', 'Carga 300°']
+    expected = df['PAT2_60'].corr(df['DUT2_60'])
+    assert correlation[3][1] == f'{expected:.8f}'
+    headers = [cell for f in story if isinstance(f, LongTable) for cell in f._cellvalues[0]]
+    assert headers.count('Err(L300°)') == 2 and headers.count('DUT(L60°)') == 3
+    assert all(len(f._cellvalues[0]) <= 12 for f in story if isinstance(f, LongTable))
+
+
+def test_single_build_without_pypdf(monkeypatch):
+    monkeypatch.setattr(report_generator, 'HAS_PYPDF', False)
+    assert _report(_sheet()).startswith(b'%PDF')
+
+
+def test_sections_are_cached_and_merged(monkeypatch):
+    df = _sheet()
+    cache = IngestionCache()
+    calls = []
+    pdf = _report(df, cache=cache, progress=lambda done, total: calls.append((done, total)))
+    assert cache.misses == 4 and calls[-1] == (4, 4)
+    pages = pypdf.PdfReader(io.BytesIO(pdf)).pages
+    assert '- Pág. 1 -' in pages[0].extract_text() and f'- Pág. {len(pages)} -' in pages[-1].extract_text()
+
+    # Cambiar solo datos de portada regenera solo la portada
+    _report(df, n_requerimiento='REQ-2', cache=cache)
+    assert cache.misses == 5 and cache.hits == 3
+
+    # La fecha va en la portada y en el encabezado estampado: las celdas siguen en caché
+    pdf = _report(df, n_requerimiento='REQ-2', fecha='02/02/2025', cache=cache)
+    assert cache.misses == 6 and cache.hits == 6
+    texts = [page.extract_text() for page in pypdf.PdfReader(io.BytesIO(pdf)).pages]
+    assert all('Fecha de calibración: 02/02/2025' in text for text in texts)
+
+    monkeypatch.setattr(report_generator, 'HAS_PYPDF', False)
+    single = _report(df)
+    assert len(pypdf.PdfReader(io.BytesIO(single)).pages) == len(pages)
+
+
+def test_sections_are_built_inline_when_the_pool_fails(broken_jobs):
+    sections = [('portada', ('01/01/2025', 'Patrón', 'kgf', 0.5, f'REQ-{n}', 'N/C')) for n in range(2)]
+    store = broken_jobs
+    calls = []
+    pdfs = build_sections(sections, cache=None, jobs=store, pool_min=1,
+                          progress=lambda done, total: calls.append((done, total)))
+    assert len(pdfs) == 2 and all(pdf.startswith(b'%PDF') for pdf in pdfs)
+    assert len(store) == 0 and calls[-1] == (2, 2)
+
+
+def test_format_column_by_dtype():
+    assert format_column(pd.Series([1.5, np.nan, -0.123456])) == ['1.5000', 'N/A', '-0.1235']
+    assert format_column(np.array([0.5, 2.0]), precision=2) == ['0.50', '2.00']
+    assert format_column(pd.Series([3, 40])) == ['3', '40']
+    assert format_column(pd.Series([1.0, None, 'x'], dtype=object)) == ['1.0000', 'N/A', 'x']
+
+
+def test_data_table_formats_columns():
+    n = 100
+    table = data_table(['PAT', 'Err'], [np.arange(n, dtype=float), np.full(n, np.nan)], [4, 2])
+    assert isinstance(table, LongTable) and len(table._cellvalues) == n + 1
+    assert table._cellvalues[0] == ['PAT', 'Err'] and table._cellvalues[-1] == [f'{n - 1:.4f}', 'N/A']
+    assert len(data_table(['PAT'], [np.array([])])._cellvalues) == 1
+
+
+def test_data_table_header_once_per_page():
+    n = 120
+    pdf = build_story([data_table(['ColumnaPAT', 'ColumnaErr'], [np.arange(n, dtype=float), np.zeros(n)])])
+    texts = [page.extract_text() for page in pypdf.PdfReader(io.BytesIO(pdf)).pages]
+    assert len(texts) >= 3
+    assert [text.count('ColumnaPAT') for text in texts] == [1] * len(texts)
+    assert f'{n - 1:.4f}' in texts[-1]
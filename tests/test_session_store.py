@@ -0,0 +1,49 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import pandas as pd
+
+from session_store import store_frame, open_handle
+
+
+def test_store_frame_roundtrip(tmp_path):
+    """El handle guardado permite releer el dataset completo o por columnas."""
+    df = pd.DataFrame({'ts': [0.0, 1.0, 2.0], 'F1': [10.0, 11.0, 12.0]}, index=[5, 6, 7])
+    handle = store_frame(df, store_dir=str(tmp_path))
+    assert handle.columns == ('ts', 'F1')
+    assert handle.n_rows == 3
+    pd.testing.assert_frame_equal(handle.load(), df.reset_index(drop=True))
+    assert handle.column('F1').tolist() == [10.0, 11.0, 12.0]
+    assert open_handle(handle.key, store_dir=str(tmp_path)) == handle
+
+
+def test_store_frame_mixed_object_column(tmp_path):
+    """Una columna con textos, números y vacíos se guarda como texto en lugar de fallar."""
+    df = pd.DataFrame({'F1': [1.0, 2.0, 3.0], 'Obs': ['ok', 3, None]})
+    handle = store_frame(df, store_dir=str(tmp_path))
+    assert handle.n_rows == 3
+    loaded = handle.load()
+    assert loaded['F1'].tolist() == [1.0, 2.0, 3.0]
+    assert loaded['Obs'].tolist()[:2] == ['ok', '3']
+    assert pd.isna(loaded['Obs'].iloc[2])
+
+
+def test_window_loads_only_its_rows_and_columns(tmp_path):
+    df = pd.DataFrame({'ts': [0.0, 1.0, 2.0, 3.0], 'F1': [10.0, 11.0, 12.0, 13.0], 'F2': [1.0] * 4})
+    window = store_frame(df, store_dir=str(tmp_path)).window(1, 3, ['F1'])
+    assert list(window.load().columns) == ['F1']
+    assert window.load()['F1'].tolist() == [11.0, 12.0]
+    assert [len(chunk) for chunk in window.iter_chunks(1)] == [1, 1]
+
+
+def test_prune_store_keeps_files_of_live_handles(tmp_path):
+    import gc
+    import session_store
+    old = store_frame(pd.DataFrame({'a': [1.0]}), store_dir=str(tmp_path))
+    dropped = store_frame(pd.DataFrame({'a': [2.0]}), store_dir=str(tmp_path))
+    dropped_path = dropped.path
+    del dropped
+    gc.collect()
+    for path in (old.path, dropped_path):
+        os.utime(path, (0, 0))
+    assert session_store.prune_store(max_age_seconds=60, store_dir=str(tmp_path)) == 1
+    assert old.exists() and not os.path.exists(dropped_path)
@@ -0,0 +1,90 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import numpy as np
+import pandas as pd
+
+import streaming_stats
+from session_store import store_frame
+from streaming_stats import (compute_histograms, compute_stats, histogram_ranges, iter_frame_chunks, merge_stats,
+                             rank_correlation, stats_for_rows)
+
+
+def _sample_frame(n=20_000):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'ts': np.arange(n) * 1000.0 + 7e8,
+        'F1': rng.normal(3800, 5, n),
+        'F2': np.zeros(n),
+    })
+    df['TGT1'] = df['F1'] * 0.5 + rng.normal(size=n)
+    df.loc[::97, 'TGT1'] = np.nan
+    return df
+
+
+def test_streaming_describe_matches_pandas():
+    """Conteo, media, desvío y extremos coinciden con describe(); los cuantiles son aproximados."""
+    df = _sample_frame()
+    stats = compute_stats(iter_frame_chunks(df, 3_000))
+    result = stats.describe()
+    expected = df.describe()
+    for row in ['count', 'mean', 'std', 'min', 'max']:
+        np.testing.assert_allclose(result.loc[row], expected.loc[row], rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(result.loc['50%'], expected.loc['50%'], rtol=1e-3)
+
+
+def test_streaming_quartiles_exact_without_compression():
+    """Con menos muestras que centroides, los cuartiles son los de describe()."""
+    df = pd.DataFrame({'a': [1.0, 2.0, 3.0, 4.0, 10.0], 'b': [5.0, np.nan, -1.0, 0.0, 2.5]})
+    result = compute_stats(iter_frame_chunks(df, 2)).describe()
+    expected = df.describe()
+    for row in ['25%', '50%', '75%']:
+        np.testing.assert_allclose(result.loc[row], expected.loc[row], rtol=1e-12)
+
+
+def test_streaming_corr_matches_pandas_and_drops_constants(tmp_path):
+    """Las estadísticas se acumulan leyendo el dataset guardado por bloques."""
+    df = _sample_frame()
+    stats = compute_stats(store_frame(df, store_dir=str(tmp_path)).iter_chunks(4_000))
+    cols = stats.non_constant_columns()
+    assert cols == ['ts', 'F1', 'TGT1']
+    np.testing.assert_allclose(stats.corr(cols).values, df[cols].corr().values, atol=1e-9)
+
+
+def test_histograms_match_numpy_including_constant_columns():
+    df = _sample_frame()
+    stats = compute_stats(iter_frame_chunks(df, 3_000))
+    cols = ['F1', 'F2', 'TGT1']
+    counts, edges = compute_histograms(iter_frame_chunks(df, 3_000), cols, histogram_ranges(stats, cols), 25)
+    for j, col in enumerate(cols):
+        expected_counts, expected_edges = np.histogram(df[col].dropna(), bins=25)
+        np.testing.assert_array_equal(counts[j], expected_counts)
+        np.testing.assert_allclose(edges[j], expected_edges)
+
+
+def test_rank_correlation_matches_pandas_without_nan():
+    df = _sample_frame(2_000).drop(columns='F2').dropna()
+    cols = list(df.columns)
+    for method in ('spearman', 'kendall'):
+        np.testing.assert_allclose(rank_correlation(df, cols, method).values, df.corr(method=method).values, atol=1e-9)
+
+
+def test_kendall_is_estimated_on_a_sample_above_the_limit(monkeypatch):
+    df = _sample_frame(2_000).drop(columns='F2').dropna()
+    cols = list(df.columns)
+    monkeypatch.setattr(streaming_stats, 'KENDALL_MAX_ROWS', 500)
+    expected = df.iloc[::-(-len(df) // 500)].corr(method='kendall')
+    np.testing.assert_allclose(rank_correlation(df, cols, 'kendall').values, expected.values, atol=1e-12)
+
+
+def test_partial_stats_by_row_range_merge_to_single_pass(tmp_path, monkeypatch):
+    """Los acumuladores por rango de filas (como en el pool de procesos) combinan al resultado de una pasada."""
+    monkeypatch.setattr(streaming_stats, 'DEFAULT_CHUNK_ROWS', 3_000)  # varios bloques por rango
+    df = _sample_frame()
+    handle = store_frame(df, store_dir=str(tmp_path))
+    shift = np.nan_to_num(df.iloc[:1_000].mean().to_numpy())
+    merged = merge_stats([stats_for_rows(handle, a, b, shift=shift) for a, b in [(0, 7_000), (7_000, 20_000)]])
+    single = compute_stats(iter_frame_chunks(df))
+    for row in ['count', 'mean', 'std', 'min', 'max']:
+        np.testing.assert_allclose(merged.describe().loc[row], single.describe().loc[row], rtol=1e-9)
+    cols = merged.non_constant_columns()
+    np.testing.assert_allclose(merged.corr(cols).values, df[cols].corr().values, atol=1e-9)